@@ -2,14 +2,96 @@ import sys
 import os
 import json
 import uuid # For generating anonymous user IDs
-from PyQt5.QtCore import QUrl, Qt
+import time
+import re
+import base64
+import math
+import pickle
+import hashlib
+import queue
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+import subprocess
+import itertools
+import signal
+import socket
+import logging
+import logging.handlers
+import traceback
+import csv
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from string import Template
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# Taken before the Qt imports so --profile-startup can show what importing QtWebEngine costs
+PROCESS_STARTED = time.perf_counter()
+
+
+# --- SINGLE INSTANCE (before the Qt imports) ---
+def app_data_dir():
+    """Persistent browser data lives in the user's home directory; SAFWAT_DATA_DIR points it elsewhere."""
+    return os.environ.get("SAFWAT_DATA_DIR") or os.path.join(os.path.expanduser("~"), ".safwat_browser")
+
+
+def instance_socket_path(data_dir):
+    """Unix socket of the browser running on `data_dir` (in the temp directory if the path would be too long)."""
+    path = os.path.join(data_dir, "instance.sock")
+    if len(path.encode()) < 100:
+        return path
+    return os.path.join(tempfile.gettempdir(), f"safwat-{hashlib.sha1(data_dir.encode()).hexdigest()[:12]}.sock")
+
+
+def forward_to_running_instance(data_dir, urls, new_window=False, timeout_secs=1.0):
+    """
+    Hands URLs (or, without any, a request for a new window) to the browser already running on
+    `data_dir`. Returns False if there is none, so this process starts the browser itself.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    request = {"urls": list(urls), "cwd": os.getcwd(), "new_window": new_window}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout_secs)
+            s.connect(instance_socket_path(data_dir))
+            s.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            return s.recv(16).startswith(b"ok")
+    except OSError:
+        return False
+
+
+# A plain `python setup.py [--new-window] [URL...]` is handed over here, before importing Qt and
+# Chromium, so the second process exits within milliseconds. Other options go through argparse.
+if __name__ == "__main__" and os.name == "posix" and all(
+        arg == "--new-window" or not arg.startswith("-") for arg in sys.argv[1:]):
+    if forward_to_running_instance(app_data_dir(), [arg for arg in sys.argv[1:] if arg != "--new-window"],
+                                   "--new-window" in sys.argv[1:]):
+        sys.exit(0)
+
+from PyQt5.QtCore import (
+    QUrl, Qt, QObject, QTimer, pyqtSignal, QByteArray, QDataStream, QIODevice, QStringListModel,
+    QSettings, QBuffer, QEventLoop, QAbstractListModel, QModelIndex, QSize, QRect
+)
+from PyQt5 import sip
+from PyQt5.QtGui import QColor, QPalette, QDesktopServices, QImage, QPixmap, QIcon
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QToolBar, QLineEdit, QAction, QStatusBar, 
     QVBoxLayout, QWidget, QTabWidget, QSplitter, QPushButton, QHBoxLayout,
     QDialog, QGridLayout, QLabel, QGroupBox, QRadioButton, QMessageBox, 
-    QSizePolicy, QSpacerItem
+    QSizePolicy, QSpacerItem, QCompleter, QSpinBox, QFileDialog,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QInputDialog, QToolButton, QMenu, QLayout,
+    QListWidget, QListWidgetItem, QListView
+)
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile, QWebEngineDownloadItem
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QLocalServer
+from PyQt5.QtWebSockets import QWebSocket
+from PyQt5.QtWebEngineCore import (
+    QWebEngineUrlRequestInterceptor, QWebEngineUrlRequestInfo, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
 )
-from PyQt5.QtWebEngineWidgets import QWebEngineView
 
 # --- ENVIRONMENT & FIREBASE CONTEXT (MANDATORY GLOBALS) ---
 # NOTE: In this simulated environment, these globals would be provided at runtime.
@@ -33,6 +115,150 @@ except NameError:
 # --- Configuration ---
 DEFAULT_URL = "https://search.brave.com/"
 DEFAULT_ZOOM = 0.75
+ZOOM_LEVELS = (0.25, 0.33, 0.5, 0.67, 0.75, 0.8, 0.9, 1.0, 1.1, 1.25, 1.5, 1.75, 2.0, 2.5, 3.0, 4.0, 5.0)
+
+# Persistent browser data (session, history, caches, settings) lives in the user's home directory;
+# SAFWAT_DATA_DIR points it elsewhere (benchmarks use a throwaway directory)
+APP_DATA_DIR = app_data_dir()
+SETTINGS_FILE = os.path.join(APP_DATA_DIR, "settings.ini")
+SESSION_FILE = os.path.join(APP_DATA_DIR, "session.json")
+SESSION_AUTOSAVE_MS = 30 * 1000
+# One browser process per data directory: later launches hand their URLs to it over a Unix socket
+SINGLE_INSTANCE = os.name == "posix"
+INSTANCE_SOCKET = instance_socket_path(APP_DATA_DIR)
+ZOOM_FILE = os.path.join(APP_DATA_DIR, "zoom.json")  # Per-site zoom chosen by the user
+
+# History & Omnibox
+HISTORY_DB = os.path.join(APP_DATA_DIR, "history.sqlite3")
+HISTORY_BATCH_MS = 500  # Visits are written to disk in batches at most this often
+HISTORY_FRECENCY_HALF_LIFE_DAYS = 30  # A visit counts half as much after this many days
+OMNIBOX_SUGGESTION_LIMIT = 8
+
+# Search Engines: {searchTerms} is replaced by the percent-encoded query. "suggest" is an OpenSearch
+# suggestion endpoint answering ["query", ["suggestion", ...]]. Typing "<keyword> terms" searches
+# with that engine. More engines can be added in SEARCH_ENGINES_FILE as
+# {"name": {"label", "keyword", "search", "suggest"}}.
+SEARCH_ENGINES = {
+    "brave": {"label": "Brave Search", "keyword": "@brave", "search": "https://search.brave.com/search?q={searchTerms}",
+              "suggest": "https://search.brave.com/api/suggest?q={searchTerms}"},
+    "duckduckgo": {"label": "DuckDuckGo", "keyword": "@ddg", "search": "https://duckduckgo.com/?q={searchTerms}",
+                   "suggest": "https://duckduckgo.com/ac/?q={searchTerms}&type=list"},
+    "google": {"label": "Google", "keyword": "@google", "search": "https://www.google.com/search?q={searchTerms}",
+               "suggest": "https://suggestqueries.google.com/complete/search?client=firefox&q={searchTerms}"},
+}
+DEFAULT_SEARCH_ENGINE = "brave"
+SEARCH_ENGINES_FILE = os.path.join(APP_DATA_DIR, "search_engines.json")
+# Search suggestions: asked for once typing pauses, answers cached per typed prefix
+SUGGEST_DEBOUNCE_MS = 150
+SUGGEST_TIMEOUT_MS = 3000
+SUGGEST_CACHE_SIZE = 500
+SUGGEST_CACHE_TTL_SECS = 10 * 60
+
+# Content Blocking: EasyList-style filter lists (*.txt) placed in FILTER_LISTS_DIR are
+# compiled once and cached, the cache is rebuilt whenever a list changes
+FILTER_LISTS_DIR = os.path.join(APP_DATA_DIR, "filters")
+FILTER_CACHE_FILE = os.path.join(APP_DATA_DIR, "filters.cache")
+
+# Browser Profile & HTTP Cache (defaults; changes made in Settings are stored with QSettings)
+PROFILE_NAME = "safwat"
+PROFILE_STORAGE_DIR = os.path.join(APP_DATA_DIR, "profile")
+HTTP_CACHE_DIR = os.path.join(APP_DATA_DIR, "cache")
+HTTP_CACHE_MODE = "disk"  # "disk" or "memory"
+HTTP_CACHE_MAX_MB = 512
+
+# Offline copies: successfully loaded pages are saved as MHTML and shown when a later load fails
+SNAPSHOT_DIR = os.path.join(APP_DATA_DIR, "snapshots")
+SNAPSHOT_CACHE_MAX_MB = 256
+SNAPSHOT_REFRESH_SECS = 10 * 60  # A page is saved again at most this often
+
+# Internal Pages: served from memory by InternalPageHandler
+INTERNAL_SCHEME = "safwat"
+OFFLINE_GAME_URL = "safwat://game"
+NEW_TAB_URL = "safwat://newtab"
+ERROR_PAGE_URL = "safwat://error"
+
+# Tab Warm Pool: pre-built views so "➕" does not wait for view and renderer creation
+TAB_POOL_SIZE = 2
+TAB_POOL_PRELOAD_URL = NEW_TAB_URL  # One pooled view keeps this page loaded (None disables)
+TAB_POOL_START_DELAY_MS = 2000  # Let startup finish before warming the pool
+TAB_POOL_REFILL_INTERVAL_MS = 300  # One view is built per tick, keeping the GUI responsive
+
+# DevTools: the docked inspector is destroyed (freeing its renderer) after being closed this long
+DEVTOOLS_DISPOSE_AFTER_SECS = 60
+
+# Tab titles, URL bar and status tip are refreshed at most once per frame
+UI_FLUSH_INTERVAL_MS = 16
+
+# Headless mode: batch page loads for measurements
+HEADLESS_CONCURRENCY = 4
+HEADLESS_TIMEOUT_SECS = 30
+
+# Performance regression suite: baselines are kept next to this file so they can be committed
+PERF_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf_baseline.json")
+PERF_REGRESSION_THRESHOLD = 0.25  # Fail when an operation's median is 25% slower than its baseline...
+PERF_NOISE_FLOOR_MS = 0.2  # ...and slower by more than this, so sub-millisecond jitter never fails
+PERF_REPEAT = 30
+PERF_WARMUP = 3
+
+# Performance traces over the remote debugging protocol. The endpoint lets any local process
+# control the browser, so it is only opened with --remote-debugging-port (or for headless --trace)
+REMOTE_DEBUGGING_PORT = 0  # 0 keeps the endpoint closed
+TRACE_DIR = os.path.join(APP_DATA_DIR, "traces")
+TRACE_DEFAULT_SECS = 5
+TRACE_CATEGORIES = (
+    "devtools.timeline", "disabled-by-default-devtools.timeline", "disabled-by-default-devtools.timeline.frame",
+    "disabled-by-default-devtools.timeline.stack", "toplevel", "loading", "latencyInfo", "blink.console",
+    "blink.user_timing", "v8.execute", "disabled-by-default-v8.cpu_profiler",
+)
+
+# Stall watchdog: GUI-thread stalls longer than this are logged with the main thread's stack
+STALL_THRESHOLD_MS = 50  # 0 disables the watchdog
+STALL_LOG_FILE = os.path.join(APP_DATA_DIR, "stalls.log")
+STALL_LOG_MAX_BYTES = 1024 * 1024
+STALL_LOG_BACKUPS = 3
+STALL_HISTOGRAM_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+# Task manager: refresh interval of the dialog and of the optional JSONL metrics stream
+TASK_MANAGER_REFRESH_MS = 2000
+METRICS_EXPORT_INTERVAL_MS = 10000
+
+# Downloads: at most DOWNLOAD_MAX_ACTIVE transfer at once, the rest wait in a queue. Rate limits are
+# in KB/s (0 = unlimited), enforced by pausing and resuming transfers every DOWNLOAD_TICK_MS.
+DOWNLOADS_DIR = os.path.join(os.path.expanduser("~"), "Downloads")
+DOWNLOAD_MAX_ACTIVE = 3
+DOWNLOAD_GLOBAL_LIMIT_KBPS = 0
+DOWNLOAD_LIMIT_KBPS = 0  # Default for each new download
+DOWNLOAD_TICK_MS = 100
+DOWNLOAD_UI_INTERVAL_MS = 250  # Progress reaches the UI at most this often, however many downloads run
+
+# Tab Overview: thumbnails captured when a tab is left, scaled and written by a worker thread,
+# kept in a memory LRU over a disk cache (keyed by URL, so restored and discarded tabs have them too)
+THUMBNAIL_DIR = os.path.join(APP_DATA_DIR, "thumbnails")
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_HEIGHT = 200
+THUMBNAIL_MEMORY_MB = 32
+THUMBNAIL_DISK_MB = 128
+THUMBNAIL_REFRESH_SECS = 10  # A page is not captured again sooner than this
+THUMBNAIL_CAPTURE_SCALE = 2  # The GUI thread shrinks grabs to this multiple of the thumbnail size
+
+# Tab Lifecycle: background tabs are frozen, then discarded, to bound renderer cost
+TAB_FREEZE_AFTER_SECS = 5 * 60
+TAB_DISCARD_AFTER_SECS = 30 * 60
+TAB_MEMORY_BUDGET_MB = 2048  # Total renderer RSS allowed before LRU discarding (0 disables)
+TAB_LIFECYCLE_INTERVAL_MS = 15 * 1000
+
+# System memory pressure (share of RAM in use, from /proc/meminfo): freeze past the soft
+# limit; discard, then close DevTools, past the hard limit
+MEMORY_SOFT_LIMIT_PERCENT = 80
+MEMORY_HARD_LIMIT_PERCENT = 90
+MEMORY_PRESSURE_INTERVAL_MS = 5 * 1000
+
+# Address Bar: schemes loaded as typed (javascript: is left out on purpose), and the public suffix
+# list deciding whether "name.tld" is a host (a Mozilla public_suffix_list.dat, if installed)
+ADDRESS_SCHEMES = frozenset((
+    "http", "https", "file", "ftp", "about", "data", "blob", "view-source", "qrc", "chrome", "devtools", INTERNAL_SCHEME,
+))
+PUBLIC_SUFFIX_FILE = os.path.join(APP_DATA_DIR, "public_suffix_list.dat")
 
 # Fixed Quick Links (Icon: URL)
 FIXED_QUICK_LINKS = {
@@ -42,58 +268,68 @@ FIXED_QUICK_LINKS = {
     "News 📰": "https://news.ycombinator.com"
 }
 
+# Quick links (built-in and user-added, in bar order) are written at most this often
+QUICK_LINKS_FILE = os.path.join(APP_DATA_DIR, "quick_links.json")
+QUICK_LINKS_SAVE_DELAY_MS = 500
+
 # --- THEME DEFINITIONS ---
-DARK_THEME_CSS = """
-    QMainWindow { background-color: #2e2e2e; color: #ffffff; font-family: Inter, Arial, sans-serif; }
-    QToolBar { background: #3c3c3c; border: 1px solid #555555; border-radius: 6px; margin: 5px; spacing: 5px; }
-    QAction { color: #ffffff; }
-    QStatusBar { background: #3c3c3c; color: #cccccc; }
-    QLineEdit { background: #555555; color: #ffffff; padding: 5px; border: 1px solid #777777; border-radius: 4px; }
-    QToolButton { padding: 5px; border-radius: 5px; margin: 2px; color: #ffffff; font-size: 16px; }
-    QToolButton:hover { background: #555555; }
-    
-    QTabBar::tab { background: #444444; color: #ffffff; padding: 8px 15px; border-top-left-radius: 6px; border-top-right-radius: 6px; border: 1px solid #555555; border-bottom: none; margin-right: 2px; }
-    QTabBar::tab:selected { background: #2e2e2e; border-color: #555555; border-bottom-color: #2e2e2e; }
-    
-    QPushButton { background: #5a5a5a; color: white; border: 1px solid #777; padding: 5px 10px; border-radius: 4px; }
-    QPushButton:hover { background: #6b6b6b; }
-    
-    #GameButton { background: #ff5555; color: white; font-weight: bold; border: none; padding: 5px 15px; border-radius: 4px; box-shadow: 0 2px 4px rgba(0,0,0,0.5); }
-    #GameButton:hover { background: #e04444; }
-    
-    QDialog { background-color: #3c3c3c; color: #ffffff; }
-    QGroupBox { border: 1px solid #555555; margin-top: 10px; }
-    QGroupBox::title { subcontrol-origin: margin; subcontrol-position: top center; padding: 0 3px; color: #ffffff; }
-    QLabel { color: #ffffff; }
-    
-    QWebEngineView { background-color: #1e1e1e; }
-"""
+# Themes are color tables. Each one is compiled once into a QPalette, which the application uses
+# for every widget (including every tab), and into small style sheets for the few window-chrome
+# widgets that need more than colors. Switching themes swaps these prebuilt objects, so there is
+# no application-wide style sheet to re-resolve for every widget.
+DEFAULT_THEME = "dark"
+# User themes: JSON files {"name", "label", "base", "colors": {key: "#rrggbb"}}; missing colors come from "base"
+THEMES_DIR = os.path.join(APP_DATA_DIR, "themes")
 
-LIGHT_THEME_CSS = """
-    QMainWindow { background-color: #f0f0f0; color: #000000; font-family: Inter, Arial, sans-serif; }
-    QToolBar { background: #ffffff; border: 1px solid #cccccc; border-radius: 6px; margin: 5px; spacing: 5px; }
-    QAction { color: #000000; }
-    QStatusBar { background: #ffffff; color: #333333; }
-    QLineEdit { background: #ffffff; color: #000000; padding: 5px; border: 1px solid #cccccc; border-radius: 4px; }
-    QToolButton { padding: 5px; border-radius: 5px; margin: 2px; color: #000000; font-size: 16px; }
-    QToolButton:hover { background: #e0e0e0; }
-    
-    QTabBar::tab { background: #e0e0e0; color: #000000; padding: 8px 15px; border-top-left-radius: 6px; border-top-right-radius: 6px; border: 1px solid #cccccc; border-bottom: none; margin-right: 2px; }
-    QTabBar::tab:selected { background: #f0f0f0; border-color: #cccccc; border-bottom-color: #f0f0f0; }
-    
-    QPushButton { background: #cccccc; color: black; border: 1px solid #aaaaaa; padding: 5px 10px; border-radius: 4px; }
-    QPushButton:hover { background: #bbbbbb; }
-    
-    #GameButton { background: #ff7777; color: white; font-weight: bold; border: none; padding: 5px 15px; border-radius: 4px; box-shadow: 0 2px 4px rgba(0,0,0,0.2); }
-    #GameButton:hover { background: #f06666; }
-    
-    QDialog { background-color: #ffffff; color: #000000; }
-    QGroupBox { border: 1px solid #cccccc; margin-top: 10px; }
-    QGroupBox::title { subcontrol-origin: margin; subcontrol-position: top center; padding: 0 3px; color: #000000; }
-    QLabel { color: #000000; }
-    
-    QWebEngineView { background-color: #ffffff; }
-"""
+BUILTIN_THEMES = {
+    "dark": {
+        "label": "Dark Theme (Default)",
+        "colors": {
+            "window": "#2e2e2e", "text": "#ffffff", "muted_text": "#cccccc", "chrome": "#3c3c3c",
+            "border": "#555555", "hover": "#555555", "input": "#555555", "input_border": "#777777",
+            "tab": "#444444", "button": "#5a5a5a", "button_hover": "#6b6b6b", "button_border": "#777777",
+            "button_text": "#ffffff", "accent": "#ff5555", "accent_hover": "#e04444", "accent_text": "#ffffff",
+            "highlight": "#3d7ae0", "banner": "#5c4b16",
+        },
+    },
+    "light": {
+        "label": "Light Theme",
+        "colors": {
+            "window": "#f0f0f0", "text": "#000000", "muted_text": "#333333", "chrome": "#ffffff",
+            "border": "#cccccc", "hover": "#e0e0e0", "input": "#ffffff", "input_border": "#cccccc",
+            "tab": "#e0e0e0", "button": "#cccccc", "button_hover": "#bbbbbb", "button_border": "#aaaaaa",
+            "button_text": "#000000", "accent": "#ff7777", "accent_hover": "#f06666", "accent_text": "#ffffff",
+            "highlight": "#3d7ae0", "banner": "#fff1b8",
+        },
+    },
+}
+
+# Style sheets of the window-chrome widgets registered with ThemeEngine.register(), by scope.
+# Everything else (tab contents, dialogs, banners) is drawn from the palette alone.
+THEME_STYLE_SCOPES = {
+    "toolbar": """
+        QToolBar { background: $chrome; border: 1px solid $border; border-radius: 6px; margin: 5px; spacing: 5px; }
+        QToolButton { padding: 5px; border-radius: 5px; margin: 2px; color: $text; font-size: 16px; }
+        QToolButton:hover { background: $hover; }
+        QLineEdit { background: $input; color: $text; padding: 5px; border: 1px solid $input_border; border-radius: 4px; }
+    """,
+    "tabs": """
+        QTabBar::tab { background: $tab; color: $text; padding: 8px 15px; border-top-left-radius: 6px; border-top-right-radius: 6px; border: 1px solid $border; border-bottom: none; margin-right: 2px; }
+        QTabBar::tab:selected { background: $window; border-color: $border; border-bottom-color: $window; }
+    """,
+    "bottom": """
+        QPushButton { background: $button; color: $button_text; border: 1px solid $button_border; padding: 5px 10px; border-radius: 4px; }
+        QPushButton:hover { background: $button_hover; }
+        QToolButton { color: $text; padding: 5px; border-radius: 4px; }
+        QToolButton:hover { background: $hover; }
+        #GameButton { background: $accent; color: $accent_text; font-weight: bold; border: none; padding: 5px 15px; border-radius: 4px; }
+        #GameButton:hover { background: $accent_hover; }
+    """,
+    "status": """
+        QStatusBar { background: $chrome; color: $muted_text; }
+        QLabel { color: $muted_text; }
+    """,
+}
 
 # --- OFFLINE GAME CONTENT (HTML/JS) ---
 FLAPPY_BIRD_HTML = """
@@ -353,180 +589,3711 @@ FLAPPY_BIRD_HTML = """
 </html>
 """
 
+# --- INTERNAL PAGES (safwat://) ---
+NEW_TAB_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>New Tab</title>
+    <style>
+        body { margin: 0; display: flex; justify-content: center; align-items: center; height: 100vh; background-color: #2e2e2e; color: #fff; font-family: 'Inter', sans-serif; }
+        form { text-align: center; }
+        h1 { font-weight: 300; margin-bottom: 20px; }
+        input { width: 420px; padding: 10px 14px; border-radius: 6px; border: 1px solid #777; background: #555; color: #fff; font-size: 1rem; }
+    </style>
+</head>
+<body>
+    <form action="https://search.brave.com/search">
+        <h1>Safwat Browser</h1>
+        <input name="q" placeholder="Search the web" autofocus>
+    </form>
+</body>
+</html>
+"""
+
+ERROR_PAGE_HTML = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Page Not Found</title>
+    <style>
+        body { margin: 0; display: flex; justify-content: center; align-items: center; height: 100vh; background-color: #333; color: #fff; font-family: 'Inter', sans-serif; text-align: center; }
+        a { color: #70c5ce; }
+    </style>
+</head>
+<body>
+    <div>
+        <h1 style="color: #ff5555;">Page Not Found</h1>
+        <p id="detail">This internal page does not exist.</p>
+        <p><a href="safwat://newtab">New Tab</a> · <a href="safwat://game">Play Flappy Bird</a></p>
+    </div>
+    <script>
+        document.getElementById('detail').textContent = location.href + ' does not exist.';
+    </script>
+</body>
+</html>
+"""
+
+
+class InternalPageHandler(QWebEngineUrlSchemeHandler):
+    """
+    Serves safwat:// pages (offline game, new tab, error) from byte buffers that are
+    encoded once, so internal pages load like any URL, get history entries, and
+    avoid setHtml's re-parsing and size limit.
+    """
+    PAGES = {
+        "game": QByteArray(FLAPPY_BIRD_HTML.encode("utf-8")),
+        "newtab": QByteArray(NEW_TAB_HTML.encode("utf-8")),
+        "error": QByteArray(ERROR_PAGE_HTML.encode("utf-8")),
+    }
+    CONTENT_TYPE = b"text/html;charset=utf-8"
+
+    @staticmethod
+    def register_scheme():
+        """Registers the safwat:// scheme; must run before the QApplication is created."""
+        scheme = QWebEngineUrlScheme(INTERNAL_SCHEME.encode())
+        scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+        scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.LocalScheme
+                        | QWebEngineUrlScheme.LocalAccessAllowed)
+        QWebEngineUrlScheme.registerScheme(scheme)
+
+    def requestStarted(self, job):
+        # Unknown hosts get the error page rather than a network-style failure
+        data = self.PAGES.get(job.requestUrl().host(), self.PAGES["error"])
+        # QByteArray is implicitly shared, so the buffer does not copy the page. Qt 5's scheme
+        # handler can only reply with a content type and a body: it cannot send cache headers.
+        buffer = QBuffer(job)
+        buffer.setData(data)
+        buffer.open(QIODevice.ReadOnly)
+        job.reply(self.CONTENT_TYPE, buffer)
+
+
 class TabContent(QWidget):
-    """Container widget for QWebEngineView."""
-    def __init__(self, parent=None):
+    """
+    Container widget for QWebEngineView. Tabs restored from a saved session start
+    as placeholders holding their session entry, and only create the view when first activated.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, parent=None, browser=None, placeholder=None):
         super().__init__(parent)
-        self.browser = QWebEngineView()
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        layout.addWidget(self.browser)
+        self.tab_id = next(TabContent._ids)
+        self.browser = None
+        self.placeholder = placeholder
+        self.last_active = time.monotonic()
+        self.content_ready_at = None  # perf_counter() of the first successful load
+        self.load_started_at = None
+        self.last_load_ms = None  # Duration of the last loadStarted -> loadFinished
+        self.offline_url = None  # Set while the tab shows the offline copy of this URL
+        self.offline_banner = None
+        self.content_layout = QVBoxLayout(self)
+        self.content_layout.setContentsMargins(0, 0, 0, 0)
+        if browser is not None:
+            self.set_browser(browser)
 
-class SettingsDialog(QDialog):
-    """Dialog for browser settings (Login and Theme)."""
+    def is_placeholder(self):
+        return self.browser is None
+
+    def set_browser(self, browser):
+        """Places the tab's QWebEngineView; placeholders get theirs when first activated."""
+        self.browser = browser
+        self.content_layout.addWidget(browser)
+        return browser
+
+    def show_offline_banner(self, url, saved_at):
+        """Shows the "offline copy" bar above the page, creating it on first use."""
+        self.offline_url = url
+        if self.offline_banner is None:
+            self.offline_banner = QWidget(self)
+            self.offline_banner.setObjectName("OfflineBanner")
+            # The theme's banner color, carried by the application palette
+            self.offline_banner.setAutoFillBackground(True)
+            self.offline_banner.setBackgroundRole(QPalette.ToolTipBase)
+            self.offline_banner.setForegroundRole(QPalette.ToolTipText)
+            layout = QHBoxLayout(self.offline_banner)
+            layout.setContentsMargins(8, 4, 8, 4)
+            self.offline_label = QLabel()
+            retry_btn = QPushButton("Retry")
+            retry_btn.clicked.connect(lambda: self.browser.setUrl(QUrl(self.offline_url)))
+            layout.addWidget(self.offline_label, 1)
+            layout.addWidget(retry_btn)
+            self.content_layout.insertWidget(0, self.offline_banner)
+        saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(saved_at))
+        self.offline_label.setText(f"📴 Offline copy of {url}, saved {saved}")
+        self.offline_banner.show()
+
+    def hide_offline_banner(self):
+        self.offline_url = None
+        if self.offline_banner is not None:
+            self.offline_banner.hide()
+
+
+class BrowserTabWidget(QTabWidget):
+    """
+    QTabWidget with a registry of its tabs: O(1) lookups by tab id and by view, and tab
+    indexes cached until tabs are inserted, removed or moved (indexOf is a linear scan).
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("Settings ⚙️")
-        self.browser_window = parent
-        self.setup_ui()
-        self.resize(400, 300)
+        self.by_id = {}
+        self.by_view = {}
+        self._indexes = None
+        self.tabBar().tabMoved.connect(self._invalidate_indexes)
 
-    def setup_ui(self):
-        main_layout = QVBoxLayout(self)
-        main_layout.setSpacing(15)
+    def register(self, tab_widget):
+        """Adds a tab to the registry; called again once a placeholder gets its view."""
+        self.by_id[tab_widget.tab_id] = tab_widget
+        if tab_widget.browser is not None:
+            self.by_view[tab_widget.browser] = tab_widget
 
-        # 1. User Authentication Group 
-        auth_group = QGroupBox("User Authentication (Firebase Mock)")
-        auth_layout = QVBoxLayout(auth_group)
-        
-        self.status_label = QLabel()
-        self.update_auth_status_label()
-        auth_layout.addWidget(self.status_label)
-        
-        self.auth_btn_layout = QHBoxLayout()
-        self.sign_in_btn = QPushButton("Sign In Anonymously")
-        self.sign_out_btn = QPushButton("Sign Out")
-        
-        self.sign_in_btn.clicked.connect(self.handle_sign_in)
-        self.sign_out_btn.clicked.connect(self.handle_sign_out)
+    def tab_by_id(self, tab_id):
+        return self.by_id.get(tab_id)
 
-        self.auth_btn_layout.addWidget(self.sign_in_btn)
-        self.auth_btn_layout.addWidget(self.sign_out_btn)
-        auth_layout.addLayout(self.auth_btn_layout)
-        
-        main_layout.addWidget(auth_group)
+    def tab_for_view(self, view):
+        return self.by_view.get(view)
 
-        # 2. Theme Selection Group
-        theme_group = QGroupBox("Browser Theme")
-        theme_layout = QVBoxLayout(theme_group)
-        
-        self.radio_dark = QRadioButton("Dark Theme (Default)")
-        self.radio_light = QRadioButton("Light Theme")
-        
-        current_theme = self.browser_window.current_theme
-        if current_theme == 'dark':
-            self.radio_dark.setChecked(True)
+    def index_of(self, tab_widget):
+        if self._indexes is None:
+            self._indexes = {self.widget(i): i for i in range(self.count())}
+        return self._indexes.get(tab_widget, -1)
+
+    def _invalidate_indexes(self, *args):
+        self._indexes = None
+
+    def tabInserted(self, index):
+        super().tabInserted(index)
+        self.register(self.widget(index))
+        self._indexes = None
+
+    def removeTab(self, index):
+        # currentChanged is emitted before tabRemoved(), and its slots must not see the old indexes
+        self._indexes = None
+        super().removeTab(index)
+
+    def tabRemoved(self, index):
+        super().tabRemoved(index)
+        self._indexes = None
+        # The removed widget is no longer known here, so drop whatever is not a tab anymore
+        live = {self.widget(i) for i in range(self.count())}
+        self.by_id = {tab_id: tab for tab_id, tab in self.by_id.items() if tab in live}
+        self.by_view = {view: tab for view, tab in self.by_view.items() if tab in live}
+
+
+class ZoomStore:
+    """
+    Per-origin zoom factors chosen by the user, held in a dict and persisted as JSON. Origins
+    without an entry use the default zoom; `fixed` origins (the offline game) ignore both.
+    """
+    def __init__(self, path=ZOOM_FILE, default=DEFAULT_ZOOM, fixed=None):
+        self.path = path
+        self.default = default
+        self.fixed = {self.origin(OFFLINE_GAME_URL): 1.0} if fixed is None else fixed
+        try:
+            with open(path, "rb") as f:
+                self.levels = {origin: float(factor) for origin, factor in json.loads(f.read().decode("utf-8")).items()}
+        except (OSError, ValueError, AttributeError):
+            self.levels = {}
+
+    @staticmethod
+    def origin(url):
+        """scheme://host[:port] of a URL string, the unit zoom is remembered for."""
+        scheme, _, rest = url.partition("://")
+        host = rest.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0].rpartition("@")[2]
+        return f"{scheme.lower()}://{host.lower()}"
+
+    def zoom_for(self, url):
+        origin = self.origin(url)
+        factor = self.fixed.get(origin)
+        return factor if factor is not None else self.levels.get(origin, self.default)
+
+    def set_zoom(self, url, factor):
+        """Remembers `factor` for the URL's origin (the default zoom removes the entry). Returns the origin."""
+        origin = self.origin(url)
+        if abs(factor - self.default) < 1e-6:
+            self.levels.pop(origin, None)
         else:
-            self.radio_light.setChecked(True)
+            self.levels[origin] = factor
+        try:
+            atomic_write(self.path, json.dumps(self.levels, indent=1, sort_keys=True).encode("utf-8"))
+        except OSError as e:
+            print(f"Zoom: Could not save zoom levels: {e}")
+        return origin
 
-        self.radio_dark.toggled.connect(lambda: self.apply_setting('dark') if self.radio_dark.isChecked() else None)
-        self.radio_light.toggled.connect(lambda: self.apply_setting('light') if self.radio_light.isChecked() else None)
 
-        theme_layout.addWidget(self.radio_dark)
-        theme_layout.addWidget(self.radio_light)
-        main_layout.addWidget(theme_group)
-        
-        main_layout.addItem(QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding))
+class BrowserPage(QWebEnginePage):
+    """
+    Tab page that applies its origin's zoom when a main-frame navigation is accepted. Chromium
+    applies it as the navigation commits, so the new document is laid out once, at the right zoom,
+    instead of being re-zoomed after it has loaded.
+    """
+    def __init__(self, profile, zoom_levels, parent=None):
+        super().__init__(profile, parent)
+        self.zoom_levels = zoom_levels
 
-        close_btn = QPushButton("Close")
-        close_btn.clicked.connect(self.accept)
-        main_layout.addWidget(close_btn)
+    def acceptNavigationRequest(self, url, navigation_type, is_main_frame):
+        if is_main_frame:
+            factor = self.zoom_levels.zoom_for(url.toString())
+            if self.zoomFactor() != factor:
+                self.setZoomFactor(factor)
+        return super().acceptNavigationRequest(url, navigation_type, is_main_frame)
 
-        self.update_button_visibility()
 
-    def update_auth_status_label(self):
-        """Updates the status label based on the BrowserWindow's current auth state."""
-        if self.browser_window.is_authenticated:
-            # Display the full user ID as required for multi-user apps
-            status_text = f"Status: Logged In\nUser ID: {self.browser_window.user_id}"
-            self.status_label.setStyleSheet("color: #7ac70c;")
+def create_web_view(profile, content_blocker):
+    """Builds a QWebEngineView the way every tab uses it: app profile, per-site zoom, content blocker."""
+    view = QWebEngineView()
+    view.setPage(BrowserPage(profile, profile.zoom_levels, view))
+    view.setZoomFactor(DEFAULT_ZOOM)
+    # Content Blocking: each view gets its own interceptor so blocked requests are counted per tab
+    view.request_interceptor = RequestInterceptor(content_blocker, view.page())
+    view.page().setUrlRequestInterceptor(view.request_interceptor)
+    return view
+
+
+class TabWarmPool(QObject):
+    """
+    Keeps a few pre-constructed views (profile, zoom and content blocker set up, renderer
+    already started) ready for new tabs, optionally one with a page already loaded.
+    Taken views are replaced in idle time, one per timer tick.
+    """
+    PRELOAD_RETRY_SECS = 60
+
+    def __init__(self, factory, size=TAB_POOL_SIZE, preload_url=TAB_POOL_PRELOAD_URL, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.size = size
+        self.preload_url = preload_url
+        self.blank_views = []
+        self.preloaded_view = None
+        self.preloaded_ready = False
+        self.preload_retry_at = 0
+        self.hits = 0
+        self.misses = 0
+
+        self.refill_timer = QTimer(self)
+        self.refill_timer.setInterval(TAB_POOL_REFILL_INTERVAL_MS)
+        self.refill_timer.timeout.connect(self._refill_one)
+        QTimer.singleShot(TAB_POOL_START_DELAY_MS, self.refill_timer.start)
+
+    def configure(self, size, preload_url):
+        """Changes the pool size and preloaded page, dropping the current views."""
+        self.clear()
+        self.size = size
+        self.preload_url = preload_url
+        self.refill_timer.start()
+
+    def is_full(self):
+        return len(self.blank_views) >= self.size and (not self.preload_url or self.preloaded_ready)
+
+    def take(self, qurl):
+        """
+        Returns (view, ready) for a new tab that will show `qurl`. `ready` is True when the
+        view already has `qurl` loaded; `view` is None when the pool is empty.
+        """
+        view, ready = None, False
+        if self.preloaded_ready and qurl == QUrl(self.preload_url):
+            view, ready = self.preloaded_view, True
+            self.preloaded_view, self.preloaded_ready = None, False
+        elif self.blank_views:
+            view = self.blank_views.pop()
+
+        if view is None:
+            self.misses += 1
         else:
-            status_text = "Status: Logged Out (Anonymous Mode)"
-            self.status_label.setStyleSheet("color: #ff5555;")
-        self.status_label.setText(status_text)
-        
-    def update_button_visibility(self):
-        """Manages which auth buttons are visible."""
-        is_auth = self.browser_window.is_authenticated
-        self.sign_in_btn.setVisible(not is_auth)
-        self.sign_out_btn.setVisible(is_auth)
+            self.hits += 1
+        if not self.refill_timer.isActive():
+            self.refill_timer.start()
+        return view, ready
 
-    def handle_sign_in(self):
-        """Simulates successful Firebase Anonymous Sign In."""
-        self.browser_window.sign_in_anonymously()
-        self.update_auth_status_label()
-        self.update_button_visibility()
-        QMessageBox.information(self, "Login Success", "Successfully signed in anonymously (simulated Firebase process).")
+    def _refill_one(self):
+        if self.preload_url and self.preloaded_view is None and time.monotonic() >= self.preload_retry_at:
+            view = self.factory()
+            view.loadFinished.connect(lambda ok, v=view: self._on_preload_finished(v, ok))
+            view.setUrl(QUrl(self.preload_url))
+            self.preloaded_view = view
+        elif len(self.blank_views) < self.size:
+            view = self.factory()
+            # Loading about:blank starts the renderer process now rather than on the first navigation
+            view.setUrl(QUrl("about:blank"))
+            self.blank_views.append(view)
+        else:
+            self.refill_timer.stop()
 
-    def handle_sign_out(self):
-        """Simulates successful Firebase Sign Out."""
-        self.browser_window.sign_out_user()
-        self.update_auth_status_label()
-        self.update_button_visibility()
-        QMessageBox.information(self, "Logout Success", "Successfully signed out (simulated Firebase process).")
+    def _on_preload_finished(self, view, ok):
+        if view is not self.preloaded_view:
+            return
+        if ok:
+            self.preloaded_ready = True
+        else:
+            # Probably offline: try again later instead of hammering the network
+            self.preloaded_view = None
+            self.preload_retry_at = time.monotonic() + self.PRELOAD_RETRY_SECS
+            view.deleteLater()
 
-    def apply_setting(self, theme):
-        """Applies the theme setting."""
-        if self.browser_window:
-            self.browser_window.apply_theme(theme)
+    def clear(self):
+        """Releases every pooled view (their pages must go before the profile does)."""
+        self.refill_timer.stop()
+        for view in self.blank_views + [self.preloaded_view]:
+            if view is not None:
+                view.deleteLater()
+        self.blank_views = []
+        self.preloaded_view, self.preloaded_ready = None, False
 
 
-class AddLinkDialog(QDialog):
-    """Dialog for adding a new Quick Link."""
-    def __init__(self, parent=None):
+class SnapshotCache(QObject):
+    """
+    Size-bounded LRU disk cache of MHTML snapshots of successfully loaded pages, keyed by URL.
+    QWebEnginePage.save() writes each snapshot from the browser process under a temporary name,
+    which replaces the previous copy once complete. Snapshots are shown when a later load of
+    the same URL fails. The index (URL, size, save time, in LRU order) is a small JSON file.
+    """
+    INDEX_NAME = "index.json"
+    SAVED_SCHEMES = ("http://", "https://")
+
+    def __init__(self, profile, directory=SNAPSHOT_DIR, max_mb=SNAPSHOT_CACHE_MAX_MB,
+                 refresh_secs=SNAPSHOT_REFRESH_SECS, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("Add Quick Link ➕")
-        self.link_name = None
-        self.link_url = None
-        self.setup_ui()
+        self.directory = directory
+        self.index_path = os.path.join(directory, self.INDEX_NAME)
+        self.max_bytes = max_mb * 1024 * 1024
+        self.refresh_secs = refresh_secs
+        self.file_url_prefix = QUrl.fromLocalFile(os.path.join(directory, "")).toString()
+        self.entries = OrderedDict()  # key -> {"url", "size", "saved_at"}, least recently used first
+        self.total_bytes = 0
+        self.pending = {}  # temporary path -> (key, url) of saves in progress
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+        self.evictions = 0
+        self.index_dirty = False
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+        profile.downloadRequested.connect(self._on_download_requested)
 
-    def setup_ui(self):
-        layout = QGridLayout(self)
-        self.name_input = QLineEdit()
-        self.url_input = QLineEdit()
-        self.url_input.setPlaceholderText("https://example.com (must start with http/https)")
-        
-        layout.addWidget(QLabel("Icon/Name:"), 0, 0)
-        layout.addWidget(self.name_input, 0, 1)
-        layout.addWidget(QLabel("URL:"), 1, 0)
-        layout.addWidget(self.url_input, 1, 1)
+    @staticmethod
+    def key(url):
+        # The fragment does not change the document
+        return hashlib.sha1(url.split("#", 1)[0].encode("utf-8")).hexdigest()
 
-        ok_button = QPushButton("Add Link")
-        ok_button.clicked.connect(self.validate_and_accept)
-        cancel_button = QPushButton("Cancel")
-        cancel_button.clicked.connect(self.reject)
+    def path_for(self, key):
+        return os.path.join(self.directory, key + ".mhtml")
 
-        button_layout = QHBoxLayout()
-        button_layout.addWidget(cancel_button)
-        button_layout.addWidget(ok_button)
-        
-        layout.addLayout(button_layout, 2, 0, 1, 2)
-        
-    def validate_and_accept(self):
-        name = self.name_input.text().strip()
-        url = self.url_input.text().strip()
+    def is_snapshot(self, url):
+        """True for the file:// URL of a snapshot in this cache."""
+        return url.startswith(self.file_url_prefix)
 
-        if not name:
-            QMessageBox.warning(self, "Input Error", "Please enter a name/icon for the link.")
+    def _load_index(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                rows = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            rows = []
+        for key, url, size, saved_at in rows:
+            if os.path.exists(self.path_for(key)):
+                self.entries[key] = {"url": url, "size": size, "saved_at": saved_at}
+                self.total_bytes += size
+        # Saves interrupted by the last exit
+        for name in os.listdir(self.directory):
+            if name.endswith(".part"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _write_index(self):
+        rows = [[key, e["url"], e["size"], e["saved_at"]] for key, e in self.entries.items()]
+        try:
+            atomic_write(self.index_path, json.dumps(rows).encode("utf-8"))
+            self.index_dirty = False
+        except OSError as e:
+            print(f"Offline copies: Could not write index: {e}")
+
+    def save(self, page):
+        """Saves the page's current document in the background, unless a recent copy exists."""
+        url = page.url().toString()
+        if not url.startswith(self.SAVED_SCHEMES):
             return
-        if not url or not (url.startswith('http://') or url.startswith('https://')):
-            QMessageBox.warning(self, "Input Error", "Please enter a valid URL starting with http:// or https://.")
+        key = self.key(url)
+        entry = self.entries.get(key)
+        if entry and time.time() - entry["saved_at"] < self.refresh_secs:
+            return
+        temp_path = self.path_for(key) + ".part"
+        if temp_path in self.pending:
             return
+        self.pending[temp_path] = (key, url)
+        page.save(temp_path, QWebEngineDownloadItem.MimeHtmlSaveFormat)
 
-        self.link_name = name
-        self.link_url = url
-        self.accept()
+    def _on_download_requested(self, item):
+        # Page saves arrive here already accepted; other downloads are not ours
+        if item.isSavePageDownload() and item.path() in self.pending:
+            item.finished.connect(lambda: self._on_saved(item))
 
+    def _on_saved(self, item):
+        temp_path = item.path()
+        key, url = self.pending.pop(temp_path)
+        path = self.path_for(key)
+        try:
+            if item.state() != QWebEngineDownloadItem.DownloadCompleted:
+                os.remove(temp_path)
+                return
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        old = self.entries.pop(key, None)
+        if old:
+            self.total_bytes -= old["size"]
+        self.entries[key] = {"url": url, "size": size, "saved_at": time.time()}
+        self.total_bytes += size
+        self.saves += 1
+        self._evict()
+        self._write_index()
 
-class BrowserWindow(QMainWindow):
+    def _evict(self):
+        # The newest snapshot stays even when it alone exceeds the limit
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, entry = self.entries.popitem(last=False)
+            self.total_bytes -= entry["size"]
+            self.evictions += 1
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+    def lookup(self, url):
+        """Returns (snapshot path, entry) for a URL, or None. Counts a hit or a miss."""
+        key = self.key(url)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        self.index_dirty = True
+        return self.path_for(key), entry
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "saves": self.saves,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        """Persists the recency order changed by lookups."""
+        if self.index_dirty:
+            self._write_index()
+
+
+def read_process_rss_kb(pid):
+    """Returns the resident set size of a process in KiB from /proc, or 0 if unavailable."""
+    if not pid:
+        return 0
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+CLOCK_TICKS_PER_SEC = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+def read_process_cpu_secs(pid):
+    """Returns the user + system CPU time of a process in seconds from /proc, or 0.0 if unavailable."""
+    if not pid:
+        return 0.0
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            data = stat.read()
+        # The command name is in parentheses and may contain spaces; utime and stime follow it
+        fields = data[data.rindex(")") + 2:].split()
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS_PER_SEC
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+class TabLifecycleManager(QObject):
     """
-    The main window for the Web Developer Browser application, featuring tabs,
-    integrated DevTools, custom themes, and user-configurable quick links,
-    and simulated Firebase authentication.
+    Moves background tabs through the QWebEnginePage lifecycle states
+    (Active -> Frozen -> Discarded) based on idle time and a total memory budget.
+    Discarded pages keep their history and reload when they become active again.
     """
-    def __init__(self):
-        super().__init__()
+    statesChanged = pyqtSignal(dict)
+
+    STATE_NAMES = {
+        QWebEnginePage.LifecycleState.Active: "Active",
+        QWebEnginePage.LifecycleState.Frozen: "Frozen",
+        QWebEnginePage.LifecycleState.Discarded: "Discarded",
+    }
+
+    def __init__(self, tabs, freeze_after=TAB_FREEZE_AFTER_SECS, discard_after=TAB_DISCARD_AFTER_SECS,
+                 memory_budget_mb=TAB_MEMORY_BUDGET_MB, interval_ms=TAB_LIFECYCLE_INTERVAL_MS):
+        super().__init__(tabs)
+        self.tabs = tabs
+        self.freeze_after = freeze_after
+        self.discard_after = discard_after
+        self.memory_budget_mb = memory_budget_mb
+        # Running totals of transitions performed by the manager
+        self.transitions = {"Frozen": 0, "Discarded": 0, "Reloaded": 0}
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sweep)
+        self.timer.start(interval_ms)
+
+    def _background_tabs(self):
+        """Yields every live tab widget except the currently selected one."""
+        current = self.tabs.currentWidget()
+        for i in range(self.tabs.count()):
+            tab_widget = self.tabs.widget(i)
+            if tab_widget is not current and not tab_widget.is_placeholder():
+                yield tab_widget
+
+    def state_of(self, tab_widget):
+        """Returns the lifecycle state name of a tab. Placeholders have no renderer and count as discarded."""
+        if tab_widget.is_placeholder():
+            return "Discarded"
+        return self.STATE_NAMES.get(tab_widget.browser.page().lifecycleState(), "Active")
+
+    def state_counts(self):
+        """Returns how many tabs are currently in each lifecycle state."""
+        counts = {name: 0 for name in self.STATE_NAMES.values()}
+        for i in range(self.tabs.count()):
+            counts[self.state_of(self.tabs.widget(i))] += 1
+        return counts
+
+    def activate(self, tab_widget):
+        """Marks a tab as used now and wakes it up if it was frozen or discarded."""
+        tab_widget.last_active = time.monotonic()
+        if tab_widget.is_placeholder():
+            return
+        page = tab_widget.browser.page()
+        state = page.lifecycleState()
+        if state == QWebEnginePage.LifecycleState.Active:
+            return
+        if state == QWebEnginePage.LifecycleState.Discarded:
+            self.transitions["Reloaded"] += 1
+        page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        self.statesChanged.emit(self.state_counts())
+
+    def set_state(self, tab_widget, state):
+        """Moves a background tab to `state`. Returns False if Chromium would refuse or nothing changes."""
+        page = tab_widget.browser.page()
+        # Chromium refuses to freeze or discard a page that is on screen
+        if page.isVisible() or page.lifecycleState() == state:
+            return False
+        page.setLifecycleState(state)
+        self.transitions[self.STATE_NAMES[state]] += 1
+        return True
+
+    def sweep(self):
+        """Freezes or discards idle background tabs, then enforces the memory budget."""
+        now = time.monotonic()
+        changed = False
+        for tab_widget in self._background_tabs():
+            page = tab_widget.browser.page()
+            state = page.lifecycleState()
+            # Leave tabs that are playing audio alone so media keeps running
+            if state == QWebEnginePage.LifecycleState.Discarded or page.recentlyAudible():
+                continue
+            idle = now - tab_widget.last_active
+            if idle >= self.discard_after:
+                changed |= self.set_state(tab_widget, QWebEnginePage.LifecycleState.Discarded)
+            elif idle >= self.freeze_after and state == QWebEnginePage.LifecycleState.Active:
+                changed |= self.set_state(tab_widget, QWebEnginePage.LifecycleState.Frozen)
+
+        changed |= self._enforce_memory_budget()
+        if changed:
+            self.statesChanged.emit(self.state_counts())
+
+    def _renderer_usage(self):
+        """Returns {pid: rss_mb} for every live renderer, counting shared processes once."""
+        usage = {}
+        for i in range(self.tabs.count()):
+            tab_widget = self.tabs.widget(i)
+            if tab_widget.is_placeholder():
+                continue
+            pid = tab_widget.browser.page().renderProcessPid()
+            if pid and pid not in usage:
+                usage[pid] = read_process_rss_kb(pid) / 1024
+        return usage
+
+    def renderer_in_use(self, pid, excluding=None):
+        """True if any live, non-discarded tab other than `excluding` (the current one included) runs in `pid`."""
+        for i in range(self.tabs.count()):
+            tab_widget = self.tabs.widget(i)
+            if tab_widget is excluding or tab_widget.is_placeholder():
+                continue
+            page = tab_widget.browser.page()
+            if page.renderProcessPid() == pid and page.lifecycleState() != QWebEnginePage.LifecycleState.Discarded:
+                return True
+        return False
+
+    def _enforce_memory_budget(self):
+        """Discards background tabs, least recently used first, until usage fits the budget."""
+        if not self.memory_budget_mb:
+            return False
+        usage = self._renderer_usage()
+        total_mb = sum(usage.values())
+        if total_mb <= self.memory_budget_mb:
+            return False
+
+        changed = False
+        candidates = [t for t in self._background_tabs()
+                      if t.browser.page().lifecycleState() != QWebEnginePage.LifecycleState.Discarded]
+        for tab_widget in sorted(candidates, key=lambda t: t.last_active):
+            pid = tab_widget.browser.page().renderProcessPid()
+            if not self.set_state(tab_widget, QWebEnginePage.LifecycleState.Discarded):
+                continue
+            changed = True
+            # A renderer shared with other live tabs is only freed once all of them are discarded
+            if pid in usage and not self.renderer_in_use(pid, tab_widget):
+                total_mb -= usage.pop(pid)
+            if total_mb <= self.memory_budget_mb:
+                break
+        return changed
+
+
+def read_meminfo(path="/proc/meminfo"):
+    """Returns /proc/meminfo as {field: kB}, or {} if unavailable."""
+    info = {}
+    try:
+        with open(path) as meminfo:
+            for line in meminfo:
+                name, _, value = line.partition(":")
+                fields = value.split()
+                if fields:
+                    info[name] = int(fields[0])
+    except (OSError, ValueError):
+        pass
+    return info
+
+
+class MemoryPressureMonitor(QObject):
+    """
+    Polls system memory and reclaims background tabs, least recently activated first, when
+    usage crosses the soft limit (freeze one tab per poll) or the hard limit (discard tabs
+    until their estimated renderer memory covers the excess, then close DevTools).
+    The meminfo and RSS readers are injectable so pressure can be simulated.
+    """
+    levelChanged = pyqtSignal(str)
+
+    def __init__(self, tabs, lifecycle, dev_tools, soft_percent=MEMORY_SOFT_LIMIT_PERCENT,
+                 hard_percent=MEMORY_HARD_LIMIT_PERCENT, interval_ms=MEMORY_PRESSURE_INTERVAL_MS,
+                 meminfo_reader=read_meminfo, rss_reader=read_process_rss_kb, parent=None):
+        super().__init__(parent)
+        self.tabs = tabs
+        self.lifecycle = lifecycle
+        self.dev_tools = dev_tools
+        self.soft_percent = soft_percent
+        self.hard_percent = hard_percent
+        self.meminfo_reader = meminfo_reader
+        self.rss_reader = rss_reader
+        self.level = "normal"
+        self.activation_order = OrderedDict()  # tab_id -> None, least recently activated first
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        if interval_ms:
+            self.timer.start(interval_ms)
+
+    def note_activated(self, tab_widget):
+        """Called from current_tab_changed; moves the tab to the most recently used end."""
+        self.activation_order.pop(tab_widget.tab_id, None)
+        self.activation_order[tab_widget.tab_id] = None
+
+    def used_percent(self):
+        """Returns (percent of RAM in use, MemTotal in kB), or None if /proc/meminfo is unreadable."""
+        info = self.meminfo_reader()
+        total = info.get("MemTotal")
+        available = info.get("MemAvailable", info.get("MemFree"))
+        if not total or available is None:
+            return None
+        return (1 - available / total) * 100, total
+
+    def _candidates(self):
+        """Background tabs with a live view, least recently activated first (never-activated tabs first of all)."""
+        for tab_id in [tab_id for tab_id in self.activation_order if self.tabs.tab_by_id(tab_id) is None]:
+            del self.activation_order[tab_id]
+        rank = {tab_id: i for i, tab_id in enumerate(self.activation_order)}
+        current = self.tabs.currentWidget()
+        live = [self.tabs.widget(i) for i in range(self.tabs.count())]
+        live = [t for t in live if t is not current and not t.is_placeholder()]
+        return sorted(live, key=lambda t: rank.get(t.tab_id, -1))
+
+    def _log(self, message):
+        print(f"Memory pressure: {message}")
+
+    def check(self):
+        reading = self.used_percent()
+        if reading is None:
+            return
+        used, total_kb = reading
+        level = "hard" if used >= self.hard_percent else "soft" if used >= self.soft_percent else "normal"
+        if level != self.level:
+            self._log(f"{self.level} -> {level} ({used:.1f}% of {total_kb // 1024} MB in use)")
+            self.level = level
+            self.levelChanged.emit(level)
+
+        if level == "soft":
+            changed = self._freeze_one(used)
+        elif level == "hard":
+            changed = self._reclaim(used, total_kb)
+        else:
+            changed = False
+        if changed:
+            self.lifecycle.statesChanged.emit(self.lifecycle.state_counts())
+
+    def _describe(self, tab_widget, pid, rss_kb):
+        return f"tab {tab_widget.tab_id} {tab_widget.browser.url().toString()!r} (renderer {pid}, {rss_kb / 1024:.0f} MB)"
+
+    def _freeze_one(self, used):
+        for tab_widget in self._candidates():
+            page = tab_widget.browser.page()
+            if page.lifecycleState() != QWebEnginePage.LifecycleState.Active or page.recentlyAudible():
+                continue
+            if self.lifecycle.set_state(tab_widget, QWebEnginePage.LifecycleState.Frozen):
+                pid = page.renderProcessPid()
+                self._log(f"{used:.1f}% >= soft {self.soft_percent}%: froze {self._describe(tab_widget, pid, self.rss_reader(pid))}")
+                return True
+        self._log(f"{used:.1f}% >= soft {self.soft_percent}%: no background tab left to freeze")
+        return False
+
+    def _reclaim(self, used, total_kb):
+        # Aim for the soft limit so the next poll does not immediately cross the hard one again
+        excess_kb = (used - self.soft_percent) / 100 * total_kb
+        freed_kb = 0
+        changed = False
+        candidates = [t for t in self._candidates()
+                      if t.browser.page().lifecycleState() != QWebEnginePage.LifecycleState.Discarded
+                      and not t.browser.page().recentlyAudible()]
+        for tab_widget in candidates:
+            if freed_kb >= excess_kb:
+                break
+            pid = tab_widget.browser.page().renderProcessPid()
+            # Read the renderer's size while it is still alive; discarding may end the process
+            rss_kb = self.rss_reader(pid)
+            if not self.lifecycle.set_state(tab_widget, QWebEnginePage.LifecycleState.Discarded):
+                continue
+            changed = True
+            # A renderer shared with other live tabs, visible or audible ones included, is freed with the last of them
+            if not self.lifecycle.renderer_in_use(pid, tab_widget):
+                freed_kb += rss_kb
+            self._log(f"{used:.1f}% >= hard {self.hard_percent}%: discarded {self._describe(tab_widget, pid, rss_kb)}")
+
+        if freed_kb < excess_kb and self.dev_tools.has_inspectors():
+            self.dev_tools.dispose_all()
+            self._log(f"{used:.1f}% >= hard {self.hard_percent}%: closed DevTools")
+        elif not changed:
+            self._log(f"{used:.1f}% >= hard {self.hard_percent}%: nothing left to reclaim")
+        return changed
+
+
+def atomic_write(path, data):
+    """Writes bytes to a file via a temporary file and rename, so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SessionStore:
+    """
+    Saves the open tabs (URL, title, order and back/forward history) to disk and
+    loads them back as session entries for placeholder tabs.
+    """
+    VERSION = 1
+
+    def __init__(self, path=SESSION_FILE):
+        self.path = path
+
+    @staticmethod
+    def snapshot_tab(tab_widget):
+        """Returns the session entry for a tab. Placeholders keep their original entry."""
+        if tab_widget.is_placeholder():
+            return tab_widget.placeholder
+
+        browser = tab_widget.browser
+        data = QByteArray()
+        stream = QDataStream(data, QIODevice.WriteOnly)
+        stream << browser.history()
+        return {
+            "url": browser.url().toString(),
+            "title": browser.title(),
+            "history": base64.b64encode(bytes(data)).decode("ascii"),
+        }
+
+    @staticmethod
+    def restore_history(browser, entry):
+        """Restores a tab's back/forward stack, which also navigates to its current entry."""
+        history = entry.get("history")
+        if history:
+            data = QByteArray(base64.b64decode(history))
+            stream = QDataStream(data, QIODevice.ReadOnly)
+            stream >> browser.history()
+            if stream.status() == QDataStream.Ok and browser.history().count():
+                return
+        browser.setUrl(QUrl(entry.get("url") or DEFAULT_URL))
+
+    def save(self, tabs):
+        """Writes every tab of a QTabWidget, in tab order, plus the selected index."""
+        entries = [self.snapshot_tab(tabs.widget(i)) for i in range(tabs.count())]
+        session = {"version": self.VERSION, "current": tabs.currentIndex(), "tabs": entries}
+        try:
+            atomic_write(self.path, json.dumps(session).encode("utf-8"))
+        except OSError as e:
+            print(f"Session: Could not save session: {e}")
+
+    def load(self):
+        """Returns the saved session dict, or None if there is no usable session."""
+        try:
+            with open(self.path, "rb") as f:
+                session = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return None
+        if session.get("version") != self.VERSION or not session.get("tabs"):
+            return None
+        return session
+
+
+class HistoryStore:
+    """
+    On-disk browsing history (SQLite) ranked by frecency.
+
+    Visits are queued from the GUI thread and written in batched transactions by a
+    background thread. Suggestions are answered from a URL prefix index and a
+    full-text index over titles, both ordered by a precomputed frecency score, so a
+    lookup touches a handful of rows even with millions of history entries.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS places (
+            id INTEGER PRIMARY KEY,
+            url TEXT NOT NULL UNIQUE,
+            url_key TEXT NOT NULL,
+            title TEXT NOT NULL DEFAULT '',
+            visit_count INTEGER NOT NULL DEFAULT 0,
+            last_visit REAL NOT NULL DEFAULT 0,
+            frecency REAL NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS places_url_key ON places(url_key, frecency);
+        CREATE INDEX IF NOT EXISTS places_frecency ON places(frecency DESC, url_key);
+    """
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5(
+            title, url_key, content='places', content_rowid='id', prefix='2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS places_ai AFTER INSERT ON places BEGIN
+            INSERT INTO places_fts(rowid, title, url_key) VALUES (new.id, new.title, new.url_key);
+        END;
+        CREATE TRIGGER IF NOT EXISTS places_ad AFTER DELETE ON places BEGIN
+            INSERT INTO places_fts(places_fts, rowid, title, url_key) VALUES ('delete', old.id, old.title, old.url_key);
+        END;
+        CREATE TRIGGER IF NOT EXISTS places_au AFTER UPDATE OF title ON places WHEN old.title != new.title BEGIN
+            INSERT INTO places_fts(places_fts, rowid, title, url_key) VALUES ('delete', old.id, old.title, old.url_key);
+            INSERT INTO places_fts(rowid, title, url_key) VALUES (new.id, new.title, new.url_key);
+        END;
+    """
+    UPSERT_VISIT = """
+        INSERT INTO places (url, url_key, title, visit_count, last_visit, frecency)
+        VALUES (?, ?, ?, 1, ?, ?)
+        ON CONFLICT(url) DO UPDATE SET
+            visit_count = visit_count + 1,
+            last_visit = excluded.last_visit,
+            frecency = logaddexp(frecency, excluded.frecency),
+            title = CASE WHEN excluded.title != '' THEN excluded.title ELSE title END
+    """
+    UPDATE_TITLE = "UPDATE places SET title = ? WHERE url = ?"
+
+    # Above this many prefix matches, walking the frecency index beats sorting the matches
+    PREFIX_SORT_LIMIT = 2000
+    # Title matches considered per query; keeps very common words cheap
+    FTS_CANDIDATE_LIMIT = 500
+    RECORDED_SCHEMES = ("http://", "https://", "file://")
+
+    def __init__(self, path=HISTORY_DB, batch_ms=HISTORY_BATCH_MS):
+        self.path = path
+        self.batch_secs = batch_ms / 1000
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.conn = self._connect()
+        self.conn.executescript(self.SCHEMA)
+        try:
+            self.conn.executescript(self.FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: suggestions fall back to URL prefixes only
+            self.has_fts = False
+        self.conn.commit()
+
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name="HistoryWriter", daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-32768")  # 32 MiB keeps the hot index pages in memory
+        conn.create_function("logaddexp", 2, self.logaddexp, deterministic=True)
+        return conn
+
+    @staticmethod
+    def logaddexp(a, b):
+        """log(exp(a) + exp(b)) without overflow; frecency scores are kept in log space."""
+        if a < b:
+            a, b = b, a
+        return a + math.log1p(math.exp(b - a))
+
+    @staticmethod
+    def visit_score(timestamp):
+        """
+        Log-space weight of a single visit. Summing exp(t / tau) over visits ranks pages
+        exactly like an exponentially decaying visit count, without ever rescoring rows.
+        """
+        tau = HISTORY_FRECENCY_HALF_LIFE_DAYS * 86400 / math.log(2)
+        return timestamp / tau
+
+    @staticmethod
+    def url_key(text):
+        """Normalizes a URL or typed text for prefix matching (no scheme, no "www.")."""
+        key = text.strip().lower()
+        for prefix in ("https://", "http://"):
+            if key.startswith(prefix):
+                key = key[len(prefix):]
+                break
+        if key.startswith("www."):
+            key = key[4:]
+        return key
+
+    def record_visit(self, url, title=""):
+        """Queues a visit to be written by the background thread."""
+        if url.startswith(self.RECORDED_SCHEMES):
+            self.pending.put((self.UPSERT_VISIT, (url, self.url_key(url), title, time.time(), self.visit_score(time.time()))))
+
+    def set_title(self, url, title):
+        """Queues a title update for an already visited URL."""
+        if title and url.startswith(self.RECORDED_SCHEMES):
+            self.pending.put((self.UPDATE_TITLE, (title, url)))
+
+    def _write_loop(self):
+        conn = self._connect()
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.batch_secs
+            while True:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+            try:
+                with conn:
+                    for statement in batch:
+                        if statement is not None:
+                            conn.execute(*statement)
+            except sqlite3.Error as e:
+                print(f"History: Failed to write {len(batch)} entries: {e}")
+        conn.close()
+
+    def close(self):
+        """Flushes queued visits and stops the writer thread."""
+        self.pending.put(None)
+        self.writer.join(timeout=5)
+        self.conn.close()
+
+    def import_rows(self, rows):
+        """Bulk-inserts (url, title, visit_count, last_visit) rows in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO places (url, url_key, title, visit_count, last_visit, frecency) VALUES (?, ?, ?, ?, ?, ?)",
+                ((url, self.url_key(url), title, count, last_visit,
+                  self.visit_score(last_visit) + math.log(count)) for url, title, count, last_visit in rows)
+            )
+
+    def suggest(self, text, limit=OMNIBOX_SUGGESTION_LIMIT):
+        """Returns up to `limit` (url, title) pairs matching typed text, best frecency first."""
+        key = self.url_key(text)
+        if not key:
+            return []
+        # Everything that starts with `key` sorts below `key` followed by the highest code point
+        bounds = (key, key + "\U0010ffff")
+
+        matches = self.conn.execute(
+            "SELECT count(*) FROM (SELECT 1 FROM places WHERE url_key >= ? AND url_key < ? LIMIT ?)",
+            bounds + (self.PREFIX_SORT_LIMIT,)
+        ).fetchone()[0]
+        # Both plans rank from a covering index and only read the winning rows from the table
+        if matches < self.PREFIX_SORT_LIMIT:
+            # Rare prefix: the range is small, sorting it is cheap
+            ranked = "SELECT id FROM places WHERE url_key >= ? AND url_key < ? ORDER BY frecency DESC LIMIT ?"
+        else:
+            # Common prefix: walk pages by frecency and stop at the first `limit` matches
+            ranked = ("SELECT id FROM places INDEXED BY places_frecency "
+                      "WHERE url_key >= ? AND url_key < ? ORDER BY frecency DESC LIMIT ?")
+        results = self.conn.execute(
+            f"SELECT url, title FROM places WHERE id IN ({ranked}) ORDER BY frecency DESC", bounds + (limit,)
+        ).fetchall()
+
+        if len(results) < limit and self.has_fts:
+            # Single characters match nearly every title and are usually still being typed
+            terms = [t for t in text.replace('"', " ").split() if len(t) > 1]
+            if terms:
+                match = " ".join(f'"{t}"*' for t in terms)
+                seen = {url for url, _ in results}
+                rows = self.conn.execute(
+                    "SELECT p.url, p.title FROM places p JOIN "
+                    "(SELECT rowid FROM places_fts WHERE places_fts MATCH ? LIMIT ?) m ON p.id = m.rowid "
+                    "ORDER BY p.frecency DESC LIMIT ?",
+                    (match, self.FTS_CANDIDATE_LIMIT, limit)
+                ).fetchall()
+                results.extend(row for row in rows if row[0] not in seen)
+        return results[:limit]
+
+
+# --- CONTENT BLOCKING ---
+FILTER_TYPE_NAMES = (
+    "other", "script", "image", "stylesheet", "object", "xmlhttprequest",
+    "subdocument", "ping", "media", "font", "websocket", "document",
+)
+FILTER_TYPE_BITS = {name: 1 << i for i, name in enumerate(FILTER_TYPE_NAMES)}
+FILTER_TYPE_ALIASES = {"xhr": "xmlhttprequest", "css": "stylesheet", "frame": "subdocument", "doc": "document"}
+# Rules without a type option apply to everything except top-level documents
+FILTER_DEFAULT_TYPES = sum(FILTER_TYPE_BITS.values()) & ~FILTER_TYPE_BITS["document"]
+
+_FILTER_TOKEN_RE = re.compile(r"[a-z0-9%]+")
+_FILTER_HOST_RULE_RE = re.compile(r"^\|\|([a-z0-9.-]+)\^\|?$")
+_URL_HOST_RE = re.compile(r"[a-z][a-z0-9+.\-]*://(?:[^@/?#]*@)?(\[[^\]/]*\]|[^:/?#]*)", re.IGNORECASE)
+
+
+def url_host(url):
+    """Returns the lowercase host of an absolute URL without parsing the whole URL."""
+    m = _URL_HOST_RE.match(url)
+    return m.group(1).lower() if m else ""
+
+
+def base_domain(host):
+    """Approximates the registrable domain of a host (example.co.uk, example.com)."""
+    labels = host.split(".")
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in ("co", "com", "org", "net", "gov", "ac", "edu"):
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def host_suffixes(host):
+    """Yields a host and each parent domain: a.b.com, b.com, com."""
+    while host:
+        yield host
+        dot = host.find(".")
+        if dot < 0:
+            return
+        host = host[dot + 1:]
+
+
+class FilterRule:
+    """A single network filter from an EasyList-style list."""
+    __slots__ = ("pattern", "plain", "is_regex", "match_case", "third_party", "type_mask",
+                 "include_domains", "exclude_domains", "_regex")
+
+    def __init__(self, pattern, is_regex=False, match_case=False, third_party=None,
+                 type_mask=FILTER_DEFAULT_TYPES, include_domains=(), exclude_domains=()):
+        self.pattern = pattern
+        self.is_regex = is_regex
+        self.match_case = match_case
+        self.third_party = third_party
+        self.type_mask = type_mask
+        self.include_domains = frozenset(include_domains)
+        self.exclude_domains = frozenset(exclude_domains)
+        # Patterns without anchors, wildcards or separators are plain substring checks
+        self.plain = None
+        if not is_regex and not any(c in pattern for c in "|*^"):
+            self.plain = pattern if match_case else pattern.lower()
+        self._regex = None
+
+    def regex(self):
+        """Compiles the pattern on first use; most rules never need it."""
+        if self._regex is None:
+            if self.is_regex:
+                source = self.pattern
+            else:
+                pattern, prefix, suffix = self.pattern, "", ""
+                if pattern.startswith("||"):
+                    prefix, pattern = r"^[a-z][a-z0-9+.\-]*://(?:[^/?#]*\.)?", pattern[2:]
+                elif pattern.startswith("|"):
+                    prefix, pattern = "^", pattern[1:]
+                if pattern.endswith("|"):
+                    suffix, pattern = "$", pattern[:-1]
+                body = re.escape(pattern).replace(r"\*", ".*").replace(r"\^", r"(?:[^\w.%\-]|$)")
+                source = prefix + body + suffix
+            self._regex = re.compile(source, 0 if self.match_case else re.IGNORECASE)
+        return self._regex
+
+    def matches(self, url, url_lower, type_bit, third_party, source_host):
+        if not self.type_mask & type_bit:
+            return False
+        if self.third_party is not None and self.third_party != third_party:
+            return False
+        if self.include_domains or self.exclude_domains:
+            suffixes = list(host_suffixes(source_host))
+            if self.exclude_domains.intersection(suffixes):
+                return False
+            if self.include_domains and not self.include_domains.intersection(suffixes):
+                return False
+        if self.plain is not None:
+            return self.plain in (url if self.match_case else url_lower)
+        return self.regex().search(url) is not None
+
+
+class FilterRuleIndex:
+    """
+    Buckets rules so a request only checks the few rules that could match it:
+    `||host^` rules by domain, other rules by their rarest token, the rest in a short generic list.
+    """
+    __slots__ = ("hosts", "tokens", "generic")
+
+    def __init__(self):
+        self.hosts = {}
+        self.tokens = {}
+        self.generic = []
+
+    def add_host_rule(self, domain, rule):
+        self.hosts.setdefault(domain, []).append(rule)
+
+    def add_token_rule(self, rule, candidates, token_counts):
+        if candidates:
+            token = min(candidates, key=token_counts.__getitem__)
+            self.tokens.setdefault(token, []).append(rule)
+        else:
+            self.generic.append(rule)
+
+    def match(self, url, url_lower, url_tokens, host, type_bit, third_party, source_host):
+        """Returns the first rule that matches the request, or None."""
+        # Hot path: plain loops and bound lookups, no generators
+        hosts_get = self.hosts.get
+        suffix = host
+        while suffix:
+            rules = hosts_get(suffix)
+            if rules:
+                for rule in rules:
+                    if rule.matches(url, url_lower, type_bit, third_party, source_host):
+                        return rule
+            dot = suffix.find(".")
+            suffix = suffix[dot + 1:] if dot >= 0 else ""
+        tokens_get = self.tokens.get
+        for token in url_tokens:
+            rules = tokens_get(token)
+            if rules:
+                for rule in rules:
+                    if rule.matches(url, url_lower, type_bit, third_party, source_host):
+                        return rule
+        for rule in self.generic:
+            if rule.matches(url, url_lower, type_bit, third_party, source_host):
+                return rule
+        return None
+
+
+class FilterEngine:
+    """
+    Compiled content-blocking engine for EasyList/Adblock Plus network filters.
+    Cosmetic (element hiding) rules and unsupported options are skipped.
+    """
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self.block = FilterRuleIndex()
+        self.allow = FilterRuleIndex()
+        self.rule_count = 0
+
+    @staticmethod
+    def parse_rule(line):
+        """Parses one list line into (is_exception, FilterRule), or None if it is not a usable network filter."""
+        line = line.strip()
+        if not line or line.startswith(("!", "[")) or "##" in line or "#@#" in line or "#?#" in line or "#$#" in line:
+            return None
+        is_exception = line.startswith("@@")
+        if is_exception:
+            line = line[2:]
+
+        options = {}
+        is_regex = len(line) > 2 and line.startswith("/") and line.endswith("/")
+        if not is_regex and "$" in line:
+            line, _, option_text = line.rpartition("$")
+            for option in option_text.split(","):
+                name, _, value = option.strip().lower().partition("=")
+                options[name] = value
+        if is_regex:
+            line = line[1:-1]
+        if not line or line in ("*", "|", "||"):
+            return None
+
+        kwargs = {"is_regex": is_regex}
+        included, excluded = 0, 0
+        for name, value in options.items():
+            negated = name.startswith("~")
+            name = name.lstrip("~")
+            name = FILTER_TYPE_ALIASES.get(name, name)
+            if name in FILTER_TYPE_BITS:
+                if negated:
+                    excluded |= FILTER_TYPE_BITS[name]
+                else:
+                    included |= FILTER_TYPE_BITS[name]
+            elif name in ("third-party", "3p"):
+                kwargs["third_party"] = not negated
+            elif name in ("first-party", "1p"):
+                kwargs["third_party"] = negated
+            elif name == "match-case":
+                kwargs["match_case"] = True
+            elif name == "domain":
+                domains = value.split("|")
+                kwargs["include_domains"] = [d for d in domains if d and not d.startswith("~")]
+                kwargs["exclude_domains"] = [d[1:] for d in domains if d.startswith("~")]
+            else:
+                # Options we cannot honour (redirect=, csp=, popup, ...) would change the rule's meaning
+                return None
+        if included or excluded:
+            kwargs["type_mask"] = (included or FILTER_DEFAULT_TYPES) & ~excluded
+        return is_exception, FilterRule(line, **kwargs)
+
+    @staticmethod
+    def rule_tokens(pattern):
+        """
+        Returns the tokens of a pattern that must appear as whole tokens in any matching URL:
+        tokens bounded on both sides by literal separators or anchors, never by a wildcard.
+        """
+        pattern = pattern.lower()
+        tokens = []
+        for m in _FILTER_TOKEN_RE.finditer(pattern):
+            start, end = m.span()
+            if end - start < 2 or start == 0 or end == len(pattern):
+                continue
+            if pattern[start - 1] == "*" or pattern[end] == "*":
+                continue
+            tokens.append(m.group())
+        return tokens
+
+    @classmethod
+    def from_lines(cls, lines):
+        engine = cls()
+        parsed = []
+        token_counts = {}
+        for line in lines:
+            result = cls.parse_rule(line)
+            if result is None:
+                continue
+            is_exception, rule = result
+            host = None if rule.is_regex else _FILTER_HOST_RULE_RE.match(rule.pattern.lower())
+            candidates = [] if rule.is_regex or host else cls.rule_tokens(rule.pattern)
+            for token in candidates:
+                token_counts[token] = token_counts.get(token, 0) + 1
+            parsed.append((is_exception, rule, host.group(1) if host else None, candidates))
+
+        for is_exception, rule, host, candidates in parsed:
+            index = engine.allow if is_exception else engine.block
+            if host:
+                # Finding the rule under the request's host already proves the pattern matches
+                rule.plain = ""
+                index.add_host_rule(host, rule)
+            else:
+                index.add_token_rule(rule, candidates, token_counts)
+        engine.rule_count = len(parsed)
+        return engine
+
+    @classmethod
+    def load(cls, paths, cache_path=FILTER_CACHE_FILE):
+        """Loads filter lists, reusing the pickled compiled engine when none of the lists changed."""
+        fingerprint = hashlib.sha1(str(cls.FORMAT_VERSION).encode())
+        for path in sorted(paths):
+            stat = os.stat(path)
+            fingerprint.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+        fingerprint = fingerprint.hexdigest()
+
+        try:
+            with open(cache_path, "rb") as f:
+                cached_fingerprint, engine = pickle.load(f)
+            if cached_fingerprint == fingerprint:
+                return engine
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            pass
+
+        lines = []
+        for path in sorted(paths):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                lines.extend(f)
+        engine = cls.from_lines(lines)
+        try:
+            atomic_write(cache_path, pickle.dumps((fingerprint, engine), protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError as e:
+            print(f"Content Blocking: Could not write filter cache: {e}")
+        return engine
+
+    def should_block(self, url, source_url="", resource_type="other"):
+        """Returns True if a request for `url` made by the page at `source_url` should be blocked."""
+        url_lower = url.lower()
+        host = url_host(url_lower)
+        source_host = url_host(source_url) if source_url else ""
+        third_party = bool(source_host) and source_host != host and base_domain(host) != base_domain(source_host)
+        type_bit = FILTER_TYPE_BITS.get(resource_type, 1)
+        url_tokens = set(_FILTER_TOKEN_RE.findall(url_lower))
+
+        if self.block.match(url, url_lower, url_tokens, host, type_bit, third_party, source_host) is None:
+            return False
+        return self.allow.match(url, url_lower, url_tokens, host, type_bit, third_party, source_host) is None
+
+
+class ContentBlocker(QObject):
+    """Owns the shared FilterEngine, compiling or loading it off the GUI thread at startup."""
+    engineLoaded = pyqtSignal(int)
+
+    def __init__(self, lists_dir=FILTER_LISTS_DIR, cache_path=FILTER_CACHE_FILE, parent=None):
+        super().__init__(parent)
+        self.engine = None  # Requests pass through until the engine is ready
+        self.lists_dir = lists_dir
+        self.cache_path = cache_path
+        threading.Thread(target=self._load, name="FilterLoader", daemon=True).start()
+
+    def _load(self):
+        try:
+            paths = [os.path.join(self.lists_dir, name) for name in os.listdir(self.lists_dir) if name.endswith(".txt")]
+        except OSError:
+            paths = []
+        if not paths:
+            return
+        started = time.perf_counter()
+        self.engine = FilterEngine.load(paths, self.cache_path)
+        print(f"Content Blocking: {self.engine.rule_count} rules ready in {time.perf_counter() - started:.2f}s")
+        self.engineLoaded.emit(self.engine.rule_count)
+
+
+class RequestInterceptor(QWebEngineUrlRequestInterceptor):
+    """Per-tab request interceptor backed by the shared ContentBlocker; counts blocked requests."""
+    blockedCountChanged = pyqtSignal(int)
+
+    RESOURCE_TYPES = {
+        QWebEngineUrlRequestInfo.ResourceTypeMainFrame: "document",
+        QWebEngineUrlRequestInfo.ResourceTypeSubFrame: "subdocument",
+        QWebEngineUrlRequestInfo.ResourceTypeStylesheet: "stylesheet",
+        QWebEngineUrlRequestInfo.ResourceTypeScript: "script",
+        QWebEngineUrlRequestInfo.ResourceTypeImage: "image",
+        QWebEngineUrlRequestInfo.ResourceTypeFontResource: "font",
+        QWebEngineUrlRequestInfo.ResourceTypeObject: "object",
+        QWebEngineUrlRequestInfo.ResourceTypeMedia: "media",
+        QWebEngineUrlRequestInfo.ResourceTypeXhr: "xmlhttprequest",
+        QWebEngineUrlRequestInfo.ResourceTypePing: "ping",
+        QWebEngineUrlRequestInfo.ResourceTypePluginResource: "object",
+    }
+
+    def __init__(self, blocker, parent=None):
+        super().__init__(parent)
+        self.blocker = blocker
+        self.blocked_count = 0
+
+    def interceptRequest(self, info):
+        engine = self.blocker.engine
+        if engine is None:
+            return
+        resource_type = self.RESOURCE_TYPES.get(info.resourceType(), "other")
+        if engine.should_block(info.requestUrl().toString(), info.firstPartyUrl().toString(), resource_type):
+            info.block(True)
+            self.blocked_count += 1
+            self.blockedCountChanged.emit(self.blocked_count)
+
+
+# --- BROWSER PROFILE ---
+def directory_size_bytes(path):
+    """Returns the total size of all files below a directory."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class BrowserProfile(QWebEngineProfile):
+    """
+    App-owned, on-disk QWebEngineProfile: persistent cookies and storage plus a
+    configurable HTTP cache (location, maximum size, disk or memory-only).
+    """
+    def __init__(self, settings, parent=None):
+        super().__init__(PROFILE_NAME, parent)
+        self.settings = settings
+        self.setPersistentStoragePath(PROFILE_STORAGE_DIR)
+        self.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
+        self.apply_cache_settings()
+        self.zoom_levels = ZoomStore()
+
+        self.internal_pages = InternalPageHandler(self)
+        self.installUrlSchemeHandler(INTERNAL_SCHEME.encode(), self.internal_pages)
+
+    def cache_mode(self):
+        return self.settings.value("cache/mode", HTTP_CACHE_MODE)
+
+    def cache_dir(self):
+        return self.settings.value("cache/path", HTTP_CACHE_DIR)
+
+    def cache_max_mb(self):
+        return int(self.settings.value("cache/max_mb", HTTP_CACHE_MAX_MB))
+
+    def apply_cache_settings(self):
+        """Applies the stored cache settings; takes effect for new requests immediately."""
+        self.setCachePath(self.cache_dir())
+        self.setHttpCacheMaximumSize(self.cache_max_mb() * 1024 * 1024)
+        self.setHttpCacheType(
+            QWebEngineProfile.MemoryHttpCache if self.cache_mode() == "memory" else QWebEngineProfile.DiskHttpCache
+        )
+
+    def update_cache_settings(self, mode=None, path=None, max_mb=None):
+        """Stores new cache settings and applies them."""
+        if mode is not None:
+            self.settings.setValue("cache/mode", mode)
+        if path is not None:
+            self.settings.setValue("cache/path", path)
+        if max_mb is not None:
+            self.settings.setValue("cache/max_mb", max_mb)
+        self.apply_cache_settings()
+
+
+class SettingsDialog(QDialog):
+    """Dialog for browser settings (Login, Theme and Cache)."""
+    cacheSizeReady = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Settings ⚙️")
+        self.browser_window = parent
+        self.profile = parent.profile
+        self.setup_ui()
+        self.resize(400, 450)
+
+    def setup_ui(self):
+        main_layout = QVBoxLayout(self)
+        main_layout.setSpacing(15)
+
+        # 1. User Authentication Group 
+        auth_group = QGroupBox("User Authentication (Firebase Mock)")
+        auth_layout = QVBoxLayout(auth_group)
+        
+        self.status_label = QLabel()
+        self.update_auth_status_label()
+        auth_layout.addWidget(self.status_label)
+        
+        self.auth_btn_layout = QHBoxLayout()
+        self.sign_in_btn = QPushButton("Sign In Anonymously")
+        self.sign_out_btn = QPushButton("Sign Out")
+        
+        self.sign_in_btn.clicked.connect(self.handle_sign_in)
+        self.sign_out_btn.clicked.connect(self.handle_sign_out)
+
+        self.auth_btn_layout.addWidget(self.sign_in_btn)
+        self.auth_btn_layout.addWidget(self.sign_out_btn)
+        auth_layout.addLayout(self.auth_btn_layout)
+        
+        main_layout.addWidget(auth_group)
+
+        # 2. Theme Selection Group
+        theme_group = QGroupBox("Browser Theme")
+        theme_layout = QVBoxLayout(theme_group)
+        
+        # One choice per theme, the built-in ones first, then those found in THEMES_DIR
+        themes = self.browser_window.themes
+        for name, theme in themes.themes.items():
+            radio = QRadioButton(theme.label)
+            radio.setChecked(name == themes.current)
+            radio.toggled.connect(lambda checked, name=name: self.apply_setting(name) if checked else None)
+            theme_layout.addWidget(radio)
+        main_layout.addWidget(theme_group)
+
+        # 3. Search Engine Group
+        search_group = QGroupBox("Search Engine")
+        search_layout = QVBoxLayout(search_group)
+        engines = self.browser_window.search_engines
+        current_engine = engines.current().name
+        for name, engine in engines.engines.items():
+            radio = QRadioButton(engine.label)
+            radio.setChecked(name == current_engine)
+            radio.toggled.connect(lambda checked, name=name: engines.select(name) if checked else None)
+            search_layout.addWidget(radio)
+        main_layout.addWidget(search_group)
+
+        # 4. Cache & Storage Group
+        cache_group = QGroupBox("Cache & Storage")
+        cache_layout = QGridLayout(cache_group)
+
+        self.radio_disk_cache = QRadioButton("Disk Cache (Persistent)")
+        self.radio_memory_cache = QRadioButton("Memory Only")
+        if self.profile.cache_mode() == "memory":
+            self.radio_memory_cache.setChecked(True)
+        else:
+            self.radio_disk_cache.setChecked(True)
+        self.radio_disk_cache.toggled.connect(
+            lambda checked: self.profile.update_cache_settings(mode="disk" if checked else "memory")
+        )
+
+        self.cache_size_spin = QSpinBox()
+        self.cache_size_spin.setRange(16, 64 * 1024)
+        self.cache_size_spin.setSuffix(" MB")
+        self.cache_size_spin.setValue(self.profile.cache_max_mb())
+        self.cache_size_spin.editingFinished.connect(
+            lambda: self.profile.update_cache_settings(max_mb=self.cache_size_spin.value())
+        )
+
+        self.cache_path_label = QLabel(self.profile.cachePath())
+        self.cache_path_label.setWordWrap(True)
+        change_path_btn = QPushButton("Change…")
+        change_path_btn.clicked.connect(self.choose_cache_path)
+
+        self.cache_stats_label = QLabel("Calculating…")
+        clear_cache_btn = QPushButton("Clear Cache")
+        clear_cache_btn.clicked.connect(self.clear_cache)
+
+        cache_layout.addWidget(self.radio_disk_cache, 0, 0)
+        cache_layout.addWidget(self.radio_memory_cache, 0, 1)
+        cache_layout.addWidget(QLabel("Maximum size:"), 1, 0)
+        cache_layout.addWidget(self.cache_size_spin, 1, 1)
+        cache_layout.addWidget(self.cache_path_label, 2, 0)
+        cache_layout.addWidget(change_path_btn, 2, 1)
+        cache_layout.addWidget(self.cache_stats_label, 3, 0)
+        cache_layout.addWidget(clear_cache_btn, 3, 1)
+        snapshot_stats = self.browser_window.snapshots.stats()
+        cache_layout.addWidget(QLabel(
+            f"Offline copies: {snapshot_stats['entries']} pages, {snapshot_stats['bytes'] / 1024 / 1024:.1f} MB "
+            f"({snapshot_stats['hits']} hits, {snapshot_stats['misses']} misses)"
+        ), 4, 0, 1, 2)
+        main_layout.addWidget(cache_group)
+
+        # Live cache size: the directory walk runs off the GUI thread
+        self.cacheSizeReady.connect(self.update_cache_stats_label)
+        self.cache_size_walk = None  # The thread measuring the cache, while it runs
+        self.cache_stats_timer = QTimer(self)
+        self.cache_stats_timer.timeout.connect(self.refresh_cache_stats)
+        self.cache_stats_timer.start(1000)
+        self.finished.connect(self.cache_stats_timer.stop)
+        self.refresh_cache_stats()
+        
+        main_layout.addItem(QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding))
+
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        main_layout.addWidget(close_btn)
+
+        self.update_button_visibility()
+
+    def update_auth_status_label(self):
+        """Updates the status label based on the BrowserWindow's current auth state."""
+        if self.browser_window.is_authenticated:
+            # Display the full user ID as required for multi-user apps
+            status_text = f"Status: Logged In\nUser ID: {self.browser_window.user_id}"
+            self.status_label.setStyleSheet("color: #7ac70c;")
+        else:
+            status_text = "Status: Logged Out (Anonymous Mode)"
+            self.status_label.setStyleSheet("color: #ff5555;")
+        self.status_label.setText(status_text)
+        
+    def update_button_visibility(self):
+        """Manages which auth buttons are visible."""
+        is_auth = self.browser_window.is_authenticated
+        self.sign_in_btn.setVisible(not is_auth)
+        self.sign_out_btn.setVisible(is_auth)
+
+    def handle_sign_in(self):
+        """Simulates successful Firebase Anonymous Sign In."""
+        self.browser_window.sign_in_anonymously()
+        self.update_auth_status_label()
+        self.update_button_visibility()
+        QMessageBox.information(self, "Login Success", "Successfully signed in anonymously (simulated Firebase process).")
+
+    def handle_sign_out(self):
+        """Simulates successful Firebase Sign Out."""
+        self.browser_window.sign_out_user()
+        self.update_auth_status_label()
+        self.update_button_visibility()
+        QMessageBox.information(self, "Logout Success", "Successfully signed out (simulated Firebase process).")
+
+    def apply_setting(self, theme):
+        """Applies the theme setting."""
+        if self.browser_window:
+            self.browser_window.apply_theme(theme)
+
+    def choose_cache_path(self):
+        """Lets the user move the HTTP cache to another directory."""
+        path = QFileDialog.getExistingDirectory(self, "Cache Location", self.profile.cachePath())
+        if path:
+            self.profile.update_cache_settings(path=path)
+            self.cache_path_label.setText(self.profile.cachePath())
+            self.refresh_cache_stats()
+
+    def refresh_cache_stats(self):
+        """Measures the disk cache in a background thread; the result arrives via cacheSizeReady."""
+        # One walk at a time: on a large or slow cache, ticks that come while it runs are skipped
+        if self.cache_size_walk is not None and self.cache_size_walk.is_alive():
+            return
+        path = self.profile.cachePath()  # Read here: the profile may only be used on the GUI thread
+        self.cache_size_walk = threading.Thread(
+            target=lambda: self.cacheSizeReady.emit(directory_size_bytes(path)), daemon=True
+        )
+        self.cache_size_walk.start()
+
+    def update_cache_stats_label(self, size_bytes):
+        if self.profile.cache_mode() == "memory":
+            self.cache_stats_label.setText(f"Memory-only cache ({size_bytes / 1024 / 1024:.1f} MB left on disk)")
+        else:
+            self.cache_stats_label.setText(
+                f"Disk cache: {size_bytes / 1024 / 1024:.1f} MB of {self.profile.cache_max_mb()} MB"
+            )
+
+    def clear_cache(self):
+        """Clears the HTTP cache; Chromium deletes the files asynchronously."""
+        self.profile.clearHttpCache()
+        self.refresh_cache_stats()
+
+
+# --- ADDRESS BAR CLASSIFICATION ---
+# Fallback when no public_suffix_list.dat is installed: every ccTLD, the common gTLDs and the
+# busiest second-level public suffixes
+BUILTIN_PUBLIC_SUFFIXES = frozenset((
+    "ac ad ae af ag ai al am ao aq ar as at au aw ax az ba bb bd be bf bg bh bi bj bm bn bo br bs bt bw by bz "
+    "ca cc cd cf cg ch ci ck cl cm cn co cr cu cv cw cx cy cz de dj dk dm do dz ec ee eg er es et eu fi fj fk "
+    "fm fo fr ga gd ge gf gg gh gi gl gm gn gp gq gr gs gt gu gw gy hk hm hn hr ht hu id ie il im in io iq ir "
+    "is it je jm jo jp ke kg kh ki km kn kp kr kw ky kz la lb lc li lk lr ls lt lu lv ly ma mc md me mg mh mk "
+    "ml mm mn mo mp mq mr ms mt mu mv mw mx my mz na nc ne nf ng ni nl no np nr nu nz om pa pe pf pg ph pk pl "
+    "pm pn pr ps pt pw py qa re ro rs ru rw sa sb sc sd se sg sh si sk sl sm sn so sr ss st su sv sx sy sz tc "
+    "td tf tg th tj tk tl tm tn to tr tt tv tw tz ua ug uk us uy uz va vc ve vg vi vn vu wf ws ye yt za zm zw "
+    "com org net edu gov mil int arpa info biz name pro aero coop museum mobi asia tel travel jobs cat post "
+    "app dev page blog shop store online site website tech xyz top club cloud news art design live wiki "
+    "google youtube amazon microsoft apple bank insure law health media social email link network digital "
+    "co.uk org.uk me.uk ac.uk gov.uk net.uk ltd.uk plc.uk com.au net.au org.au edu.au gov.au co.nz org.nz "
+    "co.jp ne.jp or.jp ac.jp go.jp com.br net.br org.br gov.br com.cn net.cn org.cn gov.cn com.tr org.tr "
+    "co.in net.in org.in gov.in ac.in co.za org.za gov.za com.mx org.mx com.ar com.sg com.hk com.tw co.kr "
+    "or.kr com.eg com.sa com.pk com.ng co.il org.il ac.il"
+).split())
+
+ADDRESS_URL, ADDRESS_SEARCH, ADDRESS_PATH = "url", "search", "path"
+_IPV6_HOST = re.compile(r"\[[0-9a-f:.]+\]")
+
+
+def public_suffixes(path=PUBLIC_SUFFIX_FILE):
+    """The rules of an installed public_suffix_list.dat (wildcards as their parent), else the built-in set."""
+    try:
+        with open(path, "rb") as f:
+            lines = f.read().decode("utf-8").splitlines()
+    except OSError:
+        return BUILTIN_PUBLIC_SUFFIXES
+    suffixes = set()
+    for line in lines:
+        rule = line.strip().lstrip("!")
+        if not rule or rule.startswith("//"):
+            continue
+        if rule.startswith("*."):
+            rule = rule[2:]
+        suffixes.add(rule.lower())
+    return frozenset(suffixes)
+
+
+def is_hostname(host):
+    """True for a syntactically valid lowercase host name; internationalized labels count as letters."""
+    if len(host) > 253:
+        return False
+    # Separators are checked only when present; most hosts have no hyphen and a single dot
+    if "-" in host:
+        if host[0] == "-" or host[-1] == "-" or "-." in host or ".-" in host:
+            return False
+        host = host.replace("-", "")
+    if "." in host:
+        if host[0] == "." or ".." in host:
+            return False
+        host = host.replace(".", "")
+    return host.isalnum()
+
+
+def is_ipv4(host):
+    """True for a dotted-quad IPv4 address, by libc's strict parser, which rejects leading zeros."""
+    try:
+        socket.inet_pton(socket.AF_INET, host)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+class AddressClassifier:
+    """
+    Decides what address bar text is, without touching the disk or the network: a URL (with the
+    scheme it should get), a search (and with which engine, from the keyword table) or a local
+    path, whose existence is then checked off the GUI thread. Rules are string tests and a few
+    precompiled patterns, tried cheapest first.
+    """
+    def __init__(self, keywords=None, suffixes=BUILTIN_PUBLIC_SUFFIXES, schemes=ADDRESS_SCHEMES):
+        self.keywords = {keyword.lower(): name for keyword, name in (keywords or {}).items()}
+        self.suffixes = suffixes
+        self.schemes = schemes
+
+    def classify(self, text):
+        """Returns (kind, value, engine name or None) for non-empty text, else None."""
+        text = text.strip()
+        if not text:
+            return None
+        first = text[0]
+        if first in "/~\\" or (first == "." and text.startswith(("./", "../"))):
+            return ADDRESS_PATH, os.path.expanduser(text) if first == "~" else text, None
+        if first == "?":
+            return ADDRESS_SEARCH, text[1:].lstrip(), None
+
+        # str.find is several times slower than `in` here, so it only runs when the character is present
+        lowered = text.lower()
+        colon = lowered.find(":") if ":" in lowered else -1
+        if colon == 1 and text[2:3] in ("/", "\\") and first.isalpha():
+            return ADDRESS_PATH, text, None  # A drive letter
+        if colon > 0 and lowered[:colon] in self.schemes:
+            return ADDRESS_URL, text, None
+        if " " in text or "\t" in text or "\n" in text:
+            keyword, _, terms = lowered.partition(" ")
+            engine = self.keywords.get(keyword)
+            if engine is not None and terms.strip():
+                return ADDRESS_SEARCH, text[len(keyword):].strip(), engine
+            return ADDRESS_SEARCH, text, None
+
+        # The host: up to the path, query or fragment, then up to the port
+        end = len(lowered)
+        if "/" in lowered:
+            end = lowered.find("/")
+        if "?" in lowered:
+            i = lowered.find("?")
+            if i < end:
+                end = i
+        if "#" in lowered:
+            i = lowered.find("#")
+            if i < end:
+                end = i
+        if colon < 0 or colon > end:
+            host = lowered[:end] if end < len(lowered) else lowered
+        elif first == "[":
+            bracket = lowered.find("]", 0, end)
+            port = lowered[bracket + 1:end]
+            if bracket < 0 or _IPV6_HOST.fullmatch(lowered, 0, bracket + 1) is None \
+                    or (port and (port[0] != ":" or not port[1:].isdigit() or int(port[1:]) > 65535)):
+                return ADDRESS_SEARCH, text, None
+            return ADDRESS_URL, "http://" + text, None
+        else:
+            host, port = lowered[:colon], lowered[colon + 1:end]
+            # Equal-length digit strings compare like their numbers, so no int() is needed
+            if port.isdigit() and (len(port) < 5 or (len(port) == 5 and port <= "65535")) \
+                    and (host == "localhost" or (host and is_hostname(host))):
+                return ADDRESS_URL, "http://" + text, None
+            return ADDRESS_SEARCH, text, None
+
+        if host and host[-1] == ".":
+            host = host[:-1]
+        _, dot, tld = host.rpartition(".")
+        if not dot:
+            # A single word is a search unless typed with a path, like "intranet/wiki"
+            if host == "localhost" or (end < len(lowered) and host and is_hostname(host)):
+                return ADDRESS_URL, "http://" + text, None
+            return ADDRESS_SEARCH, text, None
+        suffixes = self.suffixes
+        if tld in suffixes:
+            if host not in suffixes and is_hostname(host):
+                return ADDRESS_URL, "https://" + text, None
+            return ADDRESS_SEARCH, text, None
+        if tld == "localhost" or (host[0].isdigit() and is_ipv4(host)):
+            return ADDRESS_URL, "http://" + text, None
+        return ADDRESS_SEARCH, text, None
+
+
+class PathProbe(QObject):
+    """Checks whether typed paths exist on a worker thread, since a stale network mount can block stat() for minutes."""
+    checked = pyqtSignal(object, str, bool)  # token, path, exists
+
+    def check(self, path):
+        token = object()
+        threading.Thread(target=lambda: self.checked.emit(token, path, os.path.exists(path)),
+                         name="PathProbe", daemon=True).start()
+        return token
+
+
+# --- SEARCH ENGINES & SUGGESTIONS ---
+
+class SearchEngine:
+    """A search engine given by OpenSearch-style URL templates."""
+    def __init__(self, name, label, search, suggest=None, keyword=None):
+        self.name = name
+        self.label = label
+        self.search = search
+        self.suggest = suggest
+        self.keyword = keyword
+
+    @staticmethod
+    def _fill(template, terms):
+        return QUrl(template.replace("{searchTerms}", bytes(QUrl.toPercentEncoding(terms)).decode("ascii")),
+                    QUrl.StrictMode)
+
+    def search_url(self, terms):
+        return self._fill(self.search, terms)
+
+    def suggest_url(self, terms):
+        return self._fill(self.suggest, terms) if self.suggest else None
+
+    @staticmethod
+    def parse_suggestions(body):
+        """Returns the suggestions of an OpenSearch response (["query", ["suggestion", ...], ...])."""
+        data = json.loads(body.decode("utf-8"))
+        if not isinstance(data, list) or len(data) < 2 or not isinstance(data[1], list):
+            raise ValueError("not an OpenSearch suggestion response")
+        return [str(item) for item in data[1] if isinstance(item, str)]
+
+
+class SearchEngines:
+    """The built-in engines and those in SEARCH_ENGINES_FILE, with the one chosen in settings."""
+    def __init__(self, settings, path=SEARCH_ENGINES_FILE):
+        self.settings = settings
+        self.engines = OrderedDict(
+            (name, SearchEngine(name, spec["label"], spec["search"], spec.get("suggest"), spec.get("keyword")))
+            for name, spec in SEARCH_ENGINES.items()
+        )
+        try:
+            with open(path, "rb") as f:
+                user_engines = json.loads(f.read().decode("utf-8"))
+            for name, spec in user_engines.items():
+                if "{searchTerms}" not in spec["search"]:
+                    raise ValueError(f"search URL of {name!r} has no {{searchTerms}}")
+                self.engines[name] = SearchEngine(
+                    name, spec.get("label", name), spec["search"], spec.get("suggest"), spec.get("keyword")
+                )
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Search: Could not load {path}: {e}")
+
+    def current(self):
+        return self.engines.get(self.settings.value("search/engine", DEFAULT_SEARCH_ENGINE)) \
+            or self.engines[DEFAULT_SEARCH_ENGINE]
+
+    def select(self, name):
+        if name in self.engines:
+            self.settings.setValue("search/engine", name)
+
+    def keywords(self):
+        """The search-keyword table: keyword -> engine name."""
+        return {engine.keyword: name for name, engine in self.engines.items() if engine.keyword}
+
+    def search_url(self, terms, engine_name=None):
+        """Search URL for `terms` with the named engine, or the current one."""
+        return (self.engines.get(engine_name) or self.current()).search_url(terms)
+
+
+class SuggestionClient(QObject):
+    """
+    Asks the current search engine for suggestions as the user types, without blocking the GUI
+    thread: requests go out once typing pauses for SUGGEST_DEBOUNCE_MS, a request still in flight
+    is aborted when a newer one replaces it, and answers are kept in a TTL + LRU cache per prefix.
+    While a request is pending, the cached answer for a shorter prefix, narrowed, is shown.
+    """
+    suggestionsReady = pyqtSignal(str, list)  # query, suggestions
+
+    def __init__(self, engines, parent=None):
+        super().__init__(parent)
+        self.engines = engines
+        self.network = QNetworkAccessManager(self)
+        self.cache = OrderedDict()  # (engine, query) -> (expires_at, suggestions)
+        self.query = ""
+        self.reply = None
+        self.requests = self.cache_hits = self.cancelled = self.failures = 0
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(SUGGEST_DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self._send)
+
+    @staticmethod
+    def wants_suggestions(text):
+        """Addresses and paths are not sent to the search engine."""
+        return bool(text) and "://" not in text and not text.startswith(("/", "~", "."))
+
+    def request(self, text):
+        """Suggestions for `text` arrive through suggestionsReady, maybe more than once (cached, then fresh)."""
+        self.query = text = text.strip()
+        engine = self.engines.current()
+        if not engine.suggest or not self.wants_suggestions(text):
+            self.cancel()
+            return
+        cached = self._cached((engine.name, text.lower()))
+        if cached is not None:
+            self.cache_hits += 1
+            self._abort()
+            self.debounce_timer.stop()
+            self.suggestionsReady.emit(text, cached)
+            return
+        narrowed = self._narrowed(engine.name, text.lower())
+        if narrowed:
+            self.suggestionsReady.emit(text, narrowed)
+        self.debounce_timer.start()
+
+    def cancel(self):
+        """Drops the pending request (the user navigated or cleared the URL bar)."""
+        self.query = ""
+        self.debounce_timer.stop()
+        self._abort()
+
+    def _cached(self, key):
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return entry[1]
+
+    def _narrowed(self, engine_name, lowered):
+        for end in range(len(lowered) - 1, 0, -1):
+            cached = self._cached((engine_name, lowered[:end]))
+            if cached is not None:
+                return [item for item in cached if item.lower().startswith(lowered)]
+        return None
+
+    def _abort(self):
+        if self.reply is not None:
+            reply, self.reply = self.reply, None
+            self.cancelled += 1
+            reply.abort()
+
+    def _send(self):
+        engine = self.engines.current()
+        self._abort()
+        request = QNetworkRequest(engine.suggest_url(self.query))
+        request.setTransferTimeout(SUGGEST_TIMEOUT_MS)
+        reply = self.reply = self.network.get(request)
+        self.requests += 1
+        text = self.query
+        reply.finished.connect(lambda: self._on_finished(reply, engine.name, text))
+
+    def _on_finished(self, reply, engine_name, text):
+        reply.deleteLater()
+        if reply is not self.reply:
+            return  # Superseded and aborted
+        self.reply = None
+        if reply.error():
+            self.failures += 1
+            return
+        try:
+            suggestions = SearchEngine.parse_suggestions(bytes(reply.readAll()))
+        except ValueError:
+            self.failures += 1
+            return
+        self.cache[(engine_name, text.lower())] = (time.monotonic() + SUGGEST_CACHE_TTL_SECS, suggestions)
+        while len(self.cache) > SUGGEST_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        if text == self.query:
+            self.suggestionsReady.emit(text, suggestions)
+
+
+# --- QUICK LINKS ---
+
+class QuickLinksModel(QAbstractListModel):
+    """
+    The quick links (name, URL) in bar order, persisted as JSON with atomic writes. The built-in
+    links are always present and can be moved but not removed. Changes are written in one
+    batch per QUICK_LINKS_SAVE_DELAY_MS, so adding a link costs the same however many exist.
+    """
+    UrlRole = Qt.UserRole + 1
+    FixedRole = Qt.UserRole + 2
+
+    def __init__(self, path=QUICK_LINKS_FILE, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.links = self._load()
+        self.names = {link["name"] for link in self.links}
+
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(QUICK_LINKS_SAVE_DELAY_MS)
+        self.save_timer.timeout.connect(self.save)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                rows = [(str(row["name"]), str(row["url"])) for row in json.loads(f.read().decode("utf-8"))]
+        except (OSError, ValueError, KeyError, TypeError):
+            rows = []
+        links, seen = [], set()
+        for name, url in rows:
+            if name not in seen:
+                seen.add(name)
+                links.append({"name": name, "url": FIXED_QUICK_LINKS.get(name, url), "fixed": name in FIXED_QUICK_LINKS})
+        missing = [{"name": name, "url": url, "fixed": True} for name, url in FIXED_QUICK_LINKS.items() if name not in seen]
+        return missing + links
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.links)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.links):
+            return None
+        link = self.links[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return link["name"]
+        if role in (self.UrlRole, Qt.ToolTipRole):
+            return link["url"]
+        if role == self.FixedRole:
+            return link["fixed"]
+        return None
+
+    def add_link(self, name, url):
+        """Appends a link, or changes the URL of the link with that name. Returns its row."""
+        if name in self.names:
+            row = next(i for i, link in enumerate(self.links) if link["name"] == name)
+            self.links[row]["url"] = url
+            self.dataChanged.emit(self.index(row), self.index(row))
+        else:
+            row = len(self.links)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.links.append({"name": name, "url": url, "fixed": False})
+            self.names.add(name)
+            self.endInsertRows()
+        self.save_timer.start()
+        return row
+
+    def remove_link(self, row):
+        """Removes a user-added link. Returns False for built-in links."""
+        if not 0 <= row < len(self.links) or self.links[row]["fixed"]:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.names.discard(self.links.pop(row)["name"])
+        self.endRemoveRows()
+        self.save_timer.start()
+        return True
+
+    def move_link(self, row, to):
+        """Moves the link at `row` so that it ends up at `to`."""
+        if row == to or not (0 <= row < len(self.links) and 0 <= to < len(self.links)):
+            return False
+        # Qt counts the destination before the move: one further when moving down
+        if not self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), to + 1 if to > row else to):
+            return False
+        self.links.insert(to, self.links.pop(row))
+        self.endMoveRows()
+        self.save_timer.start()
+        return True
+
+    def save(self):
+        self.save_timer.stop()
+        rows = [{"name": link["name"], "url": link["url"]} for link in self.links]
+        try:
+            atomic_write(self.path, json.dumps(rows, ensure_ascii=False, indent=1).encode("utf-8"))
+        except OSError as e:
+            print(f"Quick Links: Could not save quick links: {e}")
+
+    def flush(self):
+        """Writes pending changes now (at exit)."""
+        if self.save_timer.isActive():
+            self.save()
+
+
+class QuickLinksBar(QWidget):
+    """
+    View of a QuickLinksModel: a button for each leading link that fits, the rest in a "»" menu
+    that is only built when opened. Model changes add, remove or move single buttons, and
+    resizing adds or drops buttons at the end, so no change rebuilds the whole bar.
+    """
+    linkActivated = pyqtSignal(str)
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.buttons = []  # Buttons of rows 0..len-1; the remaining rows are in the overflow menu
+        self.widths = []
+        self.used_width = 0
+
+        self.bar_layout = QHBoxLayout(self)
+        self.bar_layout.setContentsMargins(0, 0, 0, 0)
+        # The bar shows what fits instead of asking for room for every button
+        self.bar_layout.setSizeConstraint(QLayout.SetNoConstraint)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+
+        self.chevron = QToolButton(self)
+        self.chevron.setText("»")
+        self.chevron.setToolTip("More quick links")
+        self.chevron.setPopupMode(QToolButton.InstantPopup)
+        self.overflow_menu = QMenu(self.chevron)
+        self.overflow_menu.aboutToShow.connect(self._fill_overflow_menu)
+        self.chevron.setMenu(self.overflow_menu)
+        self.chevron.hide()
+        self.bar_layout.addWidget(self.chevron)
+        self.bar_layout.addStretch()
+
+        model.rowsInserted.connect(self._on_rows_inserted)
+        model.rowsRemoved.connect(self._on_rows_removed)
+        model.rowsMoved.connect(self._on_rows_moved)
+        model.dataChanged.connect(self._on_data_changed)
+        model.modelReset.connect(lambda: self._drop_buttons_from(0))
+
+    def minimumSizeHint(self):
+        return QSize(0, super().minimumSizeHint().height())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._trim()
+        self._fill()
+
+    def _available_width(self):
+        return self.width() - self.chevron.sizeHint().width()
+
+    def _build_button(self, row):
+        index = self.model.index(row)
+        button = QPushButton(index.data(Qt.DisplayRole), self)
+        button.setToolTip(index.data(QuickLinksModel.UrlRole))
+        button.clicked.connect(lambda checked, b=button: self.linkActivated.emit(
+            self.model.index(self.buttons.index(b)).data(QuickLinksModel.UrlRole)))
+        button.setContextMenuPolicy(Qt.CustomContextMenu)
+        button.customContextMenuRequested.connect(lambda pos, b=button: self._show_button_menu(b, pos))
+        return button, button.sizeHint().width() + self.bar_layout.spacing()
+
+    def _place(self, row, button, width):
+        self.buttons.insert(row, button)
+        self.widths.insert(row, width)
+        self.used_width += width
+        self.bar_layout.insertWidget(row, button)
+
+    def _remove_button(self, row):
+        button = self.buttons.pop(row)
+        self.used_width -= self.widths.pop(row)
+        self.bar_layout.removeWidget(button)
+        button.deleteLater()
+
+    def _drop_buttons_from(self, row):
+        while len(self.buttons) > row:
+            self._remove_button(len(self.buttons) - 1)
+        self._fill()
+
+    def _fill(self):
+        """Adds buttons for the following rows while they fit."""
+        available = self._available_width()
+        while len(self.buttons) < self.model.rowCount():
+            button, width = self._build_button(len(self.buttons))
+            if self.used_width + width > available:
+                button.deleteLater()
+                break
+            self._place(len(self.buttons), button, width)
+        self._update_chevron()
+
+    def _trim(self):
+        """Moves trailing buttons to the overflow menu until the rest fit."""
+        available = self._available_width()
+        while self.buttons and self.used_width > available:
+            self._remove_button(len(self.buttons) - 1)
+        self._update_chevron()
+
+    def _update_chevron(self):
+        self.chevron.setVisible(len(self.buttons) < self.model.rowCount())
+
+    def _on_rows_inserted(self, parent, first, last):
+        if first < len(self.buttons):
+            for row in range(first, last + 1):
+                self._place(row, *self._build_button(row))
+            self._trim()
+        elif first == len(self.buttons):
+            self._fill()
+        else:
+            # Inserted after rows that are already in the overflow menu: no button changes
+            self._update_chevron()
+
+    def _on_rows_removed(self, parent, first, last):
+        for row in reversed(range(first, min(last + 1, len(self.buttons)))):
+            self._remove_button(row)
+        self._fill()
+
+    def _on_rows_moved(self, parent, start, end, destination, row):
+        # Buttons before the moved range and its destination stay where they are
+        self._drop_buttons_from(min(start, row))
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        for row in range(top_left.row(), min(bottom_right.row() + 1, len(self.buttons))):
+            index = self.model.index(row)
+            button = self.buttons[row]
+            button.setText(index.data(Qt.DisplayRole))
+            button.setToolTip(index.data(QuickLinksModel.UrlRole))
+            width = button.sizeHint().width() + self.bar_layout.spacing()
+            self.used_width += width - self.widths[row]
+            self.widths[row] = width
+        self._trim()
+        self._fill()
+
+    def _fill_overflow_menu(self):
+        self.overflow_menu.clear()
+        for row in range(len(self.buttons), self.model.rowCount()):
+            index = self.model.index(row)
+            url = index.data(QuickLinksModel.UrlRole)
+            action = self.overflow_menu.addAction(index.data(Qt.DisplayRole))
+            action.setToolTip(url)
+            action.triggered.connect(lambda checked, url=url: self.linkActivated.emit(url))
+
+    def _show_button_menu(self, button, pos):
+        row = self.buttons.index(button)
+        menu = QMenu(self)
+        move_left = menu.addAction("Move Left")
+        move_left.setEnabled(row > 0)
+        move_right = menu.addAction("Move Right")
+        move_right.setEnabled(row < self.model.rowCount() - 1)
+        remove = menu.addAction("Remove")
+        remove.setEnabled(not self.model.index(row).data(QuickLinksModel.FixedRole))
+        chosen = menu.exec_(button.mapToGlobal(pos))
+        if chosen is move_left:
+            self.model.move_link(row, row - 1)
+        elif chosen is move_right:
+            self.model.move_link(row, row + 1)
+        elif chosen is remove:
+            self.model.remove_link(row)
+
+
+class AddLinkDialog(QDialog):
+    """Dialog for adding a new Quick Link."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Add Quick Link ➕")
+        self.link_name = None
+        self.link_url = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QGridLayout(self)
+        self.name_input = QLineEdit()
+        self.url_input = QLineEdit()
+        self.url_input.setPlaceholderText("https://example.com (must start with http/https)")
+        
+        layout.addWidget(QLabel("Icon/Name:"), 0, 0)
+        layout.addWidget(self.name_input, 0, 1)
+        layout.addWidget(QLabel("URL:"), 1, 0)
+        layout.addWidget(self.url_input, 1, 1)
+
+        ok_button = QPushButton("Add Link")
+        ok_button.clicked.connect(self.validate_and_accept)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(cancel_button)
+        button_layout.addWidget(ok_button)
+        
+        layout.addLayout(button_layout, 2, 0, 1, 2)
+        
+    def validate_and_accept(self):
+        name = self.name_input.text().strip()
+        url = self.url_input.text().strip()
+
+        if not name:
+            QMessageBox.warning(self, "Input Error", "Please enter a name/icon for the link.")
+            return
+        if not url or not (url.startswith('http://') or url.startswith('https://')):
+            QMessageBox.warning(self, "Input Error", "Please enter a valid URL starting with http:// or https://.")
+            return
+
+        self.link_name = name
+        self.link_url = url
+        self.accept()
+
+
+# --- TASK MANAGER ---
+
+class TabMetricsSampler:
+    """
+    Samples per-tab metrics (lifecycle state, last load time, renderer PID, RSS and CPU) for
+    the task manager and the JSONL export. CPU usage is measured between successive samples,
+    and processes shared by several tabs are read once.
+    """
+    def __init__(self, tabs, lifecycle):
+        self.tabs = tabs
+        self.lifecycle = lifecycle
+        self._cpu = {}  # pid -> (cpu_secs, monotonic) at the previous sample
+
+    def sample(self):
+        now = time.monotonic()
+        processes = {}
+        rows = []
+        for i in range(self.tabs.count()):
+            tab_widget = self.tabs.widget(i)
+            if tab_widget.is_placeholder():
+                pid, url = 0, tab_widget.placeholder.get("url", "")
+            else:
+                pid, url = tab_widget.browser.page().renderProcessPid(), tab_widget.browser.url().toString()
+
+            if pid and pid not in processes:
+                cpu_secs = read_process_cpu_secs(pid)
+                previous = self._cpu.get(pid)
+                cpu_percent = 0.0
+                if previous and now > previous[1]:
+                    cpu_percent = max(0.0, (cpu_secs - previous[0]) / (now - previous[1]) * 100)
+                self._cpu[pid] = (cpu_secs, now)
+                processes[pid] = (read_process_rss_kb(pid), cpu_percent)
+            rss_kb, cpu_percent = processes.get(pid, (0, 0.0))
+
+            rows.append({
+                "tab_id": tab_widget.tab_id,
+                "title": self.tabs.tabText(i),
+                "url": url,
+                "state": self.lifecycle.state_of(tab_widget),
+                "load_ms": tab_widget.last_load_ms,
+                "pid": pid,
+                "rss_kb": rss_kb,
+                "cpu_percent": round(cpu_percent, 1),
+            })
+        self._cpu = {pid: value for pid, value in self._cpu.items() if pid in processes}
+        return rows
+
+    @staticmethod
+    def to_jsonl(rows):
+        """One JSON object per tab, stamped with the sampling time."""
+        timestamp = round(time.time(), 3)
+        return "".join(json.dumps({"ts": timestamp, **row}) + "\n" for row in rows)
+
+
+class TaskManagerDialog(QDialog):
+    """Lists every tab with its load time, renderer process, memory, CPU and lifecycle state."""
+    COLUMNS = ("Tab", "State", "Load (ms)", "PID", "Memory (MB)", "CPU %")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Task Manager 📊")
+        self.browser_window = parent
+        self.sampler = TabMetricsSampler(parent.tabs, parent.lifecycle)
+        self.rows = []
+        self.setup_ui()
+        self.resize(720, 420)
+
+        # Refreshes only while the dialog is open; /proc is read once per renderer process
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(TASK_MANAGER_REFRESH_MS)
+        self.finished.connect(self.refresh_timer.stop)
+        self.refresh()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        reload_btn = QPushButton("Reload Tab")
+        reload_btn.clicked.connect(self.reload_selected)
+        kill_btn = QPushButton("Kill Renderer")
+        kill_btn.clicked.connect(self.kill_selected)
+        export_btn = QPushButton("Export JSONL…")
+        export_btn.clicked.connect(self.export_jsonl)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(reload_btn)
+        button_layout.addWidget(kill_btn)
+        button_layout.addStretch()
+        button_layout.addWidget(export_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        selected = self.selected_row()
+        self.rows = self.sampler.sample()
+        self.table.setRowCount(len(self.rows))
+        for r, row in enumerate(self.rows):
+            values = (
+                row["title"],
+                row["state"],
+                "" if row["load_ms"] is None else f"{row['load_ms']:.0f}",
+                str(row["pid"] or ""),
+                f"{row['rss_kb'] / 1024:.1f}" if row["rss_kb"] else "",
+                f"{row['cpu_percent']:.1f}" if row["pid"] else "",
+            )
+            for c, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if c == 0:
+                    item.setToolTip(row["url"])
+                else:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(r, c, item)
+            if selected and row["tab_id"] == selected["tab_id"]:
+                self.table.selectRow(r)
+
+    def selected_row(self):
+        r = self.table.currentRow()
+        return self.rows[r] if 0 <= r < len(self.rows) and self.table.selectedItems() else None
+
+    def _selected_tab(self):
+        row = self.selected_row()
+        return self.browser_window.tabs.tab_by_id(row["tab_id"]) if row else None
+
+    def reload_selected(self):
+        tab_widget = self._selected_tab()
+        if tab_widget is None:
+            return
+        if tab_widget.is_placeholder():
+            # Loading a restored tab is what activating it does
+            self.browser_window.tabs.setCurrentWidget(tab_widget)
+        else:
+            self.browser_window.lifecycle.activate(tab_widget)
+            tab_widget.browser.reload()
+        self.refresh()
+
+    def kill_selected(self):
+        row = self.selected_row()
+        if not row or not row["pid"]:
+            return
+        sharing = sum(1 for other in self.rows if other["pid"] == row["pid"])
+        message = f"End renderer process {row['pid']}?"
+        if sharing > 1:
+            message += f" It is shared by {sharing} tabs, which will all stop."
+        if QMessageBox.question(self, "Kill Renderer", message) != QMessageBox.Yes:
+            return
+        try:
+            os.kill(row["pid"], signal.SIGTERM)
+        except OSError as e:
+            QMessageBox.warning(self, "Kill Renderer", f"Could not end process {row['pid']}: {e}")
+        self.refresh()
+
+    def export_jsonl(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Tab Metrics", "tab-metrics.jsonl", "JSON Lines (*.jsonl)")
+        if not path:
+            return
+        try:
+            with open(path, "a") as f:
+                f.write(TabMetricsSampler.to_jsonl(self.rows))
+        except OSError as e:
+            QMessageBox.warning(self, "Export Tab Metrics", f"Could not write {path}: {e}")
+
+
+# --- DOWNLOADS ---
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(count) < 1024 or unit == "GB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+
+
+class Download:
+    """One download: its QWebEngineDownloadItem and the manager's bookkeeping."""
+    def __init__(self, download_id, item, limit_bps):
+        self.id = download_id
+        self.item = item
+        self.file_name = os.path.basename(item.path())
+        self.url = item.url().toString()
+        self.state = "queued"  # queued, active, paused, completed, cancelled or failed
+        self.limit_bps = limit_bps  # 0 = only the global limit applies
+        self.throttled = False  # Paused by the rate limiter rather than by the user
+        self.tokens = 0.0
+        self.received = 0
+        self.total = item.totalBytes()  # -1 while unknown
+        self.rate_bps = 0.0
+        self.error = ""
+
+
+class DownloadManager(QObject):
+    """
+    Takes the profile's downloads (page saves are left to SnapshotCache). At most `max_active`
+    transfer at once and the rest wait, paused, in a FIFO queue. Per-download and global rate
+    limits are token buckets refilled every DOWNLOAD_TICK_MS: a transfer that has used up its
+    budget is paused until the budget refills. Progress is read on the same tick rather than
+    per downloadProgress signal, and `changed` fires at most every DOWNLOAD_UI_INTERVAL_MS.
+    """
+    added = pyqtSignal(object)  # Download
+    changed = pyqtSignal()
+    UNFINISHED = ("queued", "active", "paused")
+
+    def __init__(self, profile, settings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.directory = settings.value("downloads/dir", DOWNLOADS_DIR)
+        self.max_active = int(settings.value("downloads/max_active", DOWNLOAD_MAX_ACTIVE))
+        self.global_limit_bps = int(settings.value("downloads/global_limit_kbps", DOWNLOAD_GLOBAL_LIMIT_KBPS)) * 1024
+        self.default_limit_bps = int(settings.value("downloads/limit_kbps", DOWNLOAD_LIMIT_KBPS)) * 1024
+        self.downloads = OrderedDict()  # id -> Download, oldest first
+        self.active = []
+        self.queue = deque()
+        self.global_tokens = 0.0
+        self.ids = itertools.count(1)
+        self.last_tick = time.monotonic()
+
+        self.tick_timer = QTimer(self)
+        self.tick_timer.setInterval(DOWNLOAD_TICK_MS)
+        self.tick_timer.timeout.connect(self._tick)
+        self.ui_timer = QTimer(self)
+        self.ui_timer.setSingleShot(True)
+        self.ui_timer.setInterval(DOWNLOAD_UI_INTERVAL_MS)
+        self.ui_timer.timeout.connect(self.changed.emit)
+        profile.downloadRequested.connect(self._on_download_requested)
+
+    def _on_download_requested(self, item):
+        if item.isSavePageDownload() or item.state() != QWebEngineDownloadItem.DownloadRequested:
+            return
+        item.setPath(self._unique_path(os.path.basename(item.path()) or "download"))
+        download = Download(next(self.ids), item, self.default_limit_bps)
+        self.downloads[download.id] = download
+        item.finished.connect(lambda: self._on_finished(download))
+        item.accept()
+        if len(self.active) < self.max_active:
+            self._activate(download)
+        else:
+            item.pause()
+            self.queue.append(download)
+        self.added.emit(download)
+        self._schedule_changed()
+
+    def _unique_path(self, name):
+        """`name` in the download directory, numbered like "name (2).ext" if taken on disk or by another download."""
+        os.makedirs(self.directory, exist_ok=True)
+        taken = {d.item.path() for d in self.downloads.values() if d.state in self.UNFINISHED}
+        stem, ext = os.path.splitext(name)
+        path = os.path.join(self.directory, name)
+        n = 1
+        while path in taken or os.path.exists(path):
+            n += 1
+            path = os.path.join(self.directory, f"{stem} ({n}){ext}")
+        return path
+
+    def _activate(self, download):
+        download.state = "active"
+        download.throttled = False
+        download.tokens = 0.0
+        self.active.append(download)
+        download.item.resume()
+        if not self.tick_timer.isActive():
+            self.last_tick = time.monotonic()
+            self.tick_timer.start()
+
+    def _start_queued(self):
+        while self.queue and len(self.active) < self.max_active:
+            self._activate(self.queue.popleft())
+
+    def _tick(self):
+        now = time.monotonic()
+        elapsed = max(now - self.last_tick, 1e-3)
+        self.last_tick = now
+        # Buckets hold at most half a second of budget, so a limit cannot be exceeded in bursts
+        if self.global_limit_bps:
+            self.global_tokens = min(self.global_tokens + self.global_limit_bps * elapsed, self.global_limit_bps / 2)
+        for download in self.active:
+            item = download.item
+            received = item.receivedBytes()
+            delta = received - download.received
+            download.received = received
+            download.total = item.totalBytes()
+            download.rate_bps += (delta / elapsed - download.rate_bps) * 0.3
+            if download.limit_bps:
+                download.tokens = min(download.tokens + download.limit_bps * elapsed, download.limit_bps / 2) - delta
+            self.global_tokens -= delta
+
+        global_budget = not self.global_limit_bps or self.global_tokens >= 0
+        for download in self.active:
+            within = global_budget and (not download.limit_bps or download.tokens >= 0)
+            if within and download.throttled:
+                download.throttled = False
+                download.item.resume()
+            elif not within and not download.throttled:
+                download.throttled = True
+                download.item.pause()
+
+        if not self.global_limit_bps:
+            self.global_tokens = 0.0
+        if not self.active:
+            self.tick_timer.stop()
+        self._schedule_changed()
+
+    def _schedule_changed(self):
+        if not self.ui_timer.isActive():
+            self.ui_timer.start()
+
+    def _on_finished(self, download):
+        item = download.item
+        if download in self.active:
+            self.active.remove(download)
+        elif download in self.queue:
+            self.queue.remove(download)
+        download.received = item.receivedBytes()
+        download.rate_bps = 0.0
+        state = item.state()
+        if state == QWebEngineDownloadItem.DownloadCompleted:
+            download.state = "completed"
+            download.total = download.received
+        elif state == QWebEngineDownloadItem.DownloadCancelled:
+            download.state = "cancelled"
+        else:
+            download.state = "failed"
+            download.error = item.interruptReasonString()
+            print(f"Downloads: {download.file_name} failed: {download.error}")
+        self._start_queued()
+        self._schedule_changed()
+
+    def pause(self, download_id):
+        download = self.downloads.get(download_id)
+        if download is None:
+            return
+        if download.state == "active":
+            self.active.remove(download)
+            if not download.throttled:
+                download.item.pause()
+            self._start_queued()
+        elif download.state == "queued":
+            self.queue.remove(download)
+        else:
+            return
+        download.state = "paused"
+        download.rate_bps = 0.0
+        self._schedule_changed()
+
+    def resume(self, download_id):
+        download = self.downloads.get(download_id)
+        if download is None or download.state != "paused":
+            return
+        if len(self.active) < self.max_active:
+            self._activate(download)
+        else:
+            download.state = "queued"
+            self.queue.append(download)
+        self._schedule_changed()
+
+    def cancel(self, download_id):
+        download = self.downloads.get(download_id)
+        if download is not None and download.state in self.UNFINISHED:
+            download.item.cancel()  # finished follows
+
+    def set_limit(self, download_id, kbps):
+        download = self.downloads.get(download_id)
+        if download is not None:
+            download.limit_bps = max(0, kbps) * 1024
+            download.tokens = 0.0
+
+    def set_global_limit(self, kbps):
+        self.global_limit_bps = max(0, kbps) * 1024
+        self.global_tokens = 0.0
+        self.settings.setValue("downloads/global_limit_kbps", max(0, kbps))
+
+    def clear_finished(self):
+        for download_id in [d.id for d in self.downloads.values() if d.state not in self.UNFINISHED]:
+            del self.downloads[download_id]
+        self._schedule_changed()
+
+    def summary(self):
+        """Aggregate progress of the unfinished downloads; `total` is None while any size is unknown."""
+        counts = dict.fromkeys(("queued", "active", "paused", "completed", "cancelled", "failed"), 0)
+        received = total = 0
+        rate = 0.0
+        sizes_known = True
+        for download in self.downloads.values():
+            counts[download.state] += 1
+            if download.state in self.UNFINISHED:
+                received += download.received
+                rate += download.rate_bps
+                if download.total > 0:
+                    total += download.total
+                else:
+                    sizes_known = False
+        total = total if sizes_known else None
+        return {
+            **counts,
+            "received": received,
+            "total": total,
+            "rate_bps": rate,
+            "eta_secs": (total - received) / rate if total is not None and rate > 0 else None,
+        }
+
+
+class DownloadsDialog(QDialog):
+    """Lists the downloads with their progress, speed and limit; refreshed on DownloadManager.changed."""
+    COLUMNS = ("File", "State", "Progress", "Speed", "Limit (KB/s)")
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Downloads ⬇")
+        self.manager = manager
+        self.rows = []
+        self.setup_ui()
+        self.resize(720, 380)
+        manager.changed.connect(self.refresh)
+        self.refresh()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        layout.addWidget(self.table)
+
+        limit_layout = QHBoxLayout()
+        limit_layout.addWidget(QLabel("Total limit (KB/s, 0 = none):"))
+        self.global_limit_spin = QSpinBox()
+        self.global_limit_spin.setRange(0, 10 * 1024 * 1024)
+        self.global_limit_spin.setValue(self.manager.global_limit_bps // 1024)
+        self.global_limit_spin.editingFinished.connect(
+            lambda: self.manager.set_global_limit(self.global_limit_spin.value())
+        )
+        limit_layout.addWidget(self.global_limit_spin)
+        limit_layout.addStretch()
+        self.summary_label = QLabel()
+        limit_layout.addWidget(self.summary_label)
+        layout.addLayout(limit_layout)
+
+        button_layout = QHBoxLayout()
+        for text, handler in (("Pause", self.manager.pause), ("Resume", self.manager.resume),
+                              ("Cancel", self.manager.cancel)):
+            button = QPushButton(text)
+            button.clicked.connect(lambda checked, handler=handler: self._on_selected(handler))
+            button_layout.addWidget(button)
+        limit_btn = QPushButton("Limit…")
+        limit_btn.clicked.connect(self.limit_selected)
+        button_layout.addWidget(limit_btn)
+        button_layout.addStretch()
+        folder_btn = QPushButton("Open Folder")
+        folder_btn.clicked.connect(lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(self.manager.directory)))
+        clear_btn = QPushButton("Clear Finished")
+        clear_btn.clicked.connect(self.manager.clear_finished)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        button_layout.addWidget(folder_btn)
+        button_layout.addWidget(clear_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+    def refresh(self):
+        selected = self.selected_download()
+        self.rows = list(self.manager.downloads.values())
+        self.table.setRowCount(len(self.rows))
+        for r, download in enumerate(self.rows):
+            if download.total > 0:
+                progress = f"{download.received * 100 // download.total}% of {format_bytes(download.total)}"
+            else:
+                progress = format_bytes(download.received)
+            state = download.state + (" (limited)" if download.throttled and download.state == "active" else "")
+            values = (
+                download.file_name,
+                download.error or state,
+                progress,
+                f"{format_bytes(download.rate_bps)}/s" if download.state == "active" else "",
+                str(download.limit_bps // 1024) if download.limit_bps else "",
+            )
+            for c, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if c == 0:
+                    item.setToolTip(download.url)
+                elif c > 1:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(r, c, item)
+            if download is selected:
+                self.table.selectRow(r)
+        summary = self.manager.summary()
+        self.summary_label.setText(
+            f"{summary['active']} active, {summary['queued']} queued · {format_bytes(summary['rate_bps'])}/s"
+        )
+
+    def selected_download(self):
+        r = self.table.currentRow()
+        return self.rows[r] if 0 <= r < len(self.rows) and self.table.selectedItems() else None
+
+    def _on_selected(self, handler):
+        download = self.selected_download()
+        if download is not None:
+            handler(download.id)
+
+    def limit_selected(self):
+        download = self.selected_download()
+        if download is None:
+            return
+        kbps, ok = QInputDialog.getInt(self, "Download Limit", "KB/s for this download (0 = none):",
+                                       download.limit_bps // 1024, 0, 10 * 1024 * 1024)
+        if ok:
+            self.manager.set_limit(download.id, kbps)
+
+
+# --- TAB OVERVIEW ---
+
+class ThumbnailCache(QObject):
+    """
+    Page thumbnails keyed by URL: a byte-bounded LRU of QImages in memory over a size-bounded LRU
+    of JPEG files. The GUI thread only grabs the part of the view a thumbnail shows and shrinks it
+    with a fast nearest-pixel pass; smooth scaling, encoding, disk reads and writes happen on one
+    worker thread, which reports finished thumbnails through thumbnailReady.
+    Lookups never touch the page, so tabs without a renderer keep their last thumbnail.
+    """
+    thumbnailReady = pyqtSignal(str, QImage)  # key, image
+
+    def __init__(self, directory=THUMBNAIL_DIR, memory_mb=THUMBNAIL_MEMORY_MB, disk_mb=THUMBNAIL_DISK_MB, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.disk_bytes = disk_mb * 1024 * 1024
+        self.images = OrderedDict()  # key -> QImage, least recently used first
+        self.used_bytes = 0
+        self.captured_at = {}  # key -> monotonic() of the last capture
+        self.loading = set()  # Keys asked of the worker: being read from disk, or not there until captured
+        self.captures = self.hits = self.disk_loads = 0
+        self.thumbnailReady.connect(self._on_ready)
+
+        os.makedirs(directory, exist_ok=True)
+        self.jobs = queue.Queue()
+        self.worker = threading.Thread(target=self._work_loop, name="Thumbnails", daemon=True)
+        self.worker.start()
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(url.split("#", 1)[0].encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + ".jpg")
+
+    def capture(self, view):
+        """Grabs what `view` last showed at reduced size; the smooth scaling and saving happen on the worker thread."""
+        url = view.url().toString()
+        if not url:
+            return
+        key = self.key(url)
+        if time.monotonic() - self.captured_at.get(key, -THUMBNAIL_REFRESH_SECS) < THUMBNAIL_REFRESH_SECS:
+            return
+        # Only the top-left region with the thumbnail's aspect ratio ends up in the thumbnail
+        width, height = view.width(), view.height()
+        if width * THUMBNAIL_HEIGHT > height * THUMBNAIL_WIDTH:
+            width = max(1, height * THUMBNAIL_WIDTH // THUMBNAIL_HEIGHT)
+        else:
+            height = max(1, width * THUMBNAIL_HEIGHT // THUMBNAIL_WIDTH)
+        pixmap = view.grab(QRect(0, 0, width, height))
+        if pixmap.isNull():
+            return
+        self.captured_at[key] = time.monotonic()
+        self.captures += 1
+        image = pixmap.toImage()
+        if image.width() > THUMBNAIL_CAPTURE_SCALE * THUMBNAIL_WIDTH:
+            image = image.scaled(THUMBNAIL_CAPTURE_SCALE * THUMBNAIL_WIDTH, THUMBNAIL_CAPTURE_SCALE * THUMBNAIL_HEIGHT,
+                                 Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        self.store(url, image)
+
+    def store(self, url, image):
+        """Queues a page image of any size to become the thumbnail of `url`."""
+        self.jobs.put(("store", self.key(url), image))
+
+    def thumbnail(self, url):
+        """
+        The thumbnail for `url` if it is in memory. Otherwise None, and a copy on disk arrives
+        later through thumbnailReady.
+        """
+        key = self.key(url)
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            self.images.move_to_end(key)
+            return image
+        if key not in self.loading:
+            self.loading.add(key)
+            self.jobs.put(("load", key, None))
+        return None
+
+    def _on_ready(self, key, image):
+        self.loading.discard(key)
+        old = self.images.pop(key, None)
+        if old is not None:
+            self.used_bytes -= old.sizeInBytes()
+        self.images[key] = image
+        self.used_bytes += image.sizeInBytes()
+        while self.used_bytes > self.memory_bytes and len(self.images) > 1:
+            _, evicted = self.images.popitem(last=False)
+            self.used_bytes -= evicted.sizeInBytes()
+
+    def _work_loop(self):
+        # The worker owns the disk cache: file sizes in LRU order, by modification time
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        disk = OrderedDict((key, size) for _, key, size in sorted(files))
+        disk_used = sum(disk.values())
+
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            action, key, image = job
+            path = self.path_for(key)
+            if action == "load":
+                if key not in disk:
+                    continue
+                image = QImage(path)
+                if image.isNull():
+                    continue
+                self.disk_loads += 1
+                disk.move_to_end(key)
+                self.thumbnailReady.emit(key, image)
+                continue
+
+            image = image.scaled(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+            image = image.copy(0, 0, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT).convertToFormat(QImage.Format_RGB32)
+            self.thumbnailReady.emit(key, image)
+            try:
+                if not image.save(path + ".part", "JPG", 80):
+                    continue
+                os.replace(path + ".part", path)
+                size = os.path.getsize(path)
+            except OSError as e:
+                print(f"Thumbnails: Could not save {path}: {e}")
+                continue
+            disk_used -= disk.pop(key, 0)
+            disk[key] = size
+            disk_used += size
+            while disk_used > self.disk_bytes and len(disk) > 1:
+                evicted, size = disk.popitem(last=False)
+                disk_used -= size
+                try:
+                    os.remove(self.path_for(evicted))
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {
+            "in_memory": len(self.images),
+            "memory_bytes": self.used_bytes,
+            "captures": self.captures,
+            "hits": self.hits,
+            "disk_loads": self.disk_loads,
+        }
+
+    def close(self):
+        """Finishes pending saves and stops the worker thread."""
+        self.jobs.put(None)
+        self.worker.join(timeout=5)
+
+
+class TabOverviewDialog(QDialog):
+    """
+    A grid of every tab with its thumbnail and title, filtered as you type. Activating an entry
+    switches to that tab; Delete closes it. Tabs without a thumbnail yet show a blank card.
+    """
+    def __init__(self, browser_window):
+        super().__init__(browser_window)
+        self.setWindowTitle("All Tabs ▦")
+        self.browser_window = browser_window
+        self.thumbnails = browser_window.thumbnails
+        self.items = {}  # thumbnail key -> [QListWidgetItem]
+        blank = QPixmap(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
+        blank.fill(self.palette().color(QPalette.Base))
+        self.blank_icon = QIcon(blank)
+        self.setup_ui()
+        self.resize(1080, 720)
+        self.thumbnails.thumbnailReady.connect(self._on_thumbnail_ready)
+        self.populate()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter tabs by title or address")
+        self.filter_edit.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.filter_edit)
+
+        self.grid = QListWidget()
+        self.grid.setViewMode(QListView.IconMode)
+        self.grid.setIconSize(QSize(THUMBNAIL_WIDTH * 3 // 4, THUMBNAIL_HEIGHT * 3 // 4))
+        self.grid.setGridSize(QSize(THUMBNAIL_WIDTH * 3 // 4 + 24, THUMBNAIL_HEIGHT * 3 // 4 + 48))
+        self.grid.setResizeMode(QListView.Adjust)
+        self.grid.setMovement(QListView.Static)
+        self.grid.setUniformItemSizes(True)
+        self.grid.setWordWrap(True)
+        self.grid.itemActivated.connect(self.activate_item)
+        layout.addWidget(self.grid)
+
+    def populate(self):
+        tabs = self.browser_window.tabs
+        current = tabs.currentWidget()
+        for i in range(tabs.count()):
+            tab_widget = tabs.widget(i)
+            # Placeholders and discarded tabs are described by what they remember, no renderer is woken
+            if tab_widget.is_placeholder():
+                url = tab_widget.placeholder.get("url", "")
+            else:
+                url = tab_widget.browser.url().toString()
+            item = QListWidgetItem(tabs.tabText(i))
+            item.setToolTip(url)
+            item.setData(Qt.UserRole, tab_widget.tab_id)
+            image = self.thumbnails.thumbnail(url) if url else None
+            item.setIcon(QIcon(QPixmap.fromImage(image)) if image is not None else self.blank_icon)
+            self.items.setdefault(self.thumbnails.key(url), []).append(item)
+            self.grid.addItem(item)
+            if tab_widget is current:
+                self.grid.setCurrentItem(item)
+
+    def _on_thumbnail_ready(self, key, image):
+        for item in self.items.get(key, ()):
+            item.setIcon(QIcon(QPixmap.fromImage(image)))
+
+    def apply_filter(self, text):
+        needle = text.strip().lower()
+        for i in range(self.grid.count()):
+            item = self.grid.item(i)
+            item.setHidden(bool(needle) and needle not in item.text().lower() and needle not in item.toolTip().lower())
+
+    def activate_item(self, item):
+        tab_widget = self.browser_window.tabs.tab_by_id(item.data(Qt.UserRole))
+        if tab_widget is not None:
+            self.browser_window.tabs.setCurrentWidget(tab_widget)
+        self.accept()
+
+    def keyPressEvent(self, event):
+        item = self.grid.currentItem()
+        if event.key() == Qt.Key_Delete and item is not None:
+            tabs = self.browser_window.tabs
+            tab_widget = tabs.tab_by_id(item.data(Qt.UserRole))
+            if tab_widget is not None and tabs.count() > 1:
+                self.browser_window.close_current_tab(tabs.index_of(tab_widget))
+                self.grid.takeItem(self.grid.row(item))
+            return
+        super().keyPressEvent(event)
+
+
+# --- DEVELOPER TOOLS ---
+
+class DevToolsManager(QObject):
+    """
+    Owns the inspector views. Nothing is created until DevTools is first opened. The docked
+    inspector follows the current tab and is destroyed, freeing its renderer, once it has
+    been closed for `dispose_after_secs`. Detached inspectors are one window per page and
+    close together with the tab they inspect.
+    """
+    dockedVisibilityChanged = pyqtSignal(bool)
+
+    def __init__(self, splitter, dispose_after_secs=DEVTOOLS_DISPOSE_AFTER_SECS, parent=None):
+        super().__init__(parent)
+        self.splitter = splitter
+        self.docked_view = None
+        self.inspected_page = None
+        self.detached = {}  # inspected QWebEnginePage -> its top-level inspector view
+
+        self.dispose_timer = QTimer(self)
+        self.dispose_timer.setSingleShot(True)
+        self.dispose_timer.setInterval(int(dispose_after_secs * 1000))
+        self.dispose_timer.timeout.connect(self.dispose_docked)
+
+    def is_docked_open(self):
+        return self.docked_view is not None and not self.docked_view.isHidden()
+
+    def open_docked(self, page):
+        self.dispose_timer.stop()
+        if self.docked_view is None:
+            self.docked_view = QWebEngineView()
+            self.splitter.addWidget(self.docked_view)
+        self.inspect_in_dock(page)
+        self.docked_view.show()
+        self.splitter.setSizes([700, 300])
+        self.dockedVisibilityChanged.emit(True)
+
+    def inspect_in_dock(self, page):
+        """Points the docked inspector at `page`, unless that page has a window of its own."""
+        if page is self.inspected_page or page in self.detached:
+            return
+        self._release_inspected_page()
+        page.setDevToolsPage(self.docked_view.page())
+        self.inspected_page = page
+
+    def close_docked(self):
+        """Hides the docked inspector; it is destroyed if it stays closed."""
+        if not self.is_docked_open():
+            return
+        self._release_inspected_page()
+        self.docked_view.hide()
+        self.splitter.setSizes([1000, 0])
+        self.dispose_timer.start()
+        self.dockedVisibilityChanged.emit(False)
+
+    def dispose_docked(self):
+        if self.docked_view is None:
+            return
+        self.close_docked()
+        self.dispose_timer.stop()
+        self.docked_view.deleteLater()
+        self.docked_view = None
+
+    def _release_inspected_page(self):
+        if self.inspected_page is not None and not sip.isdeleted(self.inspected_page):
+            self.inspected_page.setDevToolsPage(None)
+        self.inspected_page = None
+
+    def open_detached(self, page, title=""):
+        """Inspects `page` in its own window, moving it out of the dock if needed."""
+        view = self.detached.get(page)
+        if view is not None:
+            view.raise_()
+            view.activateWindow()
+            return
+        if page is self.inspected_page:
+            self.close_docked()
+
+        view = QWebEngineView()
+        view.setAttribute(Qt.WA_DeleteOnClose)
+        view.setWindowTitle(f"DevTools - {title}" if title else "DevTools")
+        view.resize(900, 600)
+        page.setDevToolsPage(view.page())
+        # Closing the tab closes its inspector; closing the inspector forgets it
+        page.destroyed.connect(view.close)
+        view.destroyed.connect(lambda _=None, inspected=page: self.detached.pop(inspected, None))
+        self.detached[page] = view
+        view.show()
+
+    def has_inspectors(self):
+        return self.docked_view is not None or bool(self.detached)
+
+    def dispose_all(self):
+        """Destroys every inspector, docked and detached."""
+        self.dispose_docked()
+        for view in list(self.detached.values()):
+            view.close()
+
+
+# --- STARTUP PROFILING ---
+
+class StartupProfiler:
+    """
+    Records startup phases as Chrome trace events (load the file in chrome://tracing or
+    Perfetto). Without a path the phases are still timed but nothing is written.
+    """
+    def __init__(self, path=None, origin=PROCESS_STARTED):
+        self.path = os.path.abspath(path) if path else None
+        self.origin = origin
+        self.events = []
+
+    def _us(self, t):
+        return round((t - self.origin) * 1e6)
+
+    def add(self, name, started, ended):
+        self.events.append({
+            "name": name, "cat": "startup", "ph": "X", "pid": os.getpid(), "tid": 1,
+            "ts": self._us(started), "dur": self._us(ended) - self._us(started),
+        })
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started, time.perf_counter())
+
+    def mark(self, name):
+        """Records a point in time, e.g. the first painted frame."""
+        self.events.append({
+            "name": name, "cat": "startup", "ph": "i", "s": "p", "pid": os.getpid(), "tid": 1,
+            "ts": self._us(time.perf_counter()),
+        })
+
+    def write(self):
+        if not self.path or not self.events:
+            return
+        atomic_write(self.path, json.dumps({"traceEvents": self.events, "displayTimeUnit": "ms"}).encode())
+        print(f"Startup trace written to {self.path}")
+        for event in self.events:
+            duration = f" ({event['dur'] / 1000:.1f} ms)" if "dur" in event else ""
+            print(f"  {event['ts'] / 1000:8.1f} ms  {event['name']}{duration}")
+        self.events = []
+
+
+# --- PERFORMANCE TRACING ---
+
+def enable_remote_debugging(port):
+    """Opens QtWebEngine's DevTools protocol endpoint on localhost; must run before the QApplication is created."""
+    os.environ["QTWEBENGINE_REMOTE_DEBUGGING"] = f"127.0.0.1:{port}"
+
+
+def free_local_port():
+    """Returns a TCP port that is free on localhost right now."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TraceRecorder(QObject):
+    """
+    Records a Chrome-format performance trace (frames, long tasks, script, layout and loading
+    work of every renderer) through the remote debugging endpoint: Tracing.start on the browser
+    target, events collected as Chromium reports them, then {"traceEvents": [...]} written once
+    Tracing.end completes. The file opens in chrome://tracing, Perfetto and the DevTools
+    Performance panel. Everything is driven by the event loop; nothing blocks the GUI thread.
+    """
+    started = pyqtSignal()
+    finished = pyqtSignal(str)  # Path of the written trace
+    failed = pyqtSignal(str)
+
+    def __init__(self, port, categories=TRACE_CATEGORIES, parent=None):
+        super().__init__(parent)
+        self.port = port
+        self.categories = list(categories)
+        self.state = "idle"  # idle -> connecting -> recording -> stopping -> idle
+        self.error = None
+        self.path = None
+        self.metadata = {}
+        self.events = []
+        self.socket = None
+        self.network = QNetworkAccessManager(self)
+        self._ids = itertools.count(1)
+        self._start_id = None
+
+        self.stop_timer = QTimer(self)
+        self.stop_timer.setSingleShot(True)
+        self.stop_timer.timeout.connect(self.stop)
+
+    def start(self, path, seconds=None, metadata=None):
+        """Starts tracing into `path`. Stops by itself after `seconds`, otherwise when stop() is called."""
+        if self.state != "idle":
+            self.failed.emit("A trace is already being recorded")
+            return
+        self.state = "connecting"
+        self.error = None
+        self.path = os.path.abspath(path)
+        self.metadata = dict(metadata or {}, source="Safwat Browser", categories=self.categories)
+        self.events = []
+        self.seconds = seconds
+        reply = self.network.get(QNetworkRequest(QUrl(f"http://127.0.0.1:{self.port}/json/version")))
+        reply.finished.connect(lambda: self._on_version(reply))
+
+    def stop(self):
+        self.stop_timer.stop()
+        if self.state == "recording":
+            self.state = "stopping"
+            self._send("Tracing.end")
+        elif self.state == "connecting":
+            self._fail("Stopped before tracing started")
+
+    def _send(self, method, params=None):
+        message_id = next(self._ids)
+        self.socket.sendTextMessage(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+        return message_id
+
+    def _on_version(self, reply):
+        reply.deleteLater()
+        if self.state != "connecting":
+            return
+        if reply.error():
+            self._fail(f"Remote debugging endpoint on port {self.port} is not reachable: {reply.errorString()}")
+            return
+        try:
+            ws_url = json.loads(bytes(reply.readAll()).decode("utf-8"))["webSocketDebuggerUrl"]
+        except (ValueError, KeyError):
+            self._fail("Remote debugging endpoint did not report a browser target")
+            return
+        ws = self.socket = QWebSocket(parent=self)
+        ws.connected.connect(self._on_connected)
+        ws.textMessageReceived.connect(self._on_message)
+        ws.error.connect(lambda _: self._fail(f"DevTools connection failed: {ws.errorString()}"))
+        ws.open(QUrl(ws_url))
+
+    def _on_connected(self):
+        self._start_id = self._send("Tracing.start", {
+            "traceConfig": {"includedCategories": self.categories, "recordMode": "recordContinuously"},
+            "transferMode": "ReportEvents",
+        })
+
+    def _on_message(self, text):
+        message = json.loads(text)
+        method = message.get("method")
+        if method == "Tracing.dataCollected":
+            self.events.extend(message["params"]["value"])
+        elif method == "Tracing.tracingComplete":
+            self._write()
+        elif message.get("id") == self._start_id:
+            if "error" in message:
+                self._fail(f"Tracing.start failed: {message['error'].get('message', message['error'])}")
+                return
+            self.state = "recording"
+            if self.seconds:
+                self.stop_timer.start(int(self.seconds * 1000))
+            self.started.emit()
+
+    def _write(self):
+        try:
+            atomic_write(self.path, json.dumps({"traceEvents": self.events, "metadata": self.metadata}).encode("utf-8"))
+        except OSError as e:
+            self._fail(f"Could not write {self.path}: {e}")
+            return
+        self._close()
+        print(f"Trace: {len(self.events)} events written to {self.path}")
+        self.events = []
+        self.finished.emit(self.path)
+
+    def _fail(self, message):
+        if self.state == "idle":
+            return
+        self.error = message
+        self._close()
+        print(f"Trace: {message}")
+        self.failed.emit(message)
+
+    def _close(self):
+        self.state = "idle"
+        self.stop_timer.stop()
+        ws, self.socket = self.socket, None
+        if ws is not None:
+            ws.textMessageReceived.disconnect()
+            ws.error.disconnect()
+            ws.close()
+            ws.deleteLater()
+
+
+# --- STALL WATCHDOG ---
+
+class StallWatchdog(QObject):
+    """
+    Detects stalls of the Qt event loop. A GUI-thread timer records a heartbeat; a watcher
+    thread notices when the heartbeat is late, samples the main thread's Python stack while
+    the stall is still going on, and logs the stall once the heartbeat resumes.
+    Stalls are written with their stack and a running duration histogram to a rotating log.
+    The cost is one short timer callback on the GUI thread per half threshold.
+    """
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS, log_path=STALL_LOG_FILE, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.interval = self.threshold / 2
+        self.main_thread_id = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        self.stalls = queue.SimpleQueue()  # (beat before the stall, stall duration) from the GUI thread
+        self.stacks = {}  # beat before the stall -> stack sampled by the watcher
+        self.histogram = {bucket: 0 for bucket in STALL_HISTOGRAM_BUCKETS_MS + (float("inf"),)}
+        self.count = 0
+        self._stop = threading.Event()
+
+        self.log = logging.getLogger("safwat.stalls")
+        self.log.setLevel(logging.INFO)
+        self.log.propagate = False
+        if not self.log.handlers:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=STALL_LOG_MAX_BYTES, backupCount=STALL_LOG_BACKUPS, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.log.addHandler(handler)
+
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setTimerType(Qt.PreciseTimer)
+        self.heartbeat_timer.setInterval(max(1, int(self.interval * 1000)))
+        self.heartbeat_timer.timeout.connect(self._heartbeat)
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        self.heartbeat_timer.start()
+        threading.Thread(target=self._watch, name="StallWatchdog", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.heartbeat_timer.stop()
+        self._stop.set()
+        if self.count:
+            self.log.info("Stall histogram at exit: %s", self.histogram_text())
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        late = now - self.last_beat - self.interval
+        if late >= self.threshold:
+            self.stalls.put((self.last_beat, late))
+        self.last_beat = now
+
+    def _watch(self):
+        while not self._stop.is_set():
+            try:
+                beat, duration = self.stalls.get(timeout=self.interval)
+                self._record(duration, self.stacks.pop(beat, None))
+            except queue.Empty:
+                pass
+            beat = self.last_beat
+            if time.monotonic() - beat - self.interval >= self.threshold and beat not in self.stacks:
+                # Still stalled: sample the stack now, while the culprit is on it
+                frame = sys._current_frames().get(self.main_thread_id)
+                self.stacks = {beat: "".join(traceback.format_stack(frame)) if frame else None}
+
+    def _record(self, duration, stack):
+        duration_ms = duration * 1000
+        self.count += 1
+        for bucket in self.histogram:
+            if duration_ms < bucket:
+                self.histogram[bucket] += 1
+                break
+        self.log.info(
+            "GUI thread stalled for %.0f ms (stall #%d; histogram %s)\n%s",
+            duration_ms, self.count, self.histogram_text(),
+            stack or "  (no stack: the main thread did not release the GIL during the stall)\n",
+        )
+
+    def histogram_text(self):
+        labels = []
+        lower = 0
+        for bucket, count in self.histogram.items():
+            label = f"{lower}+" if bucket == float("inf") else f"{lower}-{bucket}"
+            labels.append(f"{label} ms: {count}")
+            lower = bucket
+        return ", ".join(labels)
+
+
+# --- SHARED SERVICES & SINGLE INSTANCE ---
+
+class Theme:
+    """A theme compiled once: its QPalette and the style sheet of each chrome scope."""
+    def __init__(self, name, label, colors):
+        self.name = name
+        self.label = label
+        self.colors = colors
+        self.palette = self._build_palette(colors)
+        self.styles = {scope: Template(css).substitute(colors) for scope, css in THEME_STYLE_SCOPES.items()}
+
+    @staticmethod
+    def _build_palette(colors):
+        c = {key: QColor(value) for key, value in colors.items()}
+        palette = QPalette()
+        for role, key in (
+            (QPalette.Window, "window"), (QPalette.WindowText, "text"),
+            (QPalette.Base, "input"), (QPalette.AlternateBase, "chrome"), (QPalette.Text, "text"),
+            (QPalette.Button, "button"), (QPalette.ButtonText, "button_text"), (QPalette.BrightText, "accent"),
+            (QPalette.ToolTipBase, "banner"), (QPalette.ToolTipText, "text"),
+            (QPalette.Highlight, "highlight"), (QPalette.HighlightedText, "accent_text"),
+            (QPalette.Link, "highlight"), (QPalette.PlaceholderText, "muted_text"),
+        ):
+            palette.setColor(role, c[key])
+        for role in (QPalette.WindowText, QPalette.Text, QPalette.ButtonText):
+            palette.setColor(QPalette.Disabled, role, c["border"])
+        return palette
+
+
+class ThemeEngine(QObject):
+    """
+    The built-in themes and those in THEMES_DIR, each compiled once into a Theme. Applying a
+    theme sets the application palette and the style sheets of the registered chrome widgets,
+    a fixed number per window, so switching costs the same however many tabs are open.
+    """
+    themeChanged = pyqtSignal(str)
+
+    def __init__(self, settings, themes_dir=THEMES_DIR, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.themes = OrderedDict()
+        for name, spec in BUILTIN_THEMES.items():
+            self.themes[name] = Theme(name, spec["label"], spec["colors"])
+        self._load_user_themes(themes_dir)
+        self.current = self.settings.value("appearance/theme", DEFAULT_THEME)
+        if self.current not in self.themes:
+            self.current = DEFAULT_THEME
+        self.applied = False
+        self.scoped = []  # (widget, scope) pairs styled with the current theme
+
+    def _load_user_themes(self, themes_dir):
+        try:
+            names = sorted(n for n in os.listdir(themes_dir) if n.endswith(".json"))
+        except OSError:
+            return
+        for file_name in names:
+            path = os.path.join(themes_dir, file_name)
+            try:
+                with open(path, "rb") as f:
+                    spec = json.loads(f.read().decode("utf-8"))
+                name = str(spec.get("name") or os.path.splitext(file_name)[0])
+                base = BUILTIN_THEMES.get(spec.get("base", DEFAULT_THEME), BUILTIN_THEMES[DEFAULT_THEME])
+                colors = dict(base["colors"])
+                for key, value in spec.get("colors", {}).items():
+                    if key in colors:
+                        if not QColor(value).isValid():
+                            raise ValueError(f"invalid color {value!r} for {key!r}")
+                        colors[key] = value
+                self.themes[name] = Theme(name, str(spec.get("label") or name), colors)
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Themes: Skipping {path}: {e}")
+
+    def register(self, widget, scope):
+        """Keeps `widget` styled with the `scope` style sheet of the current theme."""
+        entry = (widget, scope)
+        self.scoped.append(entry)
+        widget.destroyed.connect(lambda obj=None, entry=entry: self.scoped.remove(entry))
+        if self.applied:
+            widget.setStyleSheet(self.themes[self.current].styles[scope])
+
+    def apply(self, name):
+        """Switches every window to theme `name` (the default theme if there is none by that name)."""
+        theme = self.themes.get(name) or self.themes[DEFAULT_THEME]
+        if self.applied and theme.name == self.current:
+            return
+        app = QApplication.instance()
+        if not self.applied:
+            # Fusion draws everything from the palette, which the native styles do not all do
+            app.setStyle("Fusion")
+        app.setPalette(theme.palette)
+        for widget, scope in self.scoped:
+            widget.setStyleSheet(theme.styles[scope])
+        self.current = theme.name
+        self.applied = True
+        self.settings.setValue("appearance/theme", theme.name)
+        self.themeChanged.emit(theme.name)
+
+
+class BrowserServices(QObject):
+    """
+    State shared by every window of the process: settings, the app profile (and with it the
+    renderer processes), history, content blocker, offline copies, downloads, thumbnails, quick
+    links, themes, search engines and the warm tab pool. Shut down when its last window closes.
+    """
+    def __init__(self, remote_debugging_port=REMOTE_DEBUGGING_PORT, parent=None):
+        super().__init__(parent)
+        self.remote_debugging_port = remote_debugging_port
+        self.windows = []  # Open windows, oldest first
+        self.settings = QSettings(SETTINGS_FILE, QSettings.IniFormat)
+        # Parented to the application so it outlives every page that uses it
+        self.profile = BrowserProfile(self.settings, QApplication.instance())
+        self.history = HistoryStore()
+        self.content_blocker = ContentBlocker(parent=self)
+        self.tab_pool = TabWarmPool(lambda: create_web_view(self.profile, self.content_blocker), parent=self)
+        self.snapshots = SnapshotCache(
+            self.profile, max_mb=int(self.settings.value("snapshots/max_mb", SNAPSHOT_CACHE_MAX_MB)), parent=self
+        )
+        self.quick_links = QuickLinksModel(parent=self)
+        self.themes = ThemeEngine(self.settings, parent=self)
+        self.search_engines = SearchEngines(self.settings)
+        self.address_classifier = AddressClassifier(self.search_engines.keywords(), public_suffixes())
+        self.downloads = DownloadManager(self.profile, self.settings, parent=self)
+        self.thumbnails = ThumbnailCache(parent=self)
+
+    def window_opened(self, window):
+        self.windows.append(window)
+
+    def window_closed(self, window):
+        if window in self.windows:
+            self.windows.remove(window)
+        if not self.windows:
+            self.history.close()
+            self.snapshots.close()
+            self.thumbnails.close()
+            self.quick_links.flush()
+            self.tab_pool.clear()
+
+    def open_urls(self, urls, cwd="", new_window=False):
+        """
+        Opens URLs handed over by a later launch as tabs of the active window, or in a new window
+        when asked to (or when no URL was given). Paths are resolved against the launcher's `cwd`.
+        """
+        qurls = [QUrl.fromUserInput(url, cwd) for url in urls]
+        active = QApplication.activeWindow()
+        window = active if active in self.windows else (self.windows[-1] if self.windows else None)
+        if new_window or not qurls or window is None:
+            window = BrowserWindow(services=self, startup_urls=qurls)
+            window.show()
+        else:
+            for qurl in qurls:
+                window.add_new_tab(qurl)
+            if window.isMinimized():
+                window.showNormal()
+        window.raise_()
+        window.activateWindow()
+
+
+class InstanceServer(QObject):
+    """
+    Listens on the single-instance socket. A later launch sends one JSON line
+    {"urls": [...], "cwd": ..., "new_window": ...}, is answered "ok" and exits; the request
+    is emitted as urlsReceived.
+    """
+    urlsReceived = pyqtSignal(list, str, bool)
+
+    def __init__(self, path=INSTANCE_SOCKET, parent=None):
+        super().__init__(parent)
+        self.buffers = {}  # connection -> bytes received so far
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        # Nothing answered on the socket (forward_to_running_instance failed), so it is stale
+        QLocalServer.removeServer(path)
+        if not self.server.listen(path):
+            print(f"Single instance: cannot listen on {path}: {self.server.errorString()}")
+
+    def close(self):
+        self.server.close()
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            self.buffers[connection] = b""
+            connection.readyRead.connect(lambda c=connection: self._on_ready_read(c))
+            connection.disconnected.connect(lambda c=connection: self.buffers.pop(c, None))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def _on_ready_read(self, connection):
+        data = self.buffers.get(connection, b"") + bytes(connection.readAll())
+        if b"\n" not in data:
+            self.buffers[connection] = data
+            return
+        self.buffers.pop(connection, None)
+        try:
+            request = json.loads(data.split(b"\n", 1)[0].decode("utf-8"))
+            urls = [str(url) for url in request.get("urls", [])]
+        except (ValueError, AttributeError, TypeError):
+            connection.disconnectFromServer()
+            return
+        connection.write(b"ok\n")
+        connection.flush()
+        connection.disconnectFromServer()
+        self.urlsReceived.emit(urls, str(request.get("cwd") or ""), bool(request.get("new_window")))
+
+
+class BrowserWindow(QMainWindow):
+    """
+    The main window for the Web Developer Browser application, featuring tabs,
+    integrated DevTools, custom themes, and user-configurable quick links,
+    and simulated Firebase authentication.
+    """
+    def __init__(self, profiler=None, metrics_path=None, remote_debugging_port=REMOTE_DEBUGGING_PORT,
+                 services=None, startup_urls=()):
+        super().__init__()
         self.setWindowTitle("Safwat Browser")
         self.setGeometry(100, 100, 1000, 700) 
+        self.profiler = profiler or StartupProfiler()
+        self.first_painted = False
+        self.startup_finished = False  # Set once the deferred part of startup has run
+        self.startup_urls = list(startup_urls)
         
-        # Internal state for quick links, theme, and authentication
-        self.custom_quick_links = {}
-        self.current_theme = 'dark' 
+        # Internal state for authentication
         self.is_authenticated = False
         self.user_id = None
+        with self.profiler.phase("services"):
+            # Further windows share the first one's services (profile, renderers, history, pool)
+            self.services = services or BrowserServices(remote_debugging_port, QApplication.instance())
+            # The first window of the process restores and saves the session
+            self.is_primary = not self.services.windows
+            self.services.window_opened(self)
+            self.settings = self.services.settings
+            self.profile = self.services.profile
+            self.history = self.services.history
+            self.content_blocker = self.services.content_blocker
+            self.tab_pool = self.services.tab_pool
+            self.snapshots = self.services.snapshots
+            self.quick_links = self.services.quick_links
+            self.themes = self.services.themes
+            self.search_engines = self.services.search_engines
+            self.address_classifier = self.services.address_classifier
+            self.downloads = self.services.downloads
+            self.thumbnails = self.services.thumbnails
+            self.session = SessionStore()
+            # Performance traces need the remote debugging endpoint, opened before QApplication
+            port = self.services.remote_debugging_port
+            self.trace_recorder = TraceRecorder(port, parent=self) if port else None
         
         # 1. Initialize Authentication State
-        self._initialize_auth_state()
+        with self.profiler.phase("auth"):
+            self._initialize_auth_state()
 
         # 2. Central Widget and Layout setup
         main_container = QWidget()
@@ -535,38 +4302,135 @@ class BrowserWindow(QMainWindow):
         self.setCentralWidget(main_container)
         
         # 3. Setup Toolbar
-        self._setup_toolbar()
+        with self.profiler.phase("toolbar"):
+            self._setup_toolbar()
         
         # 4. Tab Widget & Dev Tools (QSplitter)
-        self.tabs = QTabWidget()
-        self.tabs.setDocumentMode(True)
-        self.tabs.tabCloseRequested.connect(self.close_current_tab) 
-        self.tabs.setTabsClosable(True)
-        self.tabs.setMovable(True)
-        self.tabs.currentChanged.connect(self.current_tab_changed)
-        
-        self.dev_tools_view = QWebEngineView()
-        self.dev_tools_view.hide()
+        with self.profiler.phase("tabs"):
+            self.tabs = BrowserTabWidget()
+            self.tabs.setDocumentMode(True)
+            self.tabs.tabCloseRequested.connect(self.close_current_tab) 
+            self.tabs.setTabsClosable(True)
+            self.tabs.setMovable(True)
+            self.tabs.currentChanged.connect(self.current_tab_changed)
+            self.previous_tab = None  # Captured as a thumbnail when another tab becomes current
+
+            self.lifecycle = TabLifecycleManager(self.tabs)
+            self.lifecycle.statesChanged.connect(self.update_tab_state_label)
         
-        self.splitter = QSplitter(Qt.Vertical)
-        self.splitter.addWidget(self.tabs)
-        self.splitter.addWidget(self.dev_tools_view)
-        self.splitter.setSizes([1000, 0]) 
+            self.splitter = QSplitter(Qt.Vertical)
+            self.splitter.addWidget(self.tabs)
+
+            # Inspectors need renderers of their own, so DevToolsManager only builds them on demand
+            self.dev_tools = DevToolsManager(
+                self.splitter,
+                float(self.settings.value("devtools/dispose_after_secs", DEVTOOLS_DISPOSE_AFTER_SECS)),
+                parent=self,
+            )
+            self.dev_tools.dockedVisibilityChanged.connect(self.update_dev_tools_button)
+
+            self.memory_monitor = MemoryPressureMonitor(
+                self.tabs, self.lifecycle, self.dev_tools,
+                float(self.settings.value("memory/soft_limit_percent", MEMORY_SOFT_LIMIT_PERCENT)),
+                float(self.settings.value("memory/hard_limit_percent", MEMORY_HARD_LIMIT_PERCENT)),
+                parent=self,
+            )
         
-        self.main_layout.addWidget(self.splitter)
+            self.main_layout.addWidget(self.splitter)
         
         # 5. Setup Bottom Controls
-        self._setup_bottom_controls()
+        with self.profiler.phase("bottom controls"):
+            self._setup_bottom_controls()
         
         # 6. Status Bar
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        self.tab_state_label = QLabel()
+        self.status_bar.addPermanentWidget(self.tab_state_label)
+        self.blocked_label = QLabel()
+        self.status_bar.addPermanentWidget(self.blocked_label)
+        self.downloads_label = QLabel()
+        self.downloads_label.hide()
+        self.status_bar.addPermanentWidget(self.downloads_label)
+        self.downloads.changed.connect(self.update_downloads_label)
+        self.downloads.added.connect(
+            lambda download: self.status_bar.showMessage(f"Downloading {download.file_name}", 3000)
+            if self.isActiveWindow() else None
+        )
+        if self.trace_recorder is not None:
+            self.trace_recorder.started.connect(self.on_trace_started)
+            self.trace_recorder.finished.connect(self.on_trace_finished)
+            self.trace_recorder.failed.connect(self.on_trace_failed)
+
+        # Coalesced UI updates, applied by flush_ui_updates() at most once per frame
+        self.pending_titles = {}
+        self.pending_status = None
+        self.url_bar_dirty = False
+        self.ui_flush_timer = QTimer(self)
+        self.ui_flush_timer.setSingleShot(True)
+        self.ui_flush_timer.setInterval(UI_FLUSH_INTERVAL_MS)
+        self.ui_flush_timer.timeout.connect(self.flush_ui_updates)
+
+        # Optional JSONL stream of per-tab metrics for fleet monitoring
+        self.task_manager = None
+        self.downloads_dialog = None
+        self.metrics_path = metrics_path
+        if metrics_path:
+            self.metrics_sampler = TabMetricsSampler(self.tabs, self.lifecycle)
+            self.metrics_timer = QTimer(self)
+            self.metrics_timer.timeout.connect(self.export_metrics)
+            self.metrics_timer.start(METRICS_EXPORT_INTERVAL_MS)
+
+        # 7. Apply initial theme: the palette is application-wide, the chrome is styled per window
+        with self.profiler.phase("theme"):
+            self.themes.register(self.nav_toolbar, "toolbar")
+            self.themes.register(self.tabs.tabBar(), "tabs")
+            self.themes.register(self.bottom_widget, "bottom")
+            self.themes.register(self.status_bar, "status")
+            self.apply_theme(self.current_theme)
+
+        # 8. Initial Tabs are created in finish_startup(), once the window chrome has been painted
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_painted:
+            self.first_painted = True
+            self.profiler.mark("first paint")
+            # Queued, so this frame reaches the screen before the first tab is built
+            QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """
+        Deferred part of startup: restores the previous session as placeholders (first window
+        only), opens the URLs given at launch, or else the homepage, and starts the session
+        autosave. Runs after the first paint, or directly when the window is used without
+        being shown.
+        """
+        if self.startup_finished:
+            return
+        self.startup_finished = True
+
+        with self.profiler.phase("first tab"):
+            restored = self.is_primary and self.restore_session()
+            for qurl in self.startup_urls:
+                self.add_new_tab(qurl)
+            if not restored and not self.startup_urls:
+                self.add_new_tab(QUrl(DEFAULT_URL), "Homepage")
 
-        # 7. Apply initial theme
-        self.apply_theme(self.current_theme)
+        self.session_timer = QTimer(self)
+        self.session_timer.timeout.connect(self.save_session)
+        self.session_timer.start(SESSION_AUTOSAVE_MS)
+
+        browser = self.current_browser()
+        if browser and self.profiler.path:
+            browser.loadFinished.connect(self._on_first_load_finished)
+            # Still write the trace if the first page never finishes loading
+            QTimer.singleShot(30000, self.profiler.write)
 
-        # 8. Initial Tab
-        self.add_new_tab(QUrl(DEFAULT_URL), "Homepage")
+    def _on_first_load_finished(self, success):
+        self.sender().loadFinished.disconnect(self._on_first_load_finished)
+        self.profiler.mark("first tab loaded" if success else "first tab failed")
+        self.profiler.write()
     
     def _initialize_auth_state(self):
         """
@@ -616,27 +4480,33 @@ class BrowserWindow(QMainWindow):
         widget = self.tabs.widget(index)
         widget.deleteLater()
         self.tabs.removeTab(index)
+        self.update_tab_state_label(self.lifecycle.state_counts())
+
+    @property
+    def current_theme(self):
+        return self.themes.current
 
     def apply_theme(self, theme_name):
-        """Applies the selected theme CSS globally."""
-        self.current_theme = theme_name
-        css = DARK_THEME_CSS if theme_name == 'dark' else LIGHT_THEME_CSS
-        QApplication.instance().setStyleSheet(css)
+        """Switches all windows to the named theme."""
+        self.themes.apply(theme_name)
 
     def add_new_tab(self, qurl=None, label="New Tab"):
-        """Adds a new tab with a QWebEngineView."""
-        tab_widget = TabContent(self)
-        browser = tab_widget.browser
+        """Adds a new tab with a QWebEngineView, taken from the warm pool when possible."""
+        qurl = qurl or QUrl(NEW_TAB_URL)
+        browser, ready = self.tab_pool.take(qurl)
+        if browser is None:
+            browser = create_web_view(self.profile, self.content_blocker)
+        tab_widget = TabContent(self, browser=browser)
         
-        browser.setZoomFactor(DEFAULT_ZOOM)
+        self._setup_browser(tab_widget)
         
-        if qurl:
+        if ready:
+            # Preloaded by the pool: the page finished loading before the signals were wired
+            tab_widget.content_ready_at = time.perf_counter()
+            label = browser.title() or label
+            self.history.record_visit(browser.url().toString(), browser.title())
+        else:
             browser.setUrl(qurl)
-        
-        browser.urlChanged.connect(lambda url: self.update_url_bar(url) if browser == self.current_browser() else None)
-        browser.loadStarted.connect(lambda: self.setStatusTip("Loading...") if browser == self.current_browser() else None)
-        browser.loadFinished.connect(lambda success: self.on_load_finished(success, browser, tab_widget))
-        browser.titleChanged.connect(lambda title: self.tabs.setTabText(self.tabs.indexOf(tab_widget), title))
 
         i = self.tabs.addTab(tab_widget, label)
         self.tabs.setCurrentIndex(i)
@@ -644,20 +4514,116 @@ class BrowserWindow(QMainWindow):
         if self.tabs.count() == 1:
             self.current_tab_changed(i)
 
+        self.update_tab_state_label(self.lifecycle.state_counts())
+
+    def _setup_browser(self, tab_widget):
+        """Wires the signals of a tab's QWebEngineView."""
+        browser = tab_widget.browser
+
+        self.tabs.register(tab_widget)
+        browser.urlChanged.connect(lambda url: self.queue_url_bar_update(tab_widget))
+        browser.loadStarted.connect(lambda: self.on_load_started(tab_widget))
+        browser.loadFinished.connect(lambda success: self.on_load_finished(success, browser, tab_widget))
+        browser.titleChanged.connect(lambda title: self.queue_tab_title(tab_widget, title))
+
+        tab_widget.request_interceptor = browser.request_interceptor
+        tab_widget.request_interceptor.blockedCountChanged.connect(
+            lambda count: self.update_blocked_label(count) if tab_widget is self.tabs.currentWidget() else None
+        )
+
+        # History: every committed URL is a visit; titles arrive separately
+        browser.urlChanged.connect(
+            lambda url: None if self.snapshots.is_snapshot(url.toString())
+            else self.history.record_visit(url.toString(), browser.title())
+        )
+        browser.titleChanged.connect(lambda title: self.history.set_title(browser.url().toString(), title))
+
+    def _materialize_tab(self, tab_widget):
+        """Creates the view of a placeholder tab and restores its saved history."""
+        entry = tab_widget.placeholder
+        tab_widget.set_browser(create_web_view(self.profile, self.content_blocker))
+        tab_widget.placeholder = None
+        self._setup_browser(tab_widget)
+        SessionStore.restore_history(tab_widget.browser, entry)
+
+    def restore_session(self):
+        """Restores the saved session as placeholder tabs. Returns False if there was none."""
+        session = self.session.load()
+        if not session:
+            return False
+
+        # Adding tabs would otherwise activate (and materialize) the first one
+        self.tabs.blockSignals(True)
+        for entry in session["tabs"]:
+            tab_widget = TabContent(self, placeholder=entry)
+            i = self.tabs.addTab(tab_widget, entry.get("title") or entry.get("url") or "New Tab")
+            self.tabs.setTabToolTip(i, entry.get("url", ""))
+        self.tabs.setCurrentIndex(min(max(session.get("current", 0), 0), self.tabs.count() - 1))
+        self.tabs.blockSignals(False)
+
+        self.current_tab_changed(self.tabs.currentIndex())
+        self.update_tab_state_label(self.lifecycle.state_counts())
+        return True
+
+    def save_session(self):
+        """Persists the open tabs so they can be restored on the next start (done by the oldest open window)."""
+        if not self.startup_finished:
+            return  # Closed before startup finished: keep the previous session
+        if self.services.windows and self.services.windows[0] is not self:
+            return
+        self.session.save(self.tabs)
+
+    def closeEvent(self, event):
+        self.save_session()
+        self.dev_tools.dispose_all()
+        # The last window to close shuts down the shared services
+        self.services.window_closed(self)
+        super().closeEvent(event)
+
+    def on_load_started(self, tab_widget):
+        tab_widget.load_started_at = time.perf_counter()
+        self.queue_status(tab_widget, "Loading...")
+
     def on_load_finished(self, success, browser, tab_widget):
-        """If loading fails (simulated network error), loads the Flappy Bird game."""
-        if browser == self.current_browser():
-            self.setStatusTip("Done" if success else "Load Failed")
-            self.update_url_bar(browser.url())
+        """
+        Saves successful loads as offline copies. A failed load shows the page's offline copy,
+        or the Flappy Bird game when there is none.
+        """
+        if tab_widget.load_started_at is not None:
+            tab_widget.last_load_ms = (time.perf_counter() - tab_widget.load_started_at) * 1e3
+            tab_widget.load_started_at = None
+        if success and tab_widget.content_ready_at is None:
+            tab_widget.content_ready_at = time.perf_counter()
+
+        self.queue_status(tab_widget, "Done" if success else "Load Failed")
+        self.queue_url_bar_update(tab_widget)
         
         if not success:
-            if browser.url().toString() != 'qrc:/offline_game':
-                self.load_flappy_bird_game()
-            else:
+            if browser.url().scheme() == INTERNAL_SCHEME:
                 self.setStatusTip("Critical Error: Cannot Load Game or Network.")
+            elif not self.show_offline_copy(browser, tab_widget):
+                self.load_flappy_bird_game()
         else:
-            if browser.zoomFactor() != DEFAULT_ZOOM and browser.url().toString() != 'qrc:/offline_game':
-                 browser.setZoomFactor(DEFAULT_ZOOM)
+            url = browser.url().toString()
+            if self.snapshots.is_snapshot(url):
+                return
+            if tab_widget.offline_url:
+                tab_widget.hide_offline_banner()
+            self.snapshots.save(browser.page())
+
+    def show_offline_copy(self, browser, tab_widget):
+        """Shows the saved copy of a page that failed to load. Returns False if there is none."""
+        url = browser.url().toString()
+        snapshot = None if self.snapshots.is_snapshot(url) else self.snapshots.lookup(url)
+        if snapshot is None:
+            if tab_widget.offline_url:
+                tab_widget.hide_offline_banner()
+            return False
+        path, entry = snapshot
+        tab_widget.show_offline_banner(url, entry["saved_at"])
+        browser.setUrl(QUrl.fromLocalFile(path))
+        self.queue_status(tab_widget, "Showing offline copy")
+        return True
 
     def navigate_to_quick_link(self, url):
         """Navigates the current browser tab to the provided quick link URL."""
@@ -669,13 +4635,12 @@ class BrowserWindow(QMainWindow):
         """Loads the Flappy Bird game directly into the current tab."""
         browser = self.current_browser()
         if browser:
-            browser.setHtml(FLAPPY_BIRD_HTML, QUrl('qrc:/offline_game'))
-            browser.setZoomFactor(1.0) 
+            browser.setUrl(QUrl(OFFLINE_GAME_URL))
             
             current_tab_widget = self.tabs.currentWidget()
             if current_tab_widget:
-                self.tabs.setTabText(self.tabs.indexOf(current_tab_widget), "Flappy Bird 🐦")
-                self.setStatusTip("Playing Flappy Bird")
+                self.queue_tab_title(current_tab_widget, "Flappy Bird 🐦")
+                self.queue_status(current_tab_widget, "Playing Flappy Bird")
             
     def _setup_bottom_controls(self):
         """Sets up the Quick Links bar and the dedicated game button."""
@@ -684,37 +4649,18 @@ class BrowserWindow(QMainWindow):
         self.bottom_layout = QHBoxLayout(self.bottom_widget)
         self.bottom_layout.setContentsMargins(10, 5, 10, 5)
         self.main_layout.addWidget(self.bottom_widget)
-        
-        self._render_quick_apps()
-    
-    def _render_quick_apps(self):
-        """Renders/re-renders all quick link buttons in the bottom bar."""
-        
-        for i in reversed(range(self.bottom_layout.count())): 
-            item = self.bottom_layout.itemAt(i)
-            if item.widget():
-                item.widget().deleteLater()
-            else:
-                self.bottom_layout.removeItem(item)
-            
-        # 1. Add FIXED Quick Links
-        all_links = {**FIXED_QUICK_LINKS, **self.custom_quick_links}
-        
-        for name, url in all_links.items():
-            link_btn = QPushButton(name)
-            link_btn.setToolTip(url) 
-            link_btn.clicked.connect(lambda checked, target_url=url: self.navigate_to_quick_link(target_url))
-            self.bottom_layout.addWidget(link_btn)
+
+        # 1. Quick Links, kept in sync with the shared model one button at a time
+        self.quick_links_bar = QuickLinksBar(self.quick_links)
+        self.quick_links_bar.linkActivated.connect(self.navigate_to_quick_link)
+        self.bottom_layout.addWidget(self.quick_links_bar, 1)
 
         # 2. Add Link Button
         add_link_btn = QPushButton("➕ Add Link")
         add_link_btn.clicked.connect(self.prompt_add_quick_link)
         self.bottom_layout.addWidget(add_link_btn)
 
-        # 3. Add a spacer to push the game button to the right
-        self.bottom_layout.addStretch()
-
-        # 4. Start Flappy Bird Button
+        # 3. Start Flappy Bird Button
         game_btn = QPushButton("Start Flappy Bird 🐦")
         game_btn.setObjectName("GameButton") 
         game_btn.clicked.connect(self.load_flappy_bird_game)
@@ -724,16 +4670,13 @@ class BrowserWindow(QMainWindow):
         """Opens the dialog to get details for a new quick link."""
         dialog = AddLinkDialog(self)
         if dialog.exec_() == QDialog.Accepted:
-            name = dialog.link_name
-            url = dialog.link_url
-            
-            self.custom_quick_links[name] = url
-            self._render_quick_apps() 
+            self.quick_links.add_link(dialog.link_name, dialog.link_url)
 
     def _setup_toolbar(self):
         """Creates and configures the navigation, tab, and settings toolbar."""
         nav_toolbar = QToolBar("Navigation")
         self.addToolBar(nav_toolbar)
+        self.nav_toolbar = nav_toolbar
         
         # Navigation Buttons (Icons only)
         back_btn = QAction("←", self); back_btn.triggered.connect(lambda: self.current_browser().back()); back_btn.setToolTip("Back")
@@ -749,12 +4692,31 @@ class BrowserWindow(QMainWindow):
         # New Tab Button
         new_tab_btn = QAction("➕", self)
         new_tab_btn.setToolTip("Open a new tab")
-        new_tab_btn.triggered.connect(lambda: self.add_new_tab(QUrl(DEFAULT_URL)))
+        new_tab_btn.triggered.connect(lambda: self.add_new_tab())
         nav_toolbar.addAction(new_tab_btn)
 
-        # URL Bar
+        new_window_btn = QAction("🗗", self)
+        new_window_btn.setToolTip("Open a new window (Ctrl+N)")
+        new_window_btn.setShortcut("Ctrl+N")
+        new_window_btn.triggered.connect(lambda: self.services.open_urls([], new_window=True))
+        nav_toolbar.addAction(new_window_btn)
+
+        # URL Bar with history and search engine suggestions (Omnibox)
         self.url_bar = QLineEdit()
         self.url_bar.returnPressed.connect(self.navigate_to_url)
+        self.history_matches = []
+        self.path_probe = PathProbe(self)
+        self.path_probe.checked.connect(self.on_path_checked)
+        self.pending_path = None  # (token, browser, typed text) of the path being looked up
+        self.search_suggestions = SuggestionClient(self.search_engines, self)
+        self.search_suggestions.suggestionsReady.connect(self.show_search_suggestions)
+        self.url_suggestions = QStringListModel(self)
+        self.url_completer = QCompleter(self.url_suggestions, self)
+        self.url_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.url_completer.setMaxVisibleItems(OMNIBOX_SUGGESTION_LIMIT)
+        self.url_completer.activated[str].connect(lambda _: self.navigate_to_url())
+        self.url_bar.setCompleter(self.url_completer)
+        self.url_bar.textEdited.connect(self.update_url_suggestions)
         nav_toolbar.addWidget(self.url_bar)
         
         # DevTools Button (Inspect)
@@ -763,7 +4725,44 @@ class BrowserWindow(QMainWindow):
         self.dev_tools_btn.triggered.connect(self.open_dev_tools)
         nav_toolbar.addAction(self.dev_tools_btn)
 
-        # Settings Button
+        detach_dev_tools_btn = QAction("⧉", self)
+        detach_dev_tools_btn.setToolTip("Inspect this tab in a separate window")
+        detach_dev_tools_btn.triggered.connect(self.open_detached_dev_tools)
+        nav_toolbar.addAction(detach_dev_tools_btn)
+
+        self.trace_btn = QAction("⏺", self)
+        self.trace_btn.setToolTip("Record a performance trace")
+        self.trace_btn.triggered.connect(self.record_trace)
+        nav_toolbar.addAction(self.trace_btn)
+
+        # Settings Button
+        task_manager_btn = QAction("📊", self)
+        task_manager_btn.setToolTip("Task Manager (Shift+Esc)")
+        task_manager_btn.setShortcut("Shift+Esc")
+        task_manager_btn.triggered.connect(self.open_task_manager)
+        nav_toolbar.addAction(task_manager_btn)
+
+        downloads_btn = QAction("⬇", self)
+        downloads_btn.setToolTip("Downloads (Ctrl+J)")
+        downloads_btn.setShortcut("Ctrl+J")
+        downloads_btn.triggered.connect(self.open_downloads)
+        nav_toolbar.addAction(downloads_btn)
+
+        overview_btn = QAction("▦", self)
+        overview_btn.setToolTip("All tabs (Ctrl+Shift+A)")
+        overview_btn.setShortcut("Ctrl+Shift+A")
+        overview_btn.triggered.connect(self.open_tab_overview)
+        nav_toolbar.addAction(overview_btn)
+
+        # Zoom is remembered per site; the shortcuts work without toolbar buttons
+        for text, shortcuts, step in (("Zoom In", ["Ctrl++", "Ctrl+="], 1),
+                                      ("Zoom Out", ["Ctrl+-"], -1),
+                                      ("Reset Zoom", ["Ctrl+0"], 0)):
+            zoom_action = QAction(text, self)
+            zoom_action.setShortcuts(shortcuts)
+            zoom_action.triggered.connect(lambda checked, step=step: self.change_zoom(step))
+            self.addAction(zoom_action)
+
         settings_btn = QAction("⚙️", self)
         settings_btn.setToolTip("Browser Settings and Theme")
         settings_btn.triggered.connect(self.open_settings)
@@ -771,13 +4770,115 @@ class BrowserWindow(QMainWindow):
     
     def current_tab_changed(self, index):
         """Updates UI elements when the active tab changes."""
+        # The tab being left (unless it is being closed) still holds its last frame: keep it as its thumbnail
+        # (add_new_tab re-runs this for the first tab, which is then both the previous and the new one)
+        previous = self.previous_tab
+        tab_widget = self.tabs.currentWidget()
+        if (previous is not None and previous is not tab_widget and not sip.isdeleted(previous)
+                and self.tabs.index_of(previous) >= 0 and not previous.is_placeholder()
+                and self.lifecycle.state_of(previous) == "Active"):
+            self.thumbnails.capture(previous.browser)
+        self.previous_tab = tab_widget
+        if tab_widget and tab_widget.is_placeholder():
+            self._materialize_tab(tab_widget)
+        if tab_widget:
+            # Wakes frozen tabs and transparently reloads discarded ones
+            self.lifecycle.activate(tab_widget)
+            self.memory_monitor.note_activated(tab_widget)
+
         browser = self.current_browser()
         if browser:
             self.update_url_bar(browser.url())
             self.setWindowTitle(browser.title() or "Safwat Browser")
+            self.update_blocked_label(tab_widget.request_interceptor.blocked_count)
             
-            if not self.dev_tools_view.isHidden():
-                browser.page().setDevToolsPage(self.dev_tools_view.page())
+            if self.dev_tools.is_docked_open():
+                self.dev_tools.inspect_in_dock(browser.page())
+
+    def change_zoom(self, step):
+        """Zooms the current site one level in (1) or out (-1), or back to the default (0), in every tab showing it."""
+        browser = self.current_browser()
+        if not browser:
+            return
+        zoom_levels = self.profile.zoom_levels
+        current = browser.zoomFactor()
+        if step > 0:
+            factor = next((z for z in ZOOM_LEVELS if z > current + 1e-3), ZOOM_LEVELS[-1])
+        elif step < 0:
+            factor = next((z for z in reversed(ZOOM_LEVELS) if z < current - 1e-3), ZOOM_LEVELS[0])
+        else:
+            factor = zoom_levels.default
+        origin = zoom_levels.set_zoom(browser.url().toString(), factor)
+        for i in range(self.tabs.count()):
+            tab_widget = self.tabs.widget(i)
+            if not tab_widget.is_placeholder() and zoom_levels.origin(tab_widget.browser.url().toString()) == origin:
+                tab_widget.browser.setZoomFactor(factor)
+        self.status_bar.showMessage(f"Zoom {factor * 100:.0f}%", 2000)
+
+    def update_tab_state_label(self, counts):
+        """Shows how many tabs are active, frozen and discarded in the status bar."""
+        self.tab_state_label.setText(
+            f"Tabs: {counts['Active']} active · {counts['Frozen']} frozen · {counts['Discarded']} discarded"
+        )
+
+    def update_blocked_label(self, count):
+        """Shows how many requests the content blocker stopped in the current tab."""
+        self.blocked_label.setText(f"🛡 {count} blocked")
+
+    def open_task_manager(self):
+        """Shows the (non-modal) Task Manager, reusing it if it is already open."""
+        if self.task_manager is None:
+            self.task_manager = TaskManagerDialog(self)
+            self.task_manager.finished.connect(self._on_task_manager_closed)
+        self.task_manager.show()
+        self.task_manager.raise_()
+        self.task_manager.activateWindow()
+
+    def _on_task_manager_closed(self):
+        self.task_manager.deleteLater()
+        self.task_manager = None
+
+    def open_downloads(self):
+        """Shows the (non-modal) Downloads dialog, reusing it if it is already open."""
+        if self.downloads_dialog is None:
+            self.downloads_dialog = DownloadsDialog(self.downloads, self)
+            self.downloads_dialog.finished.connect(self._on_downloads_closed)
+        self.downloads_dialog.show()
+        self.downloads_dialog.raise_()
+        self.downloads_dialog.activateWindow()
+
+    def open_tab_overview(self):
+        """Shows every tab as a thumbnail grid; the current tab is captured first so its card is fresh."""
+        tab_widget = self.tabs.currentWidget()
+        if tab_widget is not None and not tab_widget.is_placeholder():
+            self.thumbnails.capture(tab_widget.browser)
+        TabOverviewDialog(self).exec_()
+
+    def _on_downloads_closed(self):
+        self.downloads_dialog.deleteLater()
+        self.downloads_dialog = None
+
+    def update_downloads_label(self):
+        """Aggregate download progress in the status bar; hidden when nothing is downloading."""
+        summary = self.downloads.summary()
+        unfinished = summary["active"] + summary["queued"] + summary["paused"]
+        self.downloads_label.setVisible(unfinished > 0)
+        if not unfinished:
+            return
+        text = f"⬇ {unfinished}"
+        if summary["total"]:
+            text += f" · {summary['received'] * 100 // summary['total']}%"
+        if summary["rate_bps"]:
+            text += f" · {format_bytes(summary['rate_bps'])}/s"
+        self.downloads_label.setText(text)
+
+    def export_metrics(self):
+        """Appends a snapshot of every tab's metrics to the JSONL stream."""
+        try:
+            with open(self.metrics_path, "a") as f:
+                f.write(TabMetricsSampler.to_jsonl(self.metrics_sampler.sample()))
+        except OSError as e:
+            print(f"Metrics: cannot write {self.metrics_path}: {e}")
 
     def open_settings(self):
         """Opens the Settings dialog."""
@@ -786,28 +4887,92 @@ class BrowserWindow(QMainWindow):
         dialog.exec_()
 
     def navigate_to_url(self):
-        """Handles URL navigation and search."""
+        """Handles URL navigation and search, as decided by the AddressClassifier."""
         url_text = self.url_bar.text().strip()
         
         if not url_text: return
+        self.search_suggestions.cancel()
+        browser = self.current_browser()
+        if not browser:
+            return
 
-        if os.path.exists(url_text):
-            qurl = QUrl.fromLocalFile(url_text)
-        elif url_text.startswith(('http://', 'https://', 'file://', 'qrc://')):
-            qurl = QUrl(url_text)
-        elif ' ' in url_text:
-            qurl = QUrl(f"https://search.brave.com/search?q={url_text}")
+        kind, value, engine = self.address_classifier.classify(url_text)
+        if kind == ADDRESS_PATH:
+            # Opened once the worker thread has seen that it exists; searched for otherwise
+            self.pending_path = (self.path_probe.check(value), browser, url_text)
+            self.status_bar.showMessage(f"Opening {value}…")
+        elif kind == ADDRESS_SEARCH:
+            browser.setUrl(self.search_engines.search_url(value, engine))
         else:
-            qurl = QUrl(f"https://{url_text}")
-        
-        browser = self.current_browser()
-        if browser:
-            browser.setUrl(qurl)
+            browser.setUrl(QUrl(value))
+
+    def on_path_checked(self, token, path, exists):
+        if self.pending_path is None or self.pending_path[0] is not token:
+            return  # Superseded by a later navigation
+        _, browser, url_text = self.pending_path
+        self.pending_path = None
+        self.status_bar.clearMessage()
+        if sip.isdeleted(browser):
+            return
+        browser.setUrl(QUrl.fromLocalFile(path) if exists else self.search_engines.search_url(url_text))
+
+    def update_url_suggestions(self, text):
+        """Refreshes the URL bar's suggestion popup from history as the user types; search suggestions follow."""
+        suggestions = self.history.suggest(text) if text.strip() else []
+        self.history_matches = [url for url, _ in suggestions]
+        self.url_suggestions.setStringList(self.history_matches)
+        self.search_suggestions.request(text)
+
+    def show_search_suggestions(self, query, suggestions):
+        """Adds the search engine's suggestions below the history matches, if the query is still current."""
+        if query != self.url_bar.text().strip():
+            return
+        extra = [s for s in suggestions if s not in self.history_matches]
+        self.url_suggestions.setStringList(self.history_matches + extra[:OMNIBOX_SUGGESTION_LIMIT])
+        if extra and self.url_bar.hasFocus():
+            self.url_completer.complete()
+
+    def queue_tab_title(self, tab_widget, title):
+        self.pending_titles[tab_widget] = title
+        self._schedule_ui_flush()
+
+    def queue_status(self, tab_widget, text):
+        """Status tips only matter for the current tab."""
+        if tab_widget is self.tabs.currentWidget():
+            self.pending_status = text
+            self._schedule_ui_flush()
+
+    def queue_url_bar_update(self, tab_widget):
+        if tab_widget is self.tabs.currentWidget():
+            self.url_bar_dirty = True
+            self._schedule_ui_flush()
+
+    def _schedule_ui_flush(self):
+        if not self.ui_flush_timer.isActive():
+            self.ui_flush_timer.start()
+
+    def flush_ui_updates(self):
+        """Applies the queued tab title, URL bar and status updates in one pass."""
+        titles, self.pending_titles = self.pending_titles, {}
+        for tab_widget, title in titles.items():
+            index = self.tabs.index_of(tab_widget)
+            if index >= 0:
+                self.tabs.setTabText(index, title)
+
+        if self.url_bar_dirty:
+            self.url_bar_dirty = False
+            browser = self.current_browser()
+            if browser:
+                self.update_url_bar(browser.url())
+
+        if self.pending_status is not None:
+            self.setStatusTip(self.pending_status)
+            self.pending_status = None
 
     def update_url_bar(self, url):
-        """Updates the URL bar with the currently loaded URL."""
+        """Updates the URL bar with the currently loaded URL (the original one for offline copies)."""
         if self.current_browser():
-            self.url_bar.setText(url.toString())
+            self.url_bar.setText(self.tabs.currentWidget().offline_url or url.toString())
             self.url_bar.setCursorPosition(0)
         
     def open_dev_tools(self):
@@ -815,27 +4980,1238 @@ class BrowserWindow(QMainWindow):
         browser = self.current_browser()
         if not browser: return
 
-        if self.dev_tools_view.isHidden():
-            browser.page().setDevToolsPage(self.dev_tools_view.page())
-            self.dev_tools_view.show()
-            self.splitter.setSizes([700, 300]) 
+        if self.dev_tools.is_docked_open():
+            self.dev_tools.close_docked()
+        else:
+            self.dev_tools.open_docked(browser.page())
+
+    def open_detached_dev_tools(self):
+        """Opens Developer Tools for the current tab in a separate window."""
+        browser = self.current_browser()
+        if browser:
+            self.dev_tools.open_detached(browser.page(), browser.title())
+
+    def record_trace(self):
+        """Records a Chrome performance trace for a chosen number of seconds; pressed again, stops early."""
+        browser = self.current_browser()
+        if not browser:
+            return
+        if self.trace_recorder is None:
+            QMessageBox.information(self, "Performance Trace",
+                                    "Tracing uses the remote debugging endpoint. "
+                                    "Start the browser with --remote-debugging-port PORT to enable it.")
+            return
+        if self.trace_recorder.state != "idle":
+            self.trace_recorder.stop()
+            return
+        seconds, ok = QInputDialog.getInt(self, "Performance Trace", "Record for (seconds):", TRACE_DEFAULT_SECS, 1, 600)
+        if not ok:
+            return
+        path = os.path.join(TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        # The trace covers every renderer; the tab's PID tells viewers which process to look at
+        self.trace_recorder.start(path, seconds, {
+            "url": browser.url().toString(),
+            "title": browser.title(),
+            "renderer_pid": browser.page().renderProcessPid(),
+        })
+        self.trace_btn.setText("⏹")
+        self.trace_btn.setToolTip("Stop recording the performance trace")
+
+    def _reset_trace_button(self):
+        self.trace_btn.setText("⏺")
+        self.trace_btn.setToolTip("Record a performance trace")
+
+    def on_trace_started(self):
+        self.status_bar.showMessage(f"Recording performance trace for {self.trace_recorder.seconds:g}s…")
+
+    def on_trace_finished(self, path):
+        self._reset_trace_button()
+        self.status_bar.showMessage(f"Trace written to {path}", 10000)
+
+    def on_trace_failed(self, message):
+        self._reset_trace_button()
+        self.status_bar.clearMessage()
+        QMessageBox.warning(self, "Performance Trace", message)
+
+    def update_dev_tools_button(self, docked_open):
+        if docked_open:
             self.dev_tools_btn.setText("❌")
             self.dev_tools_btn.setToolTip("Close Developer Tools")
         else:
-            self.dev_tools_view.hide()
-            self.splitter.setSizes([1000, 0])
             self.dev_tools_btn.setText("🔍")
             self.dev_tools_btn.setToolTip("Toggle integrated developer tools (Inspect)")
-            browser.page().setDevToolsPage(None)
+
+
+# --- BENCHMARKS ---
+BENCHMARKS = {}
+
+def benchmark(name, isolated=False):
+    """
+    Registers a benchmark runnable with `python setup.py --bench NAME`. Isolated benchmarks
+    drive a real BrowserWindow, so they run in a child process with a throwaway data directory.
+    """
+    def register(func):
+        func.isolated = isolated
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def run_isolated():
+    """Re-runs this command in a child process with a throwaway data directory on the offscreen platform."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ, SAFWAT_DATA_DIR=data_dir)
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        return subprocess.call([sys.executable] + sys.argv, env=env)
+
+
+def offscreen_application():
+    """
+    Returns the QApplication for Qt benchmarks, creating it on the offscreen platform if needed.
+    Callers must keep the result referenced: PyQt deletes a QApplication nothing refers to.
+    """
+    app = QApplication.instance()
+    if app is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        InternalPageHandler.register_scheme()
+        app = QApplication(sys.argv[:1])
+    return app
+
+
+def wait_until(predicate, timeout_secs=30):
+    """Runs the Qt event loop until predicate() is true. Returns False on timeout."""
+    deadline = time.monotonic() + timeout_secs
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        QApplication.processEvents(QEventLoop.AllEvents, 10)
+        time.sleep(0.001)
+    return True
+
+
+def summarize_timings(samples, unit="ms"):
+    """Summarizes a list of durations in seconds as statistics in milliseconds ("ms") or microseconds ("us")."""
+    scale = {"ms": 1e3, "us": 1e6}[unit]
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * scale
+    return {
+        "count": len(ordered),
+        f"mean_{unit}": sum(ordered) / len(ordered) * scale,
+        f"p50_{unit}": pick(0.50),
+        f"p95_{unit}": pick(0.95),
+        f"p99_{unit}": pick(0.99),
+        f"max_{unit}": ordered[-1] * scale,
+    }
+
+
+# Address bar inputs and what AddressClassifier must make of them: (kind, value), None for nothing
+ADDRESS_EXAMPLES = (
+    ("example.com", (ADDRESS_URL, "https://example.com")),
+    ("EXAMPLE.com/Path?q=1#top", (ADDRESS_URL, "https://EXAMPLE.com/Path?q=1#top")),
+    ("example.com.", (ADDRESS_URL, "https://example.com.")),
+    ("bbc.co.uk/news", (ADDRESS_URL, "https://bbc.co.uk/news")),
+    ("münchen.de", (ADDRESS_URL, "https://münchen.de")),
+    ("https://example.com/a b", (ADDRESS_URL, "https://example.com/a b")),
+    ("about:blank", (ADDRESS_URL, "about:blank")),
+    ("safwat://newtab", (ADDRESS_URL, "safwat://newtab")),
+    ("localhost", (ADDRESS_URL, "http://localhost")),
+    ("localhost:8080/app", (ADDRESS_URL, "http://localhost:8080/app")),
+    ("app.localhost", (ADDRESS_URL, "http://app.localhost")),
+    ("myhost.lan:3000", (ADDRESS_URL, "http://myhost.lan:3000")),
+    ("192.168.1.1", (ADDRESS_URL, "http://192.168.1.1")),
+    ("[::1]:3000/x", (ADDRESS_URL, "http://[::1]:3000/x")),
+    ("intranet/wiki", (ADDRESS_URL, "http://intranet/wiki")),
+    ("python", (ADDRESS_SEARCH, "python")),
+    ("python tutorial", (ADDRESS_SEARCH, "python tutorial")),
+    ("what is 2+2?", (ADDRESS_SEARCH, "what is 2+2?")),
+    ("c++ & rust", (ADDRESS_SEARCH, "c++ & rust")),
+    ("@google python tips", (ADDRESS_SEARCH, "python tips")),
+    ("?example.com", (ADDRESS_SEARCH, "example.com")),
+    ("999.1.1.1", (ADDRESS_SEARCH, "999.1.1.1")),
+    ("1.5", (ADDRESS_SEARCH, "1.5")),
+    ("co.uk", (ADDRESS_SEARCH, "co.uk")),
+    ("a..com", (ADDRESS_SEARCH, "a..com")),
+    ("foo.notatld", (ADDRESS_SEARCH, "foo.notatld")),
+    ("user@example.com", (ADDRESS_SEARCH, "user@example.com")),
+    ("host:99999", (ADDRESS_SEARCH, "host:99999")),
+    ("javascript:alert(1)", (ADDRESS_SEARCH, "javascript:alert(1)")),
+    ("/etc/hosts", (ADDRESS_PATH, "/etc/hosts")),
+    ("./notes 2024.txt", (ADDRESS_PATH, "./notes 2024.txt")),
+    ("C:\\Users", (ADDRESS_PATH, "C:\\Users")),
+    ("   ", None),
+)
+
+
+@benchmark("address-bar")
+def bench_address_bar(inputs=1_000_000):
+    """
+    Checks AddressClassifier against ADDRESS_EXAMPLES, then classifies `inputs` distinct typed
+    strings (hosts, searches, ports, IPs, paths, URLs); the target is 1M classifications per second.
+    """
+    classifier = AddressClassifier({"@google": "google"})
+    mismatches = []
+    for text, expected in ADDRESS_EXAMPLES:
+        result = classifier.classify(text)
+        if (result and result[:2]) != expected:
+            mismatches.append({"input": text, "expected": expected, "got": result})
+
+    rng = random.Random(3)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9))) for _ in range(2000)]
+    tlds = ["com", "org", "net", "io", "de", "co.uk", "dev", "zzz"]
+    shapes = (
+        lambda i: f"{rng.choice(words)}{i}.{rng.choice(tlds)}",
+        lambda i: f"{rng.choice(words)} {rng.choice(words)} {i}",
+        lambda i: f"{rng.choice(words)}{i}",
+        lambda i: f"https://{rng.choice(words)}.org/{i}",
+        lambda i: f"localhost:{i % 65536}",
+        lambda i: f"10.{i % 256}.{i // 256 % 256}.{i // 65536 % 256}",
+        lambda i: f"/home/{rng.choice(words)}/{i}",
+        lambda i: f"www.{rng.choice(words)}.com/{rng.choice(words)}?id={i}",
+    )
+    typed = [rng.choice(shapes)(i) for i in range(inputs)]
+
+    classify = classifier.classify
+    kinds = {}
+    started = time.perf_counter()
+    for text in typed:
+        classify(text)
+    elapsed = time.perf_counter() - started
+    for text in typed[:10000]:
+        kind = classify(text)[0]
+        kinds[kind] = kinds.get(kind, 0) + 1
+
+    return {
+        "examples": len(ADDRESS_EXAMPLES),
+        "mismatches": mismatches,
+        "inputs": inputs,
+        "classifications_per_sec": inputs / elapsed,
+        "mean_us": elapsed / inputs * 1e6,
+        "kinds_of_first_10000": kinds,
+    }
+
+
+@benchmark("omnibox")
+def bench_omnibox(rows=1_000_000, queries=2000):
+    """Suggestion latency of HistoryStore.suggest with `rows` synthetic history entries."""
+    rng = random.Random(42)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+             for _ in range(5000)]
+    tlds = ["com", "org", "net", "io", "dev", "co.uk"]
+    now = time.time()
+
+    def synthetic_rows():
+        for i in range(rows):
+            host = f"{rng.choice(words)}{i % 997}.{rng.choice(tlds)}"
+            url = f"https://{host}/{rng.choice(words)}/{i}"
+            title = " ".join(rng.choice(words) for _ in range(rng.randint(2, 6)))
+            yield url, title, rng.randint(1, 50), now - rng.uniform(0, 365 * 86400)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.sqlite3"))
+        started = time.perf_counter()
+        store.import_rows(synthetic_rows())
+        load_secs = time.perf_counter() - started
+
+        typed = []
+        for _ in range(queries):
+            word = rng.choice(words)
+            typed.append(word[:rng.randint(1, len(word))])
+
+        samples = []
+        for text in typed:
+            started = time.perf_counter()
+            store.suggest(text)
+            samples.append(time.perf_counter() - started)
+        store.close()
+
+    return {"rows": rows, "import_secs": load_secs, "suggest": summarize_timings(samples)}
+
+
+@benchmark("adblock")
+def bench_adblock(rules=100_000, requests=100_000):
+    """Compile, cache-load and per-request match latency of FilterEngine with `rules` synthetic filters."""
+    rng = random.Random(7)
+    words = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 8)))
+             for _ in range(3000)]
+    types = ["script", "image", "xmlhttprequest", "subdocument"]
+
+    lines = []
+    listed_hosts = []
+    for i in range(rules):
+        kind = rng.random()
+        if kind < 0.6:
+            listed_hosts.append(f"{rng.choice(words)}{i}.{rng.choice(words)}.com")
+            lines.append(f"||{listed_hosts[-1]}^")
+        elif kind < 0.85:
+            lines.append(f"/{rng.choice(words)}/{rng.choice(words)}{i}/*banner^$third-party,{rng.choice(types)}")
+        elif kind < 0.95:
+            lines.append(f"||cdn{i}.net/{rng.choice(words)}/$domain={rng.choice(words)}.com|~{rng.choice(words)}.org")
+        else:
+            lines.append(f"@@||{rng.choice(words)}{i}.{rng.choice(words)}.com^$image")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        list_path = os.path.join(tmp, "easylist.txt")
+        cache_path = os.path.join(tmp, "filters.cache")
+        with open(list_path, "w") as f:
+            f.write("\n".join(lines))
+
+        started = time.perf_counter()
+        FilterEngine.load([list_path], cache_path)
+        compile_secs = time.perf_counter() - started
+        started = time.perf_counter()
+        engine = FilterEngine.load([list_path], cache_path)
+        cache_load_secs = time.perf_counter() - started
+
+    urls = []
+    for i in range(requests):
+        if rng.random() < 0.2:
+            # Trackers that are in the list
+            url = f"https://{rng.choice(listed_hosts)}/{rng.choice(words)}.js"
+        else:
+            url = (f"https://www.{rng.choice(words)}.{rng.choice(['com', 'org', 'io'])}/"
+                   f"{rng.choice(words)}/{rng.choice(words)}?id={i}&ref={rng.choice(words)}")
+        urls.append((url, f"https://{rng.choice(words)}.com/", rng.choice(types)))
+
+    blocked = 0
+    samples = []
+    for url, source, resource_type in urls:
+        started = time.perf_counter()
+        blocked += engine.should_block(url, source, resource_type)
+        samples.append(time.perf_counter() - started)
+
+    return {
+        "rules": engine.rule_count,
+        "compile_secs": compile_secs,
+        "cache_load_secs": cache_load_secs,
+        "blocked": blocked,
+        "should_block": summarize_timings(samples, unit="us"),
+    }
+
+
+@benchmark("new-tab", isolated=True)
+def bench_new_tab(trials=10):
+    """Click-to-first-paint of the "➕" action without a pool, with blank pooled views, and with a preloaded view."""
+    app = offscreen_application()
+    window = BrowserWindow()
+    window.finish_startup()
+    window.show()
+    target = QUrl(NEW_TAB_URL)
+
+    results = {}
+    for mode, size, preload_url in (("no_pool", 0, None),
+                                    ("pool", TAB_POOL_SIZE, None),
+                                    ("pool_preloaded", TAB_POOL_SIZE, NEW_TAB_URL)):
+        window.tab_pool.configure(size, preload_url)
+        samples = []
+        for _ in range(trials):
+            wait_until(window.tab_pool.is_full)
+            started = time.perf_counter()
+            window.add_new_tab(target)
+            tab_widget = window.tabs.currentWidget()
+            wait_until(lambda: tab_widget.content_ready_at is not None)
+            # One more pass of the event loop so the loaded tab is painted
+            app.processEvents()
+            samples.append(time.perf_counter() - started)
+            window.close_current_tab(window.tabs.indexOf(tab_widget))
+        results[mode] = summarize_timings(samples)
+
+    window.close()
+    return results
+
+
+@benchmark("tab-updates", isolated=True)
+def bench_tab_updates(tabs=500, rounds=20):
+    """GUI-thread cost of every tab changing its title once per frame: per-event repaint versus one coalesced flush."""
+    app = offscreen_application()
+    window = BrowserWindow()
+    window.finish_startup()
+    window.show()
+    # Placeholder tabs: the title events are what is measured, not page loads
+    for i in range(tabs):
+        window.tabs.addTab(TabContent(window, placeholder={"url": f"https://site{i}.test/", "title": ""}), f"Tab {i}")
+    tab_widgets = [window.tabs.widget(i) for i in range(1, window.tabs.count())]
+
+    def per_event(tab_widget, title):
+        # What each titleChanged did before the registry: a linear scan and an immediate relayout
+        window.tabs.setTabText(window.tabs.indexOf(tab_widget), title)
+
+    def coalesced(tab_widget, title):
+        window.queue_tab_title(tab_widget, title)
+
+    results = {"tabs": tabs, "events_per_frame": len(tab_widgets)}
+    for mode, handler in (("per_event", per_event), ("coalesced", coalesced)):
+        samples = []
+        for r in range(rounds):
+            started = time.perf_counter()
+            for tab_widget in tab_widgets:
+                handler(tab_widget, f"{mode} {r}")
+            window.flush_ui_updates()
+            app.processEvents()
+            samples.append(time.perf_counter() - started)
+        results[mode] = summarize_timings(samples)
+
+    window.close()
+    return results
+
+
+@benchmark("quick-links", isolated=True)
+def bench_quick_links(links=1000):
+    """GUI-thread cost of adding quick link #1 through #`links` to the bar, including its layout pass."""
+    app = offscreen_application()
+    window = BrowserWindow()
+    window.finish_startup()
+    window.show()
+    app.processEvents()
+
+    samples = []
+    for i in range(1, links + 1):
+        started = time.perf_counter()
+        window.quick_links.add_link(f"Link {i}", f"https://link{i}.test/")
+        app.processEvents()
+        samples.append(time.perf_counter() - started)
+    visible = len(window.quick_links_bar.buttons)
+    window.close()
+
+    return {
+        "links": links,
+        "visible_buttons": visible,
+        "add_link_1_ms": samples[0] * 1e3,
+        f"add_link_{links}_ms": samples[-1] * 1e3,
+        "first_100": summarize_timings(samples[:100]),
+        "last_100": summarize_timings(samples[-100:]),
+    }
+
+
+@benchmark("theme-switch", isolated=True)
+def bench_theme_switch(tab_counts=(1, 50, 100, 200), switches=20):
+    """
+    GUI-thread cost of switching themes with 1 to 200 tabs open: the theme engine's prebuilt
+    palette and chrome style sheets versus one application-wide style sheet.
+    """
+    app = offscreen_application()
+    window = BrowserWindow()
+    window.finish_startup()
+    window.show()
+    app.processEvents()
+    themes = list(window.themes.themes.values())[:2]
+    # The same rules as one application style sheet, as apply_theme used to set them
+    app_css = {theme.name: "\n".join(theme.styles.values()) for theme in themes}
+
+    def engine_switch(theme):
+        window.apply_theme(theme.name)
+
+    def app_style_sheet(theme):
+        app.setStyleSheet(app_css[theme.name])
+
+    results = {"switches": switches}
+    for count in tab_counts:
+        _placeholder_tabs(window, count - window.tabs.count())
+        app.processEvents()
+        for mode, switch in (("engine", engine_switch), ("app_style_sheet", app_style_sheet)):
+            samples = []
+            for i in range(switches):
+                started = time.perf_counter()
+                switch(themes[i % 2])
+                app.processEvents()
+                samples.append(time.perf_counter() - started)
+            app.setStyleSheet("")
+            results[f"{mode}_{count}_tabs"] = summarize_timings(samples)
+
+    for mode in ("engine", "app_style_sheet"):
+        first = results[f"{mode}_{tab_counts[0]}_tabs"]["p50_ms"]
+        last = results[f"{mode}_{tab_counts[-1]}_tabs"]["p50_ms"]
+        results[f"{mode}_growth"] = last / first if first else None
+    window.close()
+    return results
+
+
+@benchmark("suggestions", isolated=True)
+def bench_suggestions(words=20, keystroke_ms=130, server_delay_ms=200):
+    """
+    Typing search terms against the local suggestion stub, twice: GUI-thread time per keystroke,
+    and how many requests were sent, aborted as superseded and answered from the cache.
+    """
+    app = offscreen_application()
+    fixtures = FixtureServer().start()
+    fixtures.suggest_delay_secs = server_delay_ms / 1000
+    window = BrowserWindow()
+    window.finish_startup()
+    window.show()
+    app.processEvents()
+    engines = window.search_engines
+    engines.engines["fixture"] = SearchEngine(
+        "fixture", "Fixture", fixtures.url("/search?q={searchTerms}"), fixtures.url("/suggest?q={searchTerms}")
+    )
+    engines.select("fixture")
+    client = window.search_suggestions
+    rng = random.Random(7)
+    terms = rng.sample(FixtureServer.SUGGEST_TERMS, min(words, len(FixtureServer.SUGGEST_TERMS)))
+
+    results = {"words": len(terms), "keystrokes": sum(len(term) for term in terms)}
+    for run in ("cold", "warm"):
+        before = (client.requests, client.cancelled, client.cache_hits, fixtures.suggest_requests)
+        samples = []
+        answered = 0
+        for term in terms:
+            for end in range(1, len(term) + 1):
+                text = term[:end]
+                window.url_bar.setText(text)
+                started = time.perf_counter()
+                window.update_url_suggestions(text)
+                samples.append(time.perf_counter() - started)
+                # Keystroke gaps around the debounce interval: some requests go out and are superseded
+                resume = time.monotonic() + rng.uniform(0.5, 1.5) * keystroke_ms / 1000
+                wait_until(lambda: time.monotonic() >= resume)
+            wait_until(lambda: client.reply is None and not client.debounce_timer.isActive(), 5)
+            answered += term in window.url_suggestions.stringList()
+        after = (client.requests, client.cancelled, client.cache_hits, fixtures.suggest_requests)
+        requests, cancelled, cache_hits, served = (a - b for a, b in zip(after, before))
+        results[run] = {
+            "keystroke": summarize_timings(samples),
+            "requests": requests,
+            "cancelled": cancelled,
+            "cache_hits": cache_hits,
+            "server_requests": served,
+            "words_suggested": answered,
+        }
+
+    window.close()
+    fixtures.stop()
+    return results
+
+
+@benchmark("downloads", isolated=True)
+def bench_downloads(files=5, size_gb=4, max_active=3, global_limit_mbps=40, limit_mbps=16, seconds=8):
+    """
+    Downloads `files` sparse multi-GB files from the fixture server through the DownloadManager
+    for `seconds`: concurrency cap, achieved versus allowed rates, how many UI updates the
+    progress signals were coalesced into, GUI-thread timer lateness, then pause and resume.
+    """
+    app = offscreen_application()
+    fixtures = FixtureServer()
+    size = size_gb * 1024 ** 3
+    for i in range(files):
+        fixtures.add_sparse_file(f"/files/big-{i}.bin", size)
+    fixtures.start()
+    window = BrowserWindow()
+    window.finish_startup()
+    window.show()
+    manager = window.downloads
+
+    results = {"files": files, "file_bytes": size, "max_active": max_active,
+               "global_limit_mbps": global_limit_mbps, "limit_mbps": limit_mbps}
+    with tempfile.TemporaryDirectory() as tmp:
+        manager.directory = tmp
+        manager.max_active = max_active
+        manager.default_limit_bps = limit_mbps * 1024 * 1024
+        manager.global_limit_bps = global_limit_mbps * 1024 * 1024
+
+        counts = {"progress_signals": 0, "ui_updates": 0}
+        manager.added.connect(lambda d: d.item.downloadProgress.connect(
+            lambda received, total: counts.__setitem__("progress_signals", counts["progress_signals"] + 1)))
+        manager.changed.connect(lambda: counts.__setitem__("ui_updates", counts["ui_updates"] + 1))
+
+        # Lateness of a 16 ms timer shows whether the GUI thread keeps up
+        ticks = []
+        frame_timer = QTimer()
+        frame_timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+        frame_timer.start(16)
+
+        page = window.current_browser().page()
+        for i in range(files):
+            page.download(QUrl(fixtures.url(f"/files/big-{i}.bin")))
+        wait_until(lambda: len(manager.downloads) == files, 10)
+
+        most_active = 0
+        started = time.monotonic()
+        while time.monotonic() - started < seconds:
+            most_active = max(most_active, len(manager.active))
+            app.processEvents(QEventLoop.AllEvents, 10)
+            time.sleep(0.001)
+        elapsed = time.monotonic() - started
+        frame_timer.stop()
+
+        received = sum(d.item.receivedBytes() for d in manager.downloads.values())
+        gaps = [(b - a) - 0.016 for a, b in zip(ticks, ticks[1:])]
+        results.update({
+            "most_active": most_active,
+            "received_mb": received / 1024 ** 2,
+            "rate_mbps": received / elapsed / 1024 ** 2,
+            "per_download_mbps": [round(d.item.receivedBytes() / elapsed / 1024 ** 2, 2)
+                                  for d in manager.downloads.values()],
+            "progress_signals": counts["progress_signals"],
+            "ui_updates": counts["ui_updates"],
+            "timer_lateness": summarize_timings([max(0.0, gap) for gap in gaps]) if gaps else None,
+        })
+
+        # Paused downloads must stop growing (beyond what was already buffered) and continue on resume
+        paused = list(manager.active)
+        for download in paused:
+            manager.pause(download.id)
+        wait_until(lambda: False, 0.5)
+        before = sum(d.item.receivedBytes() for d in paused)
+        wait_until(lambda: False, 1.0)
+        results["paused_growth_kb"] = (sum(d.item.receivedBytes() for d in paused) - before) / 1024
+        for download in paused:
+            manager.resume(download.id)
+        before = sum(d.item.receivedBytes() for d in paused)
+        wait_until(lambda: False, 1.0)
+        results["resumed_growth_kb"] = (sum(d.item.receivedBytes() for d in paused) - before) / 1024
+
+        for download_id in list(manager.downloads):
+            manager.cancel(download_id)
+        wait_until(lambda: not manager.active and not manager.queue, 10)
+        window.close()
+    fixtures.stop()
+    return results
+
+
+@benchmark("tab-overview", isolated=True)
+def bench_tab_overview(tabs=100, captures=20):
+    """
+    GUI-thread cost of capturing a thumbnail when a tab is left, and of opening the overview with
+    `tabs` restored (placeholder) tabs whose thumbnails are only on disk; no renderer may be woken.
+    """
+    app = offscreen_application()
+    fixtures = FixtureServer().start()
+    window = BrowserWindow()
+    window.finish_startup()
+    window.show()
+    app.processEvents()
+    results = {"tabs": tabs}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Capturing a loaded page: what current_tab_changed adds to a tab switch
+        seeding = ThumbnailCache(tmp)
+        browser = window.current_browser()
+        browser.setUrl(QUrl(fixtures.url("/light")))
+        wait_until(lambda: browser.url().toString() == fixtures.url("/light") and not browser.page().isLoading(), 30)
+        samples = []
+        for _ in range(captures):
+            seeding.captured_at.clear()
+            started = time.perf_counter()
+            seeding.capture(browser)
+            samples.append(time.perf_counter() - started)
+        results["capture"] = summarize_timings(samples)
+
+        # Thumbnails of the restored tabs exist only on disk, as after a restart
+        urls = [f"https://site{i}.test/" for i in range(tabs)]
+        page_image = QImage(1280, 800, QImage.Format_RGB32)
+        for i, url in enumerate(urls):
+            page_image.fill(QColor.fromHsv(i * 37 % 360, 160, 200))
+            seeding.store(url, page_image.copy())
+        seeding.close()  # Returns once the queued thumbnails are written
+
+        window.thumbnails = ThumbnailCache(tmp)
+        restored = [TabContent(window, placeholder={"url": url, "title": ""}) for url in urls]
+        for i, tab_widget in enumerate(restored):
+            window.tabs.addTab(tab_widget, f"Site {i}")
+        started = time.perf_counter()
+        dialog = TabOverviewDialog(window)
+        results["open_ms"] = (time.perf_counter() - started) * 1e3
+        wait_until(lambda: len(window.thumbnails.images) >= tabs, 30)
+        results["all_thumbnails_ms"] = (time.perf_counter() - started) * 1e3
+        results["renderers_woken"] = sum(1 for tab_widget in restored if not tab_widget.is_placeholder())
+        results["thumbnails"] = window.thumbnails.stats()
+        dialog.close()
+        window.thumbnails.close()
+        window.thumbnails = window.services.thumbnails
+
+    window.close()
+    fixtures.stop()
+    return results
+
+
+# --- LOCAL FIXTURE SERVER ---
+
+class FixtureServer:
+    """
+    Local HTTP server with pages of known weight, so headless runs and benchmarks give
+    reproducible results without network access. Content is generated once, in memory.
+    """
+    PAGES = ("/light", "/medium", "/heavy", "/slow")
+    # Answered by the OpenSearch suggestion stub at /suggest?q=...
+    SUGGEST_TERMS = tuple(
+        f"{topic} {aspect}"
+        for topic in ("safwat", "browser", "python", "qt webengine", "render", "cache", "layout")
+        for aspect in ("tutorial", "download", "release notes", "performance", "settings", "shortcuts")
+    )
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.routes = {}
+        self.suggest_delay_secs = 0  # Simulated engine latency
+        self.suggest_requests = 0
+        self.files_dir = None  # Sparse download files, created on first use
+        self._add_pages()
+        self.add_route("/suggest", self._suggest)
+
+        fixture_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                fixture_server._serve(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self.httpd.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="FixtureServer", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.files_dir is not None:
+            for name in os.listdir(self.files_dir):
+                os.remove(os.path.join(self.files_dir, name))
+            os.rmdir(self.files_dir)
+
+    def url(self, path):
+        return self.base_url + path
+
+    def add_route(self, path, handler):
+        """Routes GET `path` to handler(request, query), which writes the whole response."""
+        self.routes[path] = handler
+
+    def add_static(self, path, body, content_type="text/html; charset=utf-8", delay_secs=0):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        def handler(request, query):
+            if delay_secs:
+                time.sleep(delay_secs)
+            request.send_response(200)
+            request.send_header("Content-Type", content_type)
+            request.send_header("Content-Length", str(len(body)))
+            request.send_header("Cache-Control", "no-store")
+            request.end_headers()
+            request.wfile.write(body)
+
+        self.add_route(path, handler)
+
+    def add_sparse_file(self, path, size_bytes):
+        """
+        Serves a download of `size_bytes` zero bytes from a sparse file, which takes no disk space.
+        Range requests are answered, so interrupted downloads can continue.
+        """
+        if self.files_dir is None:
+            self.files_dir = tempfile.mkdtemp(prefix="safwat-fixtures-")
+        file_path = os.path.join(self.files_dir, f"{len(os.listdir(self.files_dir))}.bin")
+        with open(file_path, "wb") as f:
+            f.truncate(size_bytes)
+        name = os.path.basename(path)
+
+        def handler(request, query):
+            start, end = 0, size_bytes - 1
+            ranged = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+            if ranged:
+                start = int(ranged.group(1))
+                end = min(int(ranged.group(2)), end) if ranged.group(2) else end
+                if start > end:
+                    request.send_error(416)
+                    return
+                request.send_response(206)
+                request.send_header("Content-Range", f"bytes {start}-{end}/{size_bytes}")
+            else:
+                request.send_response(200)
+            request.send_header("Content-Type", "application/octet-stream")
+            request.send_header("Content-Disposition", f'attachment; filename="{name}"')
+            request.send_header("Content-Length", str(end - start + 1))
+            request.send_header("Accept-Ranges", "bytes")
+            request.end_headers()
+            with open(file_path, "rb") as f:
+                request.connection.sendfile(f, start, end - start + 1)
+
+        self.add_route(path, handler)
+
+    def _suggest(self, request, query):
+        self.suggest_requests += 1
+        if self.suggest_delay_secs:
+            time.sleep(self.suggest_delay_secs)
+        typed = query.get("q", [""])[0]
+        matches = [term for term in self.SUGGEST_TERMS if term.startswith(typed.lower())][:10]
+        body = json.dumps([typed, matches]).encode("utf-8")
+        request.send_response(200)
+        request.send_header("Content-Type", "application/x-suggestions+json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def _serve(self, request):
+        parts = urlsplit(request.path)
+        handler = self.routes.get(parts.path)
+        if handler is None:
+            request.send_error(404)
+            return
+        try:
+            handler(request, parse_qs(parts.query))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The page was closed or the load abandoned
+
+    def _add_pages(self):
+        rng = random.Random(0)  # Same content on every run
+        words = ["safwat", "browser", "tab", "render", "frame", "paint", "layout", "script", "style", "cache"]
+
+        def paragraph(n_words):
+            return " ".join(rng.choice(words) for _ in range(n_words))
+
+        def image(i):
+            hue = i * 37 % 360
+            return (f'<svg xmlns="http://www.w3.org/2000/svg" width="160" height="90">'
+                    f'<rect width="160" height="90" fill="hsl({hue},60%,50%)"/>'
+                    f'<text x="10" y="50">{i}</text></svg>')
+
+        def script(iterations):
+            # Deterministic main-thread work, like a heavy page's framework boot
+            return f"let x = 0; for (let i = 0; i < {iterations}; i++) {{ x = (x * 31 + i) % 1000003; }} window.fixtureResult = x;"
+
+        self.add_static("/light", "<!DOCTYPE html><html><head><title>Light</title></head>"
+                                  f"<body><h1>Light page</h1><p>{paragraph(200)}</p></body></html>")
+
+        for i in range(200):
+            self.add_static(f"/assets/img-{i}.svg", image(i), "image/svg+xml")
+        self.add_static("/assets/style.css", "body { font-family: sans-serif; } td { padding: 2px; } "
+                                             + " ".join(f".c{i} {{ color: hsl({i}, 50%, 40%); }}" for i in range(2000)),
+                        "text/css")
+        for i in range(5):
+            self.add_static(f"/assets/app-{i}.js", script(2_000_000), "application/javascript")
+
+        medium_images = "".join(f'<img src="/assets/img-{i}.svg">' for i in range(20))
+        medium_text = "".join(f"<p>{paragraph(150)}</p>" for _ in range(100))
+        self.add_static("/medium", '<!DOCTYPE html><html><head><title>Medium</title>'
+                                   '<link rel="stylesheet" href="/assets/style.css"><script src="/assets/app-0.js"></script>'
+                                   f"</head><body><h1>Medium page</h1>{medium_images}{medium_text}</body></html>")
+
+        heavy_images = "".join(f'<img src="/assets/img-{i}.svg">' for i in range(200))
+        heavy_scripts = "".join(f'<script src="/assets/app-{i}.js"></script>' for i in range(5))
+        heavy_rows = "".join(
+            f'<tr class="c{i % 2000}">' + "".join(f"<td>{rng.choice(words)}{j}</td>" for j in range(10)) + "</tr>"
+            for i in range(5000)
+        )
+        self.add_static("/heavy", '<!DOCTYPE html><html><head><title>Heavy</title>'
+                                  f'<link rel="stylesheet" href="/assets/style.css">{heavy_scripts}</head>'
+                                  f"<body><h1>Heavy page</h1>{heavy_images}<table>{heavy_rows}</table></body></html>")
+
+        self.add_static("/slow", "<!DOCTYPE html><html><head><title>Slow</title></head>"
+                                 "<body><h1>Slow server</h1><p>Answered after 500 ms.</p></body></html>",
+                        delay_secs=0.5)
+
+
+# --- HEADLESS MODE ---
+
+class HeadlessRunner(QObject):
+    """
+    Loads a list of URLs through `concurrency` views built exactly like browser tabs
+    (create_web_view: profile, zoom, content blocker) and records one result per URL.
+    """
+    finished = pyqtSignal()
+
+    def __init__(self, urls, concurrency, profile, content_blocker, timeout_secs=HEADLESS_TIMEOUT_SECS, parent=None):
+        super().__init__(parent)
+        self.pending = deque(urls)
+        self.profile = profile
+        self.content_blocker = content_blocker
+        self.timeout_secs = timeout_secs
+        self.results = []
+        self.busy = {}  # view -> (url, started)
+        self.views = [self._create_view() for _ in range(max(1, min(concurrency, len(urls))))]
+
+    def _create_view(self):
+        view = create_web_view(self.profile, self.content_blocker)
+        view.resize(1280, 800)
+        view.show()
+        view.loadFinished.connect(lambda ok, v=view: self._on_load_finished(v, ok))
+        view.timeout_timer = QTimer(view)
+        view.timeout_timer.setSingleShot(True)
+        view.timeout_timer.timeout.connect(lambda v=view: self._on_timeout(v))
+        return view
+
+    def start(self):
+        for view in self.views:
+            self._load_next(view)
+
+    def _load_next(self, view):
+        if not self.pending:
+            if not self.busy:
+                self.finished.emit()
+            return
+        url = self.pending.popleft()
+        self.busy[view] = (url, time.perf_counter())
+        view.timeout_timer.start(int(self.timeout_secs * 1000))
+        view.setUrl(QUrl(url))
+
+    def _record(self, view, ok, error=None):
+        url, started = self.busy.pop(view)
+        view.timeout_timer.stop()
+        pid = view.page().renderProcessPid()
+        self.results.append({
+            "url": url,
+            "ok": ok,
+            "load_ms": round((time.perf_counter() - started) * 1e3, 2),
+            "renderer_pid": pid,
+            "renderer_rss_kb": read_process_rss_kb(pid),
+            "error": error or ("" if ok else "load failed"),
+        })
+
+    def _on_load_finished(self, view, ok):
+        self._record(view, ok)
+        self._load_next(view)
+
+    def _on_timeout(self, view):
+        self._record(view, False, f"timed out after {self.timeout_secs:g}s")
+        # A stuck view is replaced rather than reused, so its late loadFinished cannot be
+        # mistaken for the next URL's
+        view.loadFinished.disconnect()
+        view.deleteLater()
+        replacement = self._create_view()
+        self.views[self.views.index(view)] = replacement
+        self._load_next(replacement)
+
+    def dispose(self):
+        for view in self.views:
+            view.deleteLater()
+        self.views = []
+
+
+def write_headless_results(results, output):
+    """Writes results as CSV when `output` ends in .csv, otherwise as JSON (stdout without a path)."""
+    if output and output.lower().endswith(".csv"):
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results["results"][0]) if results["results"] else ["url"])
+            writer.writeheader()
+            writer.writerows(results["results"])
+    elif output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+def run_headless(url_file=None, concurrency=HEADLESS_CONCURRENCY, output=None, timeout_secs=HEADLESS_TIMEOUT_SECS,
+                 trace_path=None):
+    """
+    Runs a batch of page loads offscreen against the bundled fixture server and/or real URLs.
+    With `trace_path`, the whole batch is recorded as one Chrome performance trace.
+    """
+    if trace_path:
+        port = free_local_port()
+        enable_remote_debugging(port)
+    app = offscreen_application()
+    fixtures = FixtureServer().start()
+    if url_file:
+        with (sys.stdin if url_file == "-" else open(url_file)) as f:
+            lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        lines = list(FixtureServer.PAGES)
+    urls = [fixtures.url(line) if line.startswith("/") else line for line in lines]
+
+    settings = QSettings(SETTINGS_FILE, QSettings.IniFormat)
+    profile = BrowserProfile(settings, app)
+    runner = HeadlessRunner(urls, concurrency, profile, ContentBlocker(), timeout_secs)
+    recorder = None
+    if trace_path and urls:
+        recorder = TraceRecorder(port)
+        recorder.start(trace_path, metadata={"fixture_server": fixtures.base_url, "urls": urls})
+        # Loads only start once tracing has, so the first navigations are in the trace
+        wait_until(lambda: recorder.state != "connecting")
+    loop = QEventLoop()
+    runner.finished.connect(loop.quit)
+    started = time.perf_counter()
+    QTimer.singleShot(0, runner.start)
+    if urls:
+        loop.exec_()
+    if recorder is not None:
+        recorder.stop()
+        wait_until(lambda: recorder.state == "idle")
+
+    loaded = [r["load_ms"] / 1e3 for r in runner.results if r["ok"]]
+    write_headless_results({
+        "concurrency": len(runner.views),
+        "fixture_server": fixtures.base_url,
+        "wall_secs": round(time.perf_counter() - started, 3),
+        "succeeded": len(loaded),
+        "failed": len(runner.results) - len(loaded),
+        "load_time": summarize_timings(loaded) if loaded else {},
+        "trace": (recorder.error or recorder.path) if recorder else None,
+        "results": runner.results,
+    }, output)
+
+    runner.dispose()
+    fixtures.stop()
+    return 0 if len(loaded) == len(runner.results) else 1
+
+
+# --- PERFORMANCE REGRESSION SUITE ---
+PERF_OPERATIONS = {}
+
+def perf_operation(name):
+    """
+    Registers a BrowserWindow operation for `python setup.py --perf`. The function gets a
+    freshly started window and a run count, and returns one duration in seconds per run.
+    """
+    def register(func):
+        PERF_OPERATIONS[name] = func
+        return func
+    return register
+
+
+def _placeholder_tabs(window, count):
+    for i in range(count):
+        window.tabs.addTab(TabContent(window, placeholder={"url": f"https://site{i}.test/", "title": ""}), f"Tab {i}")
+
+
+@perf_operation("open_close_tab")
+def perf_open_close_tab(window, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        window.add_new_tab(QUrl(NEW_TAB_URL))
+        window.close_current_tab(window.tabs.currentIndex())
+        QApplication.processEvents()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@perf_operation("navigate_to_url")
+def perf_navigate_to_url(window, runs):
+    # One input per branch of the classification: local path, URL, search, bare host
+    inputs = [tempfile.gettempdir(), "https://example.com/path?q=1", "safwat browser tips", "example.com"]
+    browser = window.current_browser()
+    samples = []
+    for i in range(runs):
+        window.url_bar.setText(inputs[i % len(inputs)])
+        started = time.perf_counter()
+        window.navigate_to_url()
+        samples.append(time.perf_counter() - started)
+        browser.stop()
+    return samples
+
+
+@perf_operation("apply_theme_100_tabs")
+def perf_apply_theme(window, runs):
+    _placeholder_tabs(window, 100)
+    samples = []
+    for i in range(runs):
+        started = time.perf_counter()
+        window.apply_theme("light" if i % 2 == 0 else "dark")
+        QApplication.processEvents()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+@perf_operation("add_remove_quick_link_200_links")
+def perf_add_remove_quick_link(window, runs):
+    links = window.quick_links
+    first_added = links.rowCount()
+    for i in range(200):
+        links.add_link(f"Link {i}", f"https://link{i}.test/")
+    QApplication.processEvents()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        links.remove_link(links.add_link("Perf Link", "https://perf.test/"))
+        QApplication.processEvents()
+        samples.append(time.perf_counter() - started)
+    # Later operations share the data directory: leave the saved links as they were
+    while links.rowCount() > first_added:
+        links.remove_link(links.rowCount() - 1)
+    return samples
+
+
+@perf_operation("load_flappy_bird_game")
+def perf_load_flappy_bird_game(window, runs):
+    browser = window.current_browser()
+    finished = []
+    browser.loadFinished.connect(finished.append)
+    samples = []
+    for _ in range(runs):
+        finished.clear()
+        started = time.perf_counter()
+        window.load_flappy_bird_game()
+        wait_until(lambda: finished)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def run_perf_suite(baseline_path=PERF_BASELINE_FILE, update_baseline=False, threshold=PERF_REGRESSION_THRESHOLD,
+                   repeat=PERF_REPEAT, output=None):
+    """
+    Runs every registered operation in its own window and compares medians with the baseline.
+    Unless the baseline is being updated, returns 1 if any operation regressed past the threshold,
+    else 2 if any operation has no baseline to be checked against.
+    """
+    app = offscreen_application()
+    results = {}
+    for name, operation in PERF_OPERATIONS.items():
+        window = BrowserWindow()
+        window.finish_startup()
+        # An empty warm pool keeps background view creation out of the timings
+        window.tab_pool.configure(0, None)
+        window.show()
+        app.processEvents()
+        samples = operation(window, PERF_WARMUP + repeat)[PERF_WARMUP:]
+        results[name] = summarize_timings(samples)
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+
+    try:
+        with open(baseline_path) as f:
+            baseline = json.load(f).get("operations", {})
+    except (OSError, ValueError):
+        baseline = {}
+
+    regressions = []
+    missing = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            missing.append(name)
+            continue
+        stats["baseline_p50_ms"] = base["p50_ms"]
+        stats["ratio"] = round(stats["p50_ms"] / max(base["p50_ms"], 1e-9), 3)
+        if stats["p50_ms"] > base["p50_ms"] * (1 + threshold) and stats["p50_ms"] - base["p50_ms"] > PERF_NOISE_FLOOR_MS:
+            regressions.append(name)
+
+    report = json.dumps({
+        "baseline": baseline_path if baseline else None,
+        "threshold": threshold,
+        "operations": results,
+        "regressions": regressions,
+        "missing_baseline": missing,
+    }, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+    if update_baseline:
+        atomic_write(os.path.abspath(baseline_path), json.dumps({
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "operations": {
+                name: {key: value for key, value in stats.items() if key not in ("baseline_p50_ms", "ratio")}
+                for name, stats in results.items()
+            },
+        }, indent=2).encode())
+        print(f"Baseline written to {baseline_path}", file=sys.stderr)
+        return 0
+    if regressions:
+        print(f"Performance regressions: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    if missing:
+        # Nothing was checked for these: a missing baseline must not pass as "no regressions"
+        print(f"No baseline for: {', '.join(missing)}; record one with --update-baseline", file=sys.stderr)
+        return 2
+    return 0
+
+
+# Qt's own command-line options that take a value; split off so the value is not read as a URL
+QT_OPTIONS_WITH_VALUE = ("-platform", "-platformpluginpath", "-platformtheme", "-plugin", "-qwindowgeometry",
+                         "-qwindowicon", "-qwindowtitle", "-style", "-stylesheet", "-session", "-display", "-geometry")
+
+def split_qt_args(argv):
+    """Returns (our arguments, Qt's options with their values)."""
+    own, qt = [], []
+    args = iter(argv)
+    for arg in args:
+        if arg in QT_OPTIONS_WITH_VALUE:
+            qt += [arg, next(args, "")]
+        else:
+            own.append(arg)
+    return own, qt
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Safwat Browser")
+    parser.add_argument("--bench", choices=sorted(BENCHMARKS), help="Run a benchmark and print its results as JSON")
+    parser.add_argument("--profile-startup", nargs="?", const="startup-trace.json", metavar="TRACE",
+                        help="Write a Chrome trace of the startup phases (default: startup-trace.json)")
+    headless = parser.add_argument_group("headless mode")
+    headless.add_argument("--headless", action="store_true",
+                          help="Load a list of pages offscreen and report load time, success and renderer memory")
+    headless.add_argument("--urls", metavar="FILE",
+                          help="URLs to load, one per line; paths like /heavy refer to the bundled fixture server "
+                               "(default: every fixture page)")
+    headless.add_argument("--concurrency", type=int, default=HEADLESS_CONCURRENCY, help="Pages loaded at once")
+    headless.add_argument("--timeout", type=float, default=HEADLESS_TIMEOUT_SECS, help="Seconds before a load is abandoned")
+    headless.add_argument("--trace", metavar="FILE",
+                          help="Record the whole batch as a Chrome performance trace in FILE")
+    perf = parser.add_argument_group("performance regression suite")
+    perf.add_argument("--perf", action="store_true", help="Time core BrowserWindow operations and compare them to a baseline")
+    perf.add_argument("--baseline", metavar="FILE", default=PERF_BASELINE_FILE, help="Baseline to compare against")
+    perf.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    perf.add_argument("--threshold", type=float, default=PERF_REGRESSION_THRESHOLD,
+                      help="Allowed slowdown of an operation's median as a fraction (default: 0.25)")
+    perf.add_argument("--repeat", type=int, default=PERF_REPEAT, help="Timed runs per operation")
+    parser.add_argument("--stall-threshold", type=int, metavar="MS", default=STALL_THRESHOLD_MS,
+                        help="Log GUI-thread stalls longer than MS to stalls.log (0 disables; default: %(default)s)")
+    parser.add_argument("urls", nargs="*", metavar="URL", help="Pages to open; handed to the running browser if there is one")
+    parser.add_argument("--new-window", action="store_true", help="Open the URLs in a new window")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="Start a separate browser process even if one is running on the same data directory")
+    parser.add_argument("--remote-debugging-port", type=int, metavar="PORT", default=REMOTE_DEBUGGING_PORT,
+                        help="Open the DevTools protocol endpoint on 127.0.0.1:PORT, which performance traces use")
+    parser.add_argument("--metrics-jsonl", metavar="FILE",
+                        help="Append per-tab metrics (load time, renderer PID, RSS, CPU, state) to FILE as JSON Lines")
+    parser.add_argument("--output", metavar="FILE",
+                        help="Write --headless or --perf results to FILE (.json, or .csv for headless runs) instead of stdout")
+    # Unknown arguments are left for Qt (e.g. -platform, -style)
+    own_args, qt_args = split_qt_args(sys.argv[1:])
+    args, unknown_args = parser.parse_known_args(own_args)
+    qt_args += unknown_args
+
+    if args.bench:
+        bench = BENCHMARKS[args.bench]
+        if bench.isolated and "SAFWAT_DATA_DIR" not in os.environ:
+            sys.exit(run_isolated())
+        print(json.dumps(bench(), indent=2))
+        sys.exit(0)
+
+    if args.headless:
+        if "SAFWAT_DATA_DIR" not in os.environ:
+            sys.exit(run_isolated())
+        sys.exit(run_headless(args.urls, args.concurrency, args.output, args.timeout, args.trace))
+
+    if args.perf:
+        if "SAFWAT_DATA_DIR" not in os.environ:
+            sys.exit(run_isolated())
+        sys.exit(run_perf_suite(args.baseline, args.update_baseline, args.threshold, args.repeat, args.output))
+
+    if SINGLE_INSTANCE and not args.new_instance and forward_to_running_instance(APP_DATA_DIR, args.urls, args.new_window):
+        sys.exit(0)
+
+    profiler = StartupProfiler(args.profile_startup)
+    profiler.add("imports", PROCESS_STARTED, time.perf_counter())
+
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
+    InternalPageHandler.register_scheme()
+    if args.remote_debugging_port:
+        enable_remote_debugging(args.remote_debugging_port)
     
-    app = QApplication(sys.argv)
+    with profiler.phase("QApplication"):
+        app = QApplication(sys.argv[:1] + qt_args)
+
+    if args.stall_threshold > 0:
+        watchdog = StallWatchdog(args.stall_threshold).start()
+        app.aboutToQuit.connect(watchdog.stop)
     
-    window = BrowserWindow()
-    window.show()
+    with profiler.phase("BrowserWindow"):
+        window = BrowserWindow(profiler, metrics_path=args.metrics_jsonl, remote_debugging_port=args.remote_debugging_port,
+                               startup_urls=[QUrl.fromUserInput(url, os.getcwd()) for url in args.urls])
+    if SINGLE_INSTANCE and not args.new_instance:
+        instance_server = InstanceServer(parent=app)
+        instance_server.urlsReceived.connect(window.services.open_urls)
+        app.aboutToQuit.connect(instance_server.close)
+    with profiler.phase("show"):
+        window.show()
     
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,23 @@
+import importlib.util
+import os
+
+import pytest
+
+SETUP_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "setup.py")
+
+
+@pytest.fixture(scope="session")
+def browser():
+    """The browser module (setup.py), loaded under its own name so it is not run as a script."""
+    # QtWebEngine can be installed yet fail to load its system libraries, which is an ImportError too
+    pytest.importorskip("PyQt5.QtWebEngineWidgets", exc_type=ImportError)
+    spec = importlib.util.spec_from_file_location("safwat_browser", SETUP_PY)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def qapp(browser):
+    """The offscreen QApplication, kept referenced for the whole session so PyQt does not delete it."""
+    return browser.offscreen_application()
@@ -0,0 +1,167 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def classify(browser):
+    return browser.AddressClassifier({"@google": "google", "@DDG": "duckduckgo"}).classify
+
+
+@pytest.mark.parametrize("text, value", [
+    ("example.com", "https://example.com"),
+    ("Example.COM", "https://Example.COM"),
+    ("www.example.com/path?q=1#top", "https://www.example.com/path?q=1#top"),
+    ("example.com.", "https://example.com."),
+    ("example.com?q", "https://example.com?q"),
+    ("example.com#top", "https://example.com#top"),
+    ("my-site.example.org", "https://my-site.example.org"),
+    ("bbc.co.uk/news", "https://bbc.co.uk/news"),
+    ("https://example.com/a b", "https://example.com/a b"),
+    ("HTTP://example.com", "HTTP://example.com"),
+    ("about:blank", "about:blank"),
+    ("view-source:https://example.com", "view-source:https://example.com"),
+    ("data:text/plain,hi", "data:text/plain,hi"),
+    ("localhost", "http://localhost"),
+    ("localhost:8080/app", "http://localhost:8080/app"),
+    ("app.localhost", "http://app.localhost"),
+    ("myhost.lan:3000", "http://myhost.lan:3000"),
+    ("intranet/wiki", "http://intranet/wiki"),
+    ("192.168.1.1", "http://192.168.1.1"),
+    ("10.0.0.255:8000/status", "http://10.0.0.255:8000/status"),
+    ("[::1]", "http://[::1]"),
+    ("[::1]:3000/x", "http://[::1]:3000/x"),
+    ("[2001:db8::1]/", "http://[2001:db8::1]/"),
+    ("  example.com  ", "https://example.com"),
+])
+def test_urls(browser, classify, text, value):
+    assert classify(text) == (browser.ADDRESS_URL, value, None)
+
+
+def test_internal_scheme_is_a_url(browser, classify):
+    text = f"{browser.INTERNAL_SCHEME}://newtab"
+    assert classify(text) == (browser.ADDRESS_URL, text, None)
+
+
+@pytest.mark.parametrize("text, value", [
+    ("münchen.de", "https://münchen.de"),
+    ("пример.ru", "https://пример.ru"),
+    ("例子.cn/路径", "https://例子.cn/路径"),
+    ("xn--mnchen-3ya.de", "https://xn--mnchen-3ya.de"),
+])
+def test_internationalized_hosts(browser, classify, text, value):
+    assert classify(text) == (browser.ADDRESS_URL, value, None)
+
+
+@pytest.mark.parametrize("text, value", [
+    ("python", "python"),
+    ("python tutorial", "python tutorial"),
+    ("what is 2+2?", "what is 2+2?"),
+    ("c++ & rust", "c++ & rust"),
+    ("example.com is down", "example.com is down"),
+    ("tab\tseparated", "tab\tseparated"),
+    ("?example.com", "example.com"),
+    ("?  leading spaces", "leading spaces"),
+    ("999.1.1.1", "999.1.1.1"),
+    ("1.2.3", "1.2.3"),
+    ("1.5", "1.5"),
+    ("co.uk", "co.uk"),
+    ("com", "com"),
+    ("a..com", "a..com"),
+    (".com", ".com"),
+    ("-example.com", "-example.com"),
+    ("example-.com", "example-.com"),
+    ("foo.notatld", "foo.notatld"),
+    ("user@example.com", "user@example.com"),
+    ("host:99999", "host:99999"),
+    ("host:port", "host:port"),
+    ("[::1]:99999", "[::1]:99999"),
+    ("[not-ipv6]", "[not-ipv6]"),
+    ("javascript:alert(1)", "javascript:alert(1)"),
+    ("a" * 250 + ".com", "a" * 250 + ".com"),
+])
+def test_searches(browser, classify, text, value):
+    assert classify(text) == (browser.ADDRESS_SEARCH, value, None)
+
+
+@pytest.mark.parametrize("text, value, engine", [
+    ("@google python tips", "python tips", "google"),
+    ("@GOOGLE Python Tips", "Python Tips", "google"),
+    ("@ddg privacy", "privacy", "duckduckgo"),
+    ("@google   ", "@google", None),
+    ("@bing python", "@bing python", None),
+])
+def test_search_keywords(browser, classify, text, value, engine):
+    assert classify(text) == (browser.ADDRESS_SEARCH, value, engine)
+
+
+@pytest.mark.parametrize("text", [
+    "/etc/hosts",
+    "./notes 2024.txt",
+    "../parent",
+    "C:\\Users",
+    "c:/windows",
+    "\\\\server\\share",
+])
+def test_paths(browser, classify, text):
+    assert classify(text) == (browser.ADDRESS_PATH, text, None)
+
+
+def test_home_path_is_expanded(browser, classify):
+    assert classify("~/Downloads") == (browser.ADDRESS_PATH, os.path.expanduser("~/Downloads"), None)
+
+
+@pytest.mark.parametrize("text", ["", "   ", "\t\n"])
+def test_blank_input(classify, text):
+    assert classify(text) is None
+
+
+def test_builtin_examples_match(browser):
+    result = browser.bench_address_bar(inputs=1000)
+    assert result["mismatches"] == []
+
+
+@pytest.mark.parametrize("host, valid", [
+    ("example.com", True),
+    ("a-b.example.com", True),
+    ("münchen.de", True),
+    ("localhost", True),
+    ("", False),
+    ("-a.com", False),
+    ("a-.com", False),
+    ("a.-b.com", False),
+    (".a.com", False),
+    ("a..com", False),
+    ("a_b.com", False),
+    ("a" * 254, False),
+])
+def test_is_hostname(browser, host, valid):
+    assert browser.is_hostname(host) is valid
+
+
+@pytest.mark.parametrize("host, valid", [
+    ("192.168.1.1", True),
+    ("0.0.0.0", True),
+    ("255.255.255.255", True),
+    ("256.1.1.1", False),
+    ("01.2.3.4", False),
+    ("1.2.3", False),
+    ("1.2.3.4.5", False),
+    ("١.٢.٣.٤", False),
+    ("1.2.3.4\x00", False),
+])
+def test_is_ipv4(browser, host, valid):
+    assert browser.is_ipv4(host) is valid
+
+
+def test_public_suffix_file(browser, tmp_path):
+    path = tmp_path / "public_suffix_list.dat"
+    path.write_text("// comment\n\ncom\nco.uk\n*.ck\n!www.ck\nEXAMPLE\n", encoding="utf-8")
+    assert browser.public_suffixes(str(path)) == {"com", "co.uk", "ck", "www.ck", "example"}
+    classify = browser.AddressClassifier(suffixes=browser.public_suffixes(str(path))).classify
+    assert classify("foo.example")[0] == browser.ADDRESS_URL
+    assert classify("foo.org")[0] == browser.ADDRESS_SEARCH
+
+
+def test_missing_public_suffix_file_falls_back(browser, tmp_path):
+    assert browser.public_suffixes(str(tmp_path / "missing.dat")) is browser.BUILTIN_PUBLIC_SUFFIXES
@@ -0,0 +1,167 @@
+import pytest
+
+TOTAL_KB = 1_000_000
+
+
+class FakePage:
+    def __init__(self, active, pid, audible=False):
+        self.state = active
+        self.pid = pid
+        self.audible = audible
+
+    def lifecycleState(self):
+        return self.state
+
+    def recentlyAudible(self):
+        return self.audible
+
+    def renderProcessPid(self):
+        return self.pid
+
+
+class FakeView:
+    def __init__(self, page, url):
+        self._page = page
+        self._url = url
+
+    def page(self):
+        return self._page
+
+    def url(self):
+        return self._url
+
+
+class FakeTab:
+    def __init__(self, browser, tab_id, pid, audible=False):
+        self.tab_id = tab_id
+        self.browser = FakeView(FakePage(browser.QWebEnginePage.LifecycleState.Active, pid, audible),
+                                browser.QUrl(f"https://example.com/{tab_id}"))
+
+    def is_placeholder(self):
+        return False
+
+
+class FakeTabs:
+    def __init__(self, tabs, current):
+        self.tabs = tabs
+        self.current = current
+
+    def currentWidget(self):
+        return self.current
+
+    def count(self):
+        return len(self.tabs)
+
+    def widget(self, index):
+        return self.tabs[index]
+
+    def tab_by_id(self, tab_id):
+        return next((t for t in self.tabs if t.tab_id == tab_id), None)
+
+
+class FakeLifecycle:
+    """Records transitions; shares the real shared-renderer check with TabLifecycleManager."""
+
+    def __init__(self, browser, tabs, events):
+        self.browser = browser
+        self.tabs = tabs
+        self.events = events
+        self.statesChanged = type("Signal", (), {"emit": lambda self, counts: None})()
+
+    def set_state(self, tab_widget, state):
+        page = tab_widget.browser.page()
+        if tab_widget is self.tabs.current or page.state == state:
+            return False
+        page.state = state
+        name = "freeze" if state == self.browser.QWebEnginePage.LifecycleState.Frozen else "discard"
+        self.events.append((name, tab_widget.tab_id))
+        return True
+
+    def renderer_in_use(self, pid, excluding=None):
+        return self.browser.TabLifecycleManager.renderer_in_use(self, pid, excluding)
+
+    def state_counts(self):
+        return {}
+
+
+class FakeDevTools:
+    def __init__(self, events):
+        self.events = events
+        self.open = True
+
+    def has_inspectors(self):
+        return self.open
+
+    def dispose_all(self):
+        self.open = False
+        self.events.append(("close DevTools", None))
+
+
+@pytest.fixture
+def make_monitor(browser, qapp):
+    def make(tabs, current, rss_kb):
+        events = []
+        tab_widgets = FakeTabs(tabs, current)
+        memory = {"used": 0}
+
+        def meminfo_reader():
+            return {"MemTotal": TOTAL_KB, "MemAvailable": TOTAL_KB * (100 - memory["used"]) // 100}
+
+        def rss_reader(pid):
+            # The renderer must be measured before its tab is discarded
+            for t in tabs:
+                if t.browser.page().pid == pid:
+                    assert t.browser.page().state != browser.QWebEnginePage.LifecycleState.Discarded
+            return rss_kb[pid]
+
+        monitor = browser.MemoryPressureMonitor(
+            tab_widgets, FakeLifecycle(browser, tab_widgets, events), FakeDevTools(events),
+            soft_percent=80, hard_percent=90, interval_ms=0,
+            meminfo_reader=meminfo_reader, rss_reader=rss_reader)
+        for t in tabs:
+            monitor.note_activated(t)
+        return monitor, memory, events
+
+    return make
+
+
+def test_soft_then_hard_pressure_freezes_then_discards_then_closes_devtools(browser, make_monitor):
+    tabs = [FakeTab(browser, tab_id, pid=100 + tab_id) for tab_id in range(1, 5)]
+    monitor, memory, events = make_monitor(tabs, current=tabs[-1], rss_kb={101: 40_000, 102: 40_000, 103: 40_000})
+
+    memory["used"] = 50
+    monitor.check()
+    assert monitor.level == "normal"
+    assert events == []
+
+    memory["used"] = 85
+    monitor.check()
+    assert monitor.level == "soft"
+    assert events == [("freeze", 1)]
+
+    # 95% against a soft limit of 80% leaves 150 MB to reclaim, more than the three background renderers hold
+    memory["used"] = 95
+    monitor.check()
+    assert monitor.level == "hard"
+    assert events == [("freeze", 1), ("discard", 1), ("discard", 2), ("discard", 3), ("close DevTools", None)]
+
+
+def test_hard_pressure_stops_discarding_once_enough_is_freed(browser, make_monitor):
+    tabs = [FakeTab(browser, tab_id, pid=100 + tab_id) for tab_id in range(1, 5)]
+    monitor, memory, events = make_monitor(tabs, current=tabs[-1], rss_kb={101: 200_000, 102: 200_000, 103: 200_000})
+
+    memory["used"] = 95
+    monitor.check()
+    assert events == [("discard", 1)]
+
+
+def test_renderer_shared_with_visible_or_audible_tab_is_not_counted_as_freed(browser, make_monitor):
+    current = FakeTab(browser, 4, pid=101)
+    tabs = [FakeTab(browser, 1, pid=101), FakeTab(browser, 2, pid=102),
+            FakeTab(browser, 3, pid=102, audible=True), current]
+    monitor, memory, events = make_monitor(tabs, current=current, rss_kb={101: 200_000, 102: 200_000})
+
+    memory["used"] = 95
+    monitor.check()
+    # Neither discard frees its renderer, so DevTools are closed as well
+    assert events == [("discard", 1), ("discard", 2), ("close DevTools", None)]